@@ -1,4 +1,5 @@
 import logging
+import uuid
 from urllib.parse import urlencode
 
 from core.config import settings
@@ -14,9 +15,11 @@ from schemas.auth import (
     GoogleLoginRequest,
     RegistrationResponse,
     ResetPasswordRequest,
+    SessionInfo,
     Token,
     UserRegister,
 )
+from services.auth.keys import JWKS_BODY, JWKS_ETAG
 from services.auth.service import AuthService
 from utils.auth_utils import is_user
 
@@ -46,12 +49,14 @@ async def login(
     """
     user = await auth_service.authenticate_user(form_data.username, form_data.password)
 
-    access_token = auth_service.create_access_token(data={"sub": user.email})
+    access_token = auth_service.create_access_token(
+        data=auth_service.build_access_token_claims(user)
+    )
     refresh_token = await auth_service.create_refresh_token(user_id=user.id)
 
     response.set_cookie(
         key="refresh_token",
-        value=refresh_token.token,
+        value=refresh_token,
         httponly=True,
         secure=settings.SECURE_COOKIES,
         samesite="lax",
@@ -141,12 +146,14 @@ async def auth_via_google(
     """
     user = await auth_service.login_with_google(code.code)
 
-    access_token = auth_service.create_access_token(data={"sub": user.email})
+    access_token = auth_service.create_access_token(
+        data=auth_service.build_access_token_claims(user)
+    )
     refresh_token = await auth_service.create_refresh_token(user_id=user.id)
 
     response.set_cookie(
         key="refresh_token",
-        value=refresh_token.token,
+        value=refresh_token,
         httponly=True,
         secure=settings.SECURE_COOKIES,
         samesite="lax",
@@ -163,6 +170,33 @@ async def me(current_user: UserModel = is_user):
     return current_user
 
 
+@auth_router.get("/sessions", response_model=list[SessionInfo])
+async def list_sessions(
+    request: Request,
+    current_user: UserBase = is_user,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """
+    Список активных сессий (устройств) текущего пользователя.
+    """
+    return await auth_service.list_sessions(
+        current_user.id, request.cookies.get("refresh_token")
+    )
+
+
+@auth_router.delete("/sessions/{session_id}", response_model=RegistrationResponse)
+async def revoke_session(
+    session_id: uuid.UUID,
+    current_user: UserBase = is_user,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """
+    Завершение одной из сессий текущего пользователя.
+    """
+    await auth_service.revoke_session(current_user.id, session_id)
+    return RegistrationResponse(result=AuthErrorMessages.SESSION_REVOKED)
+
+
 @auth_router.get("/verify-email", response_model=RegistrationResponse)
 async def verify_email(
     token: str, auth_service: AuthService = Depends(get_auth_service)
@@ -192,12 +226,29 @@ async def google_auth():
     return RedirectResponse(url=url)
 
 
+@auth_router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    """
+    Публичные ключи для локальной проверки access токенов другими сервисами.
+    """
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}",
+        "ETag": JWKS_ETAG,
+    }
+    if request.headers.get("if-none-match") == JWKS_ETAG:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=JWKS_BODY, media_type="application/json", headers=headers)
+
+
 @auth_router.post("/logout", response_model=RegistrationResponse)
 async def logout(
+    request: Request,
     response: Response,
+    auth_service: AuthService = Depends(get_auth_service),
 ):
     """
-    Выход из системы - удаление refresh_token cookie.
+    Выход из системы - отзыв refresh токена и удаление refresh_token cookie.
     """
+    await auth_service.logout(request.cookies.get("refresh_token"))
     response.delete_cookie(key="refresh_token")
     return RegistrationResponse(result=AuthErrorMessages.LOGOUT_SUCCESS)
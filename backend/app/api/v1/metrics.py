@@ -0,0 +1,27 @@
+from core.logger import get_logging_metrics
+from core.password_executor import password_executor
+from core.resilience import external_dependencies
+from core.smtp_pool import smtp_pool
+from fastapi import APIRouter
+from schemas import UserBase
+from services.auth.cache import access_token_cache, principal_cache
+from utils.auth_utils import is_admin
+from utils.log_helper import log_sampler
+
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@metrics_router.get("")
+async def get_metrics(current_user: UserBase = is_admin):
+    """
+    Состояние внешних зависимостей (circuit breaker, повторы) и внутренних пулов.
+    """
+    return {
+        "external_dependencies": external_dependencies.get_metrics(),
+        "password_executor": password_executor.get_metrics(),
+        "smtp_pool": smtp_pool.get_metrics(),
+        "principal_cache": principal_cache.get_metrics(),
+        "access_token_cache": access_token_cache.get_metrics(),
+        "logging": get_logging_metrics(),
+        "log_sampler": log_sampler.get_metrics(),
+    }
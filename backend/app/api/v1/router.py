@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from .auth import auth_router
+from .metrics import metrics_router
 
 api_v1_router = APIRouter(prefix="/api/v1")
 api_v1_router.include_router(auth_router)
+api_v1_router.include_router(metrics_router)
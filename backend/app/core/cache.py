@@ -0,0 +1,103 @@
+"""
+In-process кеш с ограничением по времени жизни и размеру (TTL + LRU).
+Используется для горячих данных, которые дорого получать на каждый запрос.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Self, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Кеш с вытеснением давно неиспользуемых записей и истечением по TTL.
+    Рассчитан на работу из одного event loop, блокировки не используются.
+    """
+
+    def __init__(self: Self, max_size: int, ttl: float) -> None:
+        """
+        Args:
+            max_size: Максимальное количество записей
+            ttl: Время жизни записи по умолчанию в секундах
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self: Self, key: K) -> Optional[V]:
+        """
+        Возвращает значение по ключу или None если записи нет или она истекла.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Закешированное значение или None
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self: Self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении.
+
+        Args:
+            key: Ключ записи
+            value: Значение
+            ttl: Время жизни записи в секундах (по умолчанию TTL кеша)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self: Self, key: K) -> None:
+        """Удаляет запись по ключу"""
+        self._data.pop(key, None)
+
+    def clear(self: Self) -> None:
+        """Удаляет все записи"""
+        self._data.clear()
+
+    def __len__(self: Self) -> int:
+        return len(self._data)
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        """
+        Метрики кеша: попадания, промахи и вытеснения.
+
+        Returns:
+            Словарь с метриками
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
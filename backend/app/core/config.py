@@ -22,6 +22,8 @@ class Settings(BaseSettings):
     DB_ECHO_POOL: bool = False
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_SIZE: int = 5
+    # Порог удержания соединения из пула, после которого пишется предупреждение
+    DB_SLOW_CHECKOUT_MS: int = 500
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -31,8 +33,51 @@ class Settings(BaseSettings):
 
     JWT_SECRET_KEY: str = ""
     JWT_ALGORITHM: str = "HS256"
+    # Для RS256/ES256/EdDSA: каталог с ключами <kid>.pem и kid ключа для подписи.
+    # Выведенные из ротации ключи остаются в каталоге для проверки старых токенов
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWKS_CACHE_MAX_AGE: int = 3600
+    # Добавлять в access токен id, роль, флаг верификации и версию токена,
+    # чтобы авторизовать запросы без обращения к БД
+    JWT_STATELESS_CLAIMS: bool = False
+    # Сколько процесс доверяет известной ему версии токенов пользователя.
+    # Отзыв в другом процессе (сброс пароля, выход со всех устройств)
+    # становится виден здесь не позже чем через это время
+    JWT_TOKEN_VERSION_CACHE_TTL_SECONDS: int = 30
+
+    # Обслуживание недельных партиций refresh_tokens: будущие партиции создаются
+    # всегда, флаг включает удаление партиций, истекших больше
+    # REFRESH_TOKEN_RETENTION_HOURS назад
+    REFRESH_TOKEN_REAPER_ENABLED: bool = True
+    REFRESH_TOKEN_REAPER_INTERVAL_SECONDS: int = 3600
+    REFRESH_TOKEN_RETENTION_HOURS: int = 24
+    REFRESH_TOKEN_PARTITIONS_AHEAD: int = 2
+    REFRESH_TOKEN_PARTITION_LOCK_TIMEOUT_MS: int = 2000
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # Максимум одновременных сессий пользователя, самые старые отзываются
+    REFRESH_TOKEN_MAX_SESSIONS: int = 5
+
+    # Пул потоков для хеширования паролей
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+
+    # Алгоритм хеширования паролей: bcrypt или argon2
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_BCRYPT_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_ARGON2_TIME_COST: int = 3
+    PASSWORD_HASH_ARGON2_MEMORY_COST: int = 65536
+    PASSWORD_HASH_ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_CALIBRATE: bool = False
+    PASSWORD_HASH_TARGET_MS: int = 100
+
+    # Кеш аутентифицированных пользователей
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    ACCESS_TOKEN_CACHE_MAX_SIZE: int = 10000
 
     MAIL_USERNAME: str = ""
     MAIL_PASSWORD: str = ""
@@ -41,18 +86,67 @@ class Settings(BaseSettings):
     MAIL_SERVER: str = "smtp.gmail.com"
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = False
+    MAIL_TIMEOUT: int = 30
+    # Пул постоянных SMTP соединений
+    MAIL_POOL_SIZE: int = 4
+    MAIL_POOL_MAX_MESSAGES_PER_CONNECTION: int = 100
+    MAIL_POOL_HEALTH_CHECK_SECONDS: int = 30
+    MAIL_POOL_IDLE_TIMEOUT_SECONDS: int = 300
+
+    # Фоновая отправка писем из таблицы email_outbox
+    EMAIL_OUTBOX_ENABLED: bool = True
+    EMAIL_OUTBOX_POLL_INTERVAL_SECONDS: int = 5
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 60
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_BASE_SECONDS: int = 10
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: int = 3600
+    # Срок хранения отправленных и окончательно неотправленных писем
+    EMAIL_OUTBOX_RETENTION_HOURS: int = 168
+    EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS: int = 3600
+    EMAIL_OUTBOX_PURGE_BATCH_SIZE: int = 1000
 
     EMAIL_VERIFICATION_TOKEN_EXPIRE_MINUTES: int = 60
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Исходящие HTTP запросы (core/http_client.py), таймауты в секундах
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 5.0
+    HTTP_CLIENT_READ_TIMEOUT: float = 10.0
+    HTTP_CLIENT_WRITE_TIMEOUT: float = 10.0
+    HTTP_CLIENT_POOL_TIMEOUT: float = 5.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = True
+
+    # Защита от деградации внешних сервисов (core/resilience.py)
+    EXTERNAL_BREAKER_FAILURE_THRESHOLD: int = 5
+    EXTERNAL_BREAKER_RECOVERY_SECONDS: int = 30
+    GOOGLE_CALL_TIMEOUT_SECONDS: float = 10.0
+    GOOGLE_MAX_RETRIES: int = 2
+    MAIL_SEND_TIMEOUT_SECONDS: float = 30.0
+
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = ""
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    # Время жизни ключей Google, если ответ JWKS без Cache-Control
+    GOOGLE_JWKS_DEFAULT_MAX_AGE: int = 3600
 
     # Logging settings
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "JSON"  # TEXT or JSON
     LOG_FILE: Optional[str] = None
+    # Размер очереди записей между event loop и потоком записи логов
+    LOG_QUEUE_SIZE: int = 10000
+    # Доля записываемых успешных (2xx/3xx) API запросов, 1.0 - все
+    LOG_SUCCESS_SAMPLE_RATE: float = 1.0
+    # Одинаковые отказы (IP, событие, причина): первые LOG_FAILURE_BURST пишутся,
+    # остальные суммируются в одну запись раз в LOG_FAILURE_SUMMARY_INTERVAL_SECONDS
+    LOG_FAILURE_BURST: int = 5
+    LOG_FAILURE_SUMMARY_INTERVAL_SECONDS: int = 60
+    LOG_FAILURE_MAX_KEYS: int = 10000
 
     @field_validator("REDIS_URL", mode="before")
     def assemble_redis_url(cls, v, values):
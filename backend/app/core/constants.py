@@ -36,6 +36,7 @@ class AuthErrorMessages:
     GOOGLE_TOKEN_FAILED = "Не удалось получить токен от Google"
     GOOGLE_USER_INFO_FAILED = "Не удалось получить информацию о пользователе"
     GOOGLE_EMAIL_MISSING = "Email не получен от Google"
+    GOOGLE_ID_TOKEN_INVALID = "Не удалось проверить токен Google"
 
     # Success messages
     EMAIL_VERIFICATION_SENT = (
@@ -44,6 +45,7 @@ class AuthErrorMessages:
     PASSWORD_RESET_SENT = "На вашу почту {} отправлено письмо для сброса пароля"
     PASSWORD_UPDATED = "Пароль успешно обновлен!"
     LOGOUT_SUCCESS = "Успешный выход из системы"
+    SESSION_REVOKED = "Сессия завершена"
 
 
 # === GENERAL ERROR MESSAGES ===
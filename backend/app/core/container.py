@@ -1,32 +1,135 @@
 """
 Минимальный Dependency Injection контейнер.
-Простая реализация без переусложнений для управления зависимостями сервисов.
+Поддерживает время жизни singleton, scoped (один экземпляр на разрешение,
+то есть на запрос) и transient. Граф зависимостей разворачивается один раз
+в плоский план, план - в замыкание с прямыми вызовами конструкторов,
+запрос только вызывает это замыкание.
 """
 
-from typing import Any, Callable, Dict, Type, TypeVar
+import functools
+import inspect
+import operator
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, List, Tuple, Type, TypeVar
 
 T = TypeVar("T")
 
 
+class Lifetime(str, Enum):
+    SINGLETON = "singleton"
+    SCOPED = "scoped"
+    TRANSIENT = "transient"
+
+
+# Источники аргументов шага плана
+_SLOT = 0  # результат предыдущего шага
+_KWARG = 1  # аргумент get_service (например, session)
+_CONST = 2  # готовый синглтон
+
+# Шаг плана: фабрика и список (имя параметра, источник, значение источника)
+PlanStep = Tuple[Callable[..., Any], Tuple[Tuple[str, int, Any], ...]]
+# Функция построения экземпляра: получает словарь аргументов get_service,
+# который заодно служит областью scoped экземпляров одного разрешения
+Builder = Callable[[Dict[Any, Any]], Any]
+
+
+def _constant(value: Any) -> Builder:
+    """Аргумент-синглтон, который нельзя привязать к фабрике через partial"""
+    return lambda values: value
+
+
+def _by_name(factory: Callable[..., Any], names: List[str]) -> Callable[..., Any]:
+    """Фабрика с keyword-only параметрами или синглтоном в середине сигнатуры"""
+    return lambda *args: factory(**dict(zip(names, args)))
+
+
+def _bind(call: Callable[..., Any], getters: List[Builder]) -> Builder:
+    """
+    Замыкание с прямым вызовом фабрики. Частые арности развернуты,
+    чтобы на запрос не собирать списки аргументов.
+    """
+    if not getters:
+        return lambda values: call()
+    if len(getters) == 1:
+        (first,) = getters
+
+        def build(values):
+            return call(first(values))
+
+    elif len(getters) == 2:
+        first, second = getters
+
+        def build(values):
+            return call(first(values), second(values))
+
+    elif len(getters) == 3:
+        first, second, third = getters
+
+        def build(values):
+            return call(first(values), second(values), third(values))
+
+    elif len(getters) == 4:
+        first, second, third, fourth = getters
+
+        def build(values):
+            return call(first(values), second(values), third(values), fourth(values))
+
+    else:
+        frozen_getters = tuple(getters)
+
+        def build(values):
+            return call(*[getter(values) for getter in frozen_getters])
+
+    return build
+
+
+def _shared(build: Builder) -> Builder:
+    """Scoped зависимость нескольких потребителей: один экземпляр на разрешение"""
+
+    def resolve_once(values):
+        try:
+            return values[build]
+        except KeyError:
+            instance = values[build] = build(values)
+            return instance
+
+    return resolve_once
+
+
 class DIContainer:
     """
     Минимальный DI контейнер для управления созданием сервисов и их зависимостей.
-    Поддерживает фабричные функции и простое кеширование.
+    Зависимости фабрики определяются по аннотациям ее параметров: параметр
+    зарегистрированного типа разрешается контейнером, остальные передаются
+    в get_service как именованные аргументы.
     """
 
+    __slots__ = ("_factories", "_lifetimes", "_singletons", "_resolvers")
+
     def __init__(self):
         self._factories: Dict[Type, Callable] = {}
+        self._lifetimes: Dict[Type, Lifetime] = {}
         self._singletons: Dict[Type, Any] = {}
+        self._resolvers: Dict[Type, Builder] = {}
 
-    def register_factory(self, service_type: Type[T], factory_func: Callable[..., T]):
+    def register_factory(
+        self,
+        service_type: Type[T],
+        factory_func: Callable[..., T],
+        lifetime: Lifetime = Lifetime.TRANSIENT,
+    ):
         """
         Регистрирует фабричную функцию для создания сервиса.
 
         Args:
             service_type: Тип сервиса
-            factory_func: Функция создания сервиса
+            factory_func: Функция создания сервиса (или сам класс)
+            lifetime: Время жизни экземпляра
         """
         self._factories[service_type] = factory_func
+        self._lifetimes[service_type] = lifetime
+        self._resolvers.clear()
 
     def register_singleton(self, service_type: Type[T], instance: T):
         """
@@ -37,34 +140,178 @@ class DIContainer:
             instance: Готовый экземпляр
         """
         self._singletons[service_type] = instance
+        self._resolvers.clear()
+
+    @staticmethod
+    def _dependencies(factory: Callable) -> Dict[str, Any]:
+        """Аннотации параметров фабрики (для класса - параметров __init__)"""
+        target = factory.__init__ if inspect.isclass(factory) else factory
+        hints = typing.get_type_hints(target)
+        parameters = inspect.signature(target).parameters
+        return {
+            name: hints.get(name)
+            for name in parameters
+            if name not in ("self", "return")
+        }
+
+    def _build_plan(self, service_type: Type) -> List[PlanStep]:
+        """
+        Разворачивает граф зависимостей в плоский список шагов.
+        Scoped зависимость создается один раз за разрешение,
+        transient - отдельно для каждого потребителя.
+        """
+        plan: List[PlanStep] = []
+        scoped_slots: Dict[Type, int] = {}
+
+        def visit(current: Type, path: Tuple[Type, ...]) -> int:
+            if current in path:
+                chain = " -> ".join(t.__name__ for t in (*path, current))
+                raise ValueError(f"Циклическая зависимость: {chain}")
+            if current in scoped_slots:
+                return scoped_slots[current]
+
+            factory = self._factories[current]
+            arguments = []
+            for name, annotation in self._dependencies(factory).items():
+                if annotation in self._singletons:
+                    arguments.append((name, _CONST, self._singletons[annotation]))
+                elif annotation in self._factories:
+                    slot = visit(annotation, (*path, current))
+                    arguments.append((name, _SLOT, slot))
+                else:
+                    arguments.append((name, _KWARG, name))
+
+            plan.append((factory, tuple(arguments)))
+            slot = len(plan) - 1
+            if self._lifetimes[current] != Lifetime.TRANSIENT:
+                scoped_slots[current] = slot
+            return slot
+
+        visit(service_type, ())
+        return plan
+
+    @staticmethod
+    def _positional(factory: Callable[..., Any], names: List[str]) -> bool:
+        """Можно ли передать параметры names фабрике позиционно"""
+        parameters = inspect.signature(factory).parameters
+        return all(
+            parameters[name].kind
+            in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            )
+            for name in names
+        )
+
+    @staticmethod
+    def _make_resolver(plan: List[PlanStep]) -> Builder:
+        """
+        Превращает план в одно замыкание над прямыми вызовами фабрик.
+        Шаг становится вложенным вызовом в замыкании потребителя, аргументы
+        get_service берутся через itemgetter, синглтоны привязаны через partial.
+        Scoped шаг с несколькими потребителями кешируется в словаре аргументов
+        разрешения - get_service всегда передает новый словарь.
+        """
+        uses: Dict[int, int] = {}
+        keys: List[str] = []
+        for _, arguments in plan:
+            for _, source, value in arguments:
+                if source == _SLOT:
+                    uses[value] = uses.get(value, 0) + 1
+                elif source == _KWARG and value not in keys:
+                    keys.append(value)
+
+        builders: List[Builder] = []
+        for index, (factory, arguments) in enumerate(plan):
+            names = [name for name, _, _ in arguments]
+            sources = [source for _, source, _ in arguments]
+            constants = {
+                name: value for name, source, value in arguments if source == _CONST
+            }
+            # Синглтоны в конце сигнатуры привязываются к фабрике по имени,
+            # остальные параметры передаются позиционно
+            tail = len(names) - len(constants)
+            if all(
+                source == _CONST for source in sources[tail:]
+            ) and DIContainer._positional(factory, names[:tail]):
+                call = functools.partial(factory, **constants) if constants else factory
+                bound = arguments[:tail]
+            else:
+                call = _by_name(factory, names)
+                bound = arguments
+
+            getters: List[Builder] = []
+            for _, source, value in bound:
+                if source == _SLOT:
+                    getters.append(builders[value])
+                elif source == _KWARG:
+                    getters.append(operator.itemgetter(value))
+                else:
+                    getters.append(_constant(value))
+
+            build = _bind(call, getters)
+            builders.append(_shared(build) if uses.get(index, 0) > 1 else build)
+
+        build = builders[-1]
+
+        def resolve(values: Dict[Any, Any]) -> Any:
+            try:
+                return build(values)
+            except KeyError:
+                missing = [key for key in keys if key not in values]
+                if missing:
+                    raise TypeError(f"Не передан аргумент {missing[0]}") from None
+                raise
+
+        return resolve
+
+    def compile(self):
+        """
+        Строит функции разрешения для всех зарегистрированных фабрик.
+        Вызывается при старте приложения после регистрации сервисов.
+        Singleton фабрики выполняются здесь же.
+        """
+        for service_type, lifetime in list(self._lifetimes.items()):
+            if lifetime == Lifetime.SINGLETON and service_type not in self._singletons:
+                resolver = self._make_resolver(self._build_plan(service_type))
+                self._singletons[service_type] = resolver({})
+        self._resolvers = {
+            service_type: self._make_resolver(self._build_plan(service_type))
+            for service_type in self._factories
+            if service_type not in self._singletons
+        }
 
     def get_service(self, service_type: Type[T], **kwargs) -> T:
         """
-        Получает экземпляр сервиса.
-        Сначала проверяет синглтоны, затем использует фабрику.
+        Получает экземпляр сервиса: исполняет план разрешения
+        или возвращает синглтон.
 
         Args:
             service_type: Тип запрашиваемого сервиса
-            **kwargs: Аргументы для фабричной функции
+            **kwargs: Значения параметров, которые не разрешаются контейнером
 
         Returns:
             Экземпляр сервиса
 
         Raises:
             ValueError: Если сервис не зарегистрирован
+            TypeError: Если не передан обязательный именованный аргумент
         """
-        # Проверяем синглтоны
-        if service_type in self._singletons:
-            return self._singletons[service_type]
-
-        # Используем фабрику
-        if service_type in self._factories:
-            factory = self._factories[service_type]
-            return factory(**kwargs)
+        # Планы и синглтоны не пересекаются: сначала план - это путь запроса
+        resolver = self._resolvers.get(service_type)
+        if resolver is None:
+            if service_type in self._singletons:
+                return self._singletons[service_type]
+            if service_type not in self._factories:
+                raise ValueError(
+                    f"Сервис {service_type.__name__} не зарегистрирован в контейнере"
+                )
+            self.compile()
+            if service_type in self._singletons:
+                return self._singletons[service_type]
+            resolver = self._resolvers[service_type]
 
-        raise ValueError(
-            f"Сервис {service_type.__name__} не зарегистрирован в контейнере"
-        )
+        return resolver(kwargs)
 
     def has_service(self, service_type: Type) -> bool:
         """
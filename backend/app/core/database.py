@@ -1,6 +1,9 @@
+import time
 from typing import AsyncGenerator, Self
 
 from core.config import settings
+from core.logger import get_logger
+from sqlalchemy import event
 from sqlalchemy.engine.url import URL
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -8,10 +11,71 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction, declarative_base
 
 Base = declarative_base()
 
+log = get_logger(__name__)
+
+
+class WriteTrackingSession(Session):
+    """
+    Синхронная сессия, которая помнит, выполнялась ли в текущей транзакции
+    запись: flush изменений ORM или INSERT/UPDATE/DELETE через execute.
+    Признак сбрасывается по завершении внешней транзакции.
+    """
+
+    has_writes: bool = False
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _track_flush(session: WriteTrackingSession, flush_context) -> None:
+    session.has_writes = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _track_execute(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.has_writes = True
+
+
+@event.listens_for(WriteTrackingSession, "after_transaction_end")
+def _reset_writes(
+    session: WriteTrackingSession, transaction: SessionTransaction
+) -> None:
+    if transaction.parent is None:
+        session.has_writes = False
+
+
+class LazyAsyncSession(AsyncSession):
+    """
+    Сессия, которая занимает соединение пула только на время единицы работы.
+    Соединение берется при первом запросе и возвращается в пул при commit,
+    rollback или release, а не при закрытии сессии в конце HTTP запроса.
+    """
+
+    sync_session_class = WriteTrackingSession
+
+    @property
+    def has_writes(self: Self) -> bool:
+        """В текущей транзакции уже выполнялась запись в БД"""
+        return self.sync_session.has_writes
+
+    async def release(self: Self) -> None:
+        """
+        Завершает читающую транзакцию и возвращает соединение в пул.
+        Если в сессии есть несохраненные изменения или транзакция уже
+        выполняла запись (flush, UPDATE через execute), соединение
+        не отпускается: release не должен неявно фиксировать запись,
+        это делает вызывающий код через commit.
+        Загруженные объекты остаются доступными (expire_on_commit=False).
+        """
+        if not self.in_transaction():
+            return
+        if self.new or self.dirty or self.deleted or self.has_writes:
+            return
+        await self.commit()
+
 
 class DatabaseHelper:
     def __init__(
@@ -21,6 +85,7 @@ class DatabaseHelper:
         echo_pool: bool = False,
         max_overflow: int = 10,
         pool_size: int = 5,
+        slow_checkout_ms: int = 500,
     ) -> None:
         self.engine: AsyncEngine = create_async_engine(
             url=url,
@@ -30,12 +95,41 @@ class DatabaseHelper:
             pool_size=pool_size,
             future=True,
         )
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+        self.session_factory: async_sessionmaker[LazyAsyncSession] = async_sessionmaker(
             bind=self.engine,
+            class_=LazyAsyncSession,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
+        self.slow_checkout_ms = slow_checkout_ms
+        self._register_pool_events()
+
+    def _register_pool_events(self: Self) -> None:
+        """
+        Замер времени, на которое соединение занято из пула.
+        Долгие удержания логируются - это сигнал, что внутри транзакции
+        выполняется медленная работа не с БД (хеширование, SMTP, HTTP).
+        """
+        pool_events = self.engine.sync_engine
+
+        @event.listens_for(pool_events, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checked_out_at"] = time.perf_counter()
+
+        @event.listens_for(pool_events, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            checked_out_at = connection_record.info.pop("checked_out_at", None)
+            if checked_out_at is None:
+                return
+            held_ms = (time.perf_counter() - checked_out_at) * 1000
+            if held_ms >= self.slow_checkout_ms:
+                log.warning(
+                    f"DB connection held for {held_ms:.0f} ms",
+                    event_type="db_slow_checkout",
+                    held_ms=round(held_ms, 2),
+                    pool_status=self.engine.pool.status(),
+                )
 
     async def get_session(self: Self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
@@ -51,4 +145,5 @@ db_helper = DatabaseHelper(
     echo_pool=settings.DB_ECHO_POOL,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_size=settings.DB_POOL_SIZE,
+    slow_checkout_ms=settings.DB_SLOW_CHECKOUT_MS,
 )
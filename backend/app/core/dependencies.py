@@ -6,18 +6,19 @@
 from typing import AsyncGenerator
 
 from core.container import container
-from core.database import db_helper
+from core.database import LazyAsyncSession, db_helper
 from core.service_factory import ServiceFactory
 from fastapi import Depends
 from services.auth.service import AuthService
-from sqlalchemy.ext.asyncio import AsyncSession
 
-container.register_factory(AuthService, ServiceFactory.create_auth_service)
+ServiceFactory.register_services(container)
 
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_async_session() -> AsyncGenerator[LazyAsyncSession, None]:
     """
     Dependency для получения асинхронной сессии БД.
+    Соединение из пула берется только при первом запросе к БД
+    и возвращается после commit/rollback/release, а не в конце HTTP запроса.
     Автоматически закрывает сессию после использования.
     """
     async with db_helper.session_factory() as session:
@@ -41,7 +42,7 @@ def get_container():
 
 
 def get_auth_service(
-    session: AsyncSession = Depends(get_async_session),
+    session: LazyAsyncSession = Depends(get_async_session),
     di_container=Depends(get_container),
 ) -> AuthService:
     """
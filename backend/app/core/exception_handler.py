@@ -3,7 +3,6 @@
 Маппинг кастомных исключений в HTTP ответы с consistent форматом.
 """
 
-import uuid
 from typing import Any, Dict
 
 from core.constants import GeneralErrorMessages, RequestTracing
@@ -15,14 +14,15 @@ from core.exceptions import (
     ExternalServiceError,
     NotFoundError,
     RepositoryError,
+    ServiceUnavailableError,
     TokenError,
     ValidationError,
     map_exception_to_http_status,
 )
-from core.logger import get_logger, set_request_id
+from core.logger import get_logger
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from utils.log_helper import log_sampler
 
 logger = get_logger(__name__)
 
@@ -59,36 +59,6 @@ class ErrorResponse:
         return result
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware для добавления request_id в каждый запрос"""
-
-    async def dispatch(self, request: Request, call_next):
-        # Генерируем или извлекаем request_id
-        request_id = request.headers.get(RequestTracing.HEADER_REQUEST_ID) or str(
-            uuid.uuid4()
-        )
-
-        # Добавляем в state запроса
-        request.state.request_id = request_id
-
-        # Устанавливаем request_id в контекст логгера
-        set_request_id(request_id)
-
-        try:
-            # Выполняем запрос
-            response = await call_next(request)
-
-            # Добавляем request_id в заголовки ответа
-            response.headers[RequestTracing.HEADER_REQUEST_ID] = request_id
-
-            return response
-        finally:
-            # Очищаем request_id из контекста после обработки запроса
-            from core.logger import clear_request_id
-
-            clear_request_id()
-
-
 def get_request_id(request: Request) -> str:
     """Получение request_id из запроса"""
     return getattr(request.state, "request_id", "unknown")
@@ -126,14 +96,21 @@ async def authentication_error_handler(
     """Обработчик ошибок аутентификации"""
     request_id = get_request_id(request)
 
-    logger.warning(
-        f"Authentication error: {exc}",
-        extra={
-            RequestTracing.LOG_REQUEST_ID_KEY: request_id,
-            "exception_type": type(exc).__name__,
-            "user_ip": request.client.host if request.client else "unknown",
-        },
-    )
+    # Повторяющиеся отказы с одного IP агрегируются в сводную запись
+    if log_sampler.allow_failure(
+        logger,
+        request.client.host if request.client else None,
+        "authentication_error",
+        str(exc),
+    ):
+        logger.warning(
+            f"Authentication error: {exc}",
+            extra={
+                RequestTracing.LOG_REQUEST_ID_KEY: request_id,
+                "exception_type": type(exc).__name__,
+                "user_ip": request.client.host if request.client else "unknown",
+            },
+        )
 
     error_response = ErrorResponse(
         error_type="AuthenticationError", message=str(exc), request_id=request_id
@@ -148,14 +125,21 @@ async def authorization_error_handler(
     """Обработчик ошибок авторизации"""
     request_id = get_request_id(request)
 
-    logger.warning(
-        f"Authorization error: {exc}",
-        extra={
-            RequestTracing.LOG_REQUEST_ID_KEY: request_id,
-            "exception_type": type(exc).__name__,
-            "user_ip": request.client.host if request.client else "unknown",
-        },
-    )
+    # Повторяющиеся отказы с одного IP агрегируются в сводную запись
+    if log_sampler.allow_failure(
+        logger,
+        request.client.host if request.client else None,
+        "authorization_error",
+        str(exc),
+    ):
+        logger.warning(
+            f"Authorization error: {exc}",
+            extra={
+                RequestTracing.LOG_REQUEST_ID_KEY: request_id,
+                "exception_type": type(exc).__name__,
+                "user_ip": request.client.host if request.client else "unknown",
+            },
+        )
 
     error_response = ErrorResponse(
         error_type="AuthorizationError", message=str(exc), request_id=request_id
@@ -168,14 +152,21 @@ async def token_error_handler(request: Request, exc: TokenError) -> JSONResponse
     """Обработчик ошибок токенов"""
     request_id = get_request_id(request)
 
-    logger.warning(
-        f"Token error: {exc}",
-        extra={
-            RequestTracing.LOG_REQUEST_ID_KEY: request_id,
-            "exception_type": type(exc).__name__,
-            "token_type": getattr(exc, "token_type", "unknown"),
-        },
-    )
+    # Повторяющиеся отказы с одного IP агрегируются в сводную запись
+    if log_sampler.allow_failure(
+        logger,
+        request.client.host if request.client else None,
+        "token_error",
+        str(exc),
+    ):
+        logger.warning(
+            f"Token error: {exc}",
+            extra={
+                RequestTracing.LOG_REQUEST_ID_KEY: request_id,
+                "exception_type": type(exc).__name__,
+                "token_type": getattr(exc, "token_type", "unknown"),
+            },
+        )
 
     error_response = ErrorResponse(
         error_type="TokenError",
@@ -213,6 +204,33 @@ async def external_service_error_handler(
     return JSONResponse(status_code=502, content=error_response.to_dict())
 
 
+async def service_unavailable_error_handler(
+    request: Request, exc: ServiceUnavailableError
+) -> JSONResponse:
+    """Обработчик перегрузки внутренних ресурсов"""
+    request_id = get_request_id(request)
+
+    logger.warning(
+        f"Service unavailable: {exc}",
+        extra={
+            RequestTracing.LOG_REQUEST_ID_KEY: request_id,
+            "exception_type": type(exc).__name__,
+        },
+    )
+
+    error_response = ErrorResponse(
+        error_type="ServiceUnavailableError", message=str(exc), request_id=request_id
+    )
+
+    headers = None
+    if exc.retry_after is not None:
+        headers = {"Retry-After": str(exc.retry_after)}
+
+    return JSONResponse(
+        status_code=503, content=error_response.to_dict(), headers=headers
+    )
+
+
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Общий обработчик для неожиданных исключений"""
     request_id = get_request_id(request)
@@ -271,10 +289,10 @@ def register_exception_handlers(app):
     app.add_exception_handler(AuthorizationError, authorization_error_handler)
     app.add_exception_handler(TokenError, token_error_handler)
     app.add_exception_handler(ExternalServiceError, external_service_error_handler)
+    app.add_exception_handler(
+        ServiceUnavailableError, service_unavailable_error_handler
+    )
 
     # Стандартные исключения
     app.add_exception_handler(HTTPException, http_exception_handler)
     app.add_exception_handler(Exception, general_exception_handler)
-
-    # Middleware
-    app.add_middleware(RequestIDMiddleware)
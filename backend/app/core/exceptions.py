@@ -83,6 +83,18 @@ class ExternalServiceError(Exception):
         super().__init__(f"Ошибка {service_name}: {message}")
 
 
+class ServiceUnavailableError(Exception):
+    """Исключение при перегрузке или недоступности внутреннего ресурса"""
+
+    def __init__(
+        self,
+        message: str = "Сервис временно недоступен",
+        retry_after: int | None = None,
+    ):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
 # === EXCEPTION TO HTTP STATUS MAPPER ===
 
 
@@ -112,5 +124,7 @@ def map_exception_to_http_status(exception: Exception) -> int:
         return status.HTTP_401_UNAUTHORIZED
     elif isinstance(exception, ExternalServiceError):
         return status.HTTP_502_BAD_GATEWAY
+    elif isinstance(exception, ServiceUnavailableError):
+        return status.HTTP_503_SERVICE_UNAVAILABLE
     else:
         return status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,72 @@
+"""
+Реестр исходящих HTTP клиентов.
+Один httpx.AsyncClient на внешнюю интеграцию: соединения переиспользуются
+между запросами, таймауты и лимиты соединений заданы явно.
+"""
+
+from typing import Any, Dict, Self
+
+import httpx
+from core.config import settings
+
+
+class HTTPClientRegistry:
+    """
+    Клиенты создаются при первом обращении и живут до остановки приложения.
+    Лимиты соединений действуют на каждый клиент, то есть на каждую интеграцию
+    (фактически на каждый внешний хост).
+    """
+
+    def __init__(
+        self: Self,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        http2: bool = True,
+    ) -> None:
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self: Self, name: str, **client_kwargs: Any) -> httpx.AsyncClient:
+        """
+        Получает клиент интеграции, создавая его при первом вызове.
+
+        Args:
+            name: Имя интеграции (например, "google")
+            **client_kwargs: Параметры httpx.AsyncClient при создании
+                (base_url, headers, собственные timeout/limits)
+
+        Returns:
+            Общий для приложения клиент
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client_kwargs.setdefault("timeout", self.timeout)
+            client_kwargs.setdefault("limits", self.limits)
+            client_kwargs.setdefault("http2", self.http2)
+            client = httpx.AsyncClient(**client_kwargs)
+            self._clients[name] = client
+        return client
+
+    async def aclose(self: Self) -> None:
+        """Закрывает все клиенты и их соединения"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HTTPClientRegistry(
+    timeout=httpx.Timeout(
+        connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+        read=settings.HTTP_CLIENT_READ_TIMEOUT,
+        write=settings.HTTP_CLIENT_WRITE_TIMEOUT,
+        pool=settings.HTTP_CLIENT_POOL_TIMEOUT,
+    ),
+    limits=httpx.Limits(
+        max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+    ),
+    http2=settings.HTTP_CLIENT_HTTP2,
+)
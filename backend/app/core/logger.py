@@ -3,16 +3,26 @@
 Поддерживает structured logging с request_id трассировкой.
 """
 
+import atexit
 import json
 import logging
+import queue
 import sys
+import threading
+from collections import Counter
 from contextvars import ContextVar
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Self, Tuple
 
 from core.constants import RequestTracing
 
+try:
+    import orjson
+except ImportError:  # orjson не установлен, используется json
+    orjson = None
+
 
 class LogLevel(str, Enum):
     """Уровни логирования"""
@@ -34,43 +44,106 @@ class LogFormat(str, Enum):
 # Context variable для хранения request_id
 request_context: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
+# Context variable для IP клиента текущего запроса
+client_ip_context: ContextVar[Optional[str]] = ContextVar("client_ip", default=None)
+
+
+def _record_request_id(record: logging.LogRecord) -> Optional[str]:
+    """
+    request_id записи: сохраняется в записи при постановке в очередь,
+    так как форматирование идет в потоке QueueListener без контекста запроса
+    """
+    return getattr(record, "request_id", None) or request_context.get()
+
+
+def _json_default(value: Any) -> str:
+    """Значения, которые не сериализуются в JSON (UUID, datetime, ...), пишутся строкой"""
+    return str(value)
+
+
+def _create_json_dumps() -> Callable[[Any], str]:
+    """Сериализатор JSON: orjson при наличии, иначе стандартный json"""
+    if orjson is not None:
+        return lambda data: orjson.dumps(data, default=_json_default).decode("utf-8")
+    encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=_json_default
+    )
+    return encoder.encode
+
 
 class StructuredFormatter(logging.Formatter):
-    """Форматтер для structured logging в JSON формате"""
+    """
+    Форматтер для structured logging в JSON формате.
+    Поля, одинаковые для многих записей (секунда времени, уровень, имя логгера),
+    сериализуются один раз и склеиваются с JSON переменной части записи.
+    """
 
-    def format(self, record: logging.LogRecord) -> str:
+    def __init__(self: Self) -> None:
+        super().__init__()
+        self._dumps = _create_json_dumps()
+        self._second: Optional[int] = None
+        self._second_prefix = ""
+        self._level_fields: Dict[int, str] = {}
+        self._module_fields: Dict[str, str] = {}
+
+    def _timestamp(self: Self, created: float) -> str:
+        """Время записи в ISO 8601 UTC, строка до секунд кешируется"""
+        second = int(created)
+        if second != self._second:
+            self._second_prefix = datetime.fromtimestamp(
+                second, tz=timezone.utc
+            ).strftime("%Y-%m-%dT%H:%M:%S")
+            self._second = second
+        return f"{self._second_prefix}.{int((created - second) * 1e6):06d}Z"
+
+    def _static_fields(self: Self, record: logging.LogRecord) -> str:
+        """Сериализованные поля level и module"""
+        level = self._level_fields.get(record.levelno)
+        if level is None:
+            level = self._level_fields[record.levelno] = (
+                f'"level":{self._dumps(record.levelname)},'
+            )
+        module = self._module_fields.get(record.name)
+        if module is None:
+            module = self._module_fields[record.name] = (
+                f'"module":{self._dumps(record.name)},'
+            )
+        return level + module
+
+    def format(self: Self, record: logging.LogRecord) -> str:
         """Форматирование лог записи в JSON"""
 
-        # Базовая структура лога
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "level": record.levelname,
             "message": record.getMessage(),
-            "module": record.name,
             "function": record.funcName,
             "line": record.lineno,
         }
 
         # Добавляем request_id если доступен
-        request_id = request_context.get()
+        request_id = _record_request_id(record)
         if request_id:
             log_data[RequestTracing.LOG_REQUEST_ID_KEY] = request_id
 
         # Добавляем дополнительные поля из extra
-        if hasattr(record, "extra") and getattr(record, "extra", None):
-            extra_data = getattr(record, "extra")
-            if isinstance(extra_data, dict):
-                log_data.update(extra_data)
+        extra_data = getattr(record, "extra", None)
+        if extra_data and isinstance(extra_data, dict):
+            log_data.update(extra_data)
 
         # Добавляем информацию об исключении если есть
-        if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
+        # (при записи через очередь traceback уже отрендерен в prepare)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_data["exception"] = record.exc_text
 
-        # Добавляем стэк трейс для ERROR+ уровней
+        # Стэк вызова пишется для ERROR+ уровней без traceback исключения
         if record.levelno >= logging.ERROR and record.stack_info:
             log_data["stack_trace"] = self.formatStack(record.stack_info)
 
-        return json.dumps(log_data, ensure_ascii=False, separators=(",", ":"))
+        return (
+            f'{{"timestamp":"{self._timestamp(record.created)}",'
+            f"{self._static_fields(record)}{self._dumps(log_data)[1:]}"
+        )
 
 
 class ReadableFormatter(logging.Formatter):
@@ -89,13 +162,219 @@ class ReadableFormatter(logging.Formatter):
         formatted = super().format(record)
 
         # Добавляем request_id если доступен
-        request_id = request_context.get()
+        request_id = _record_request_id(record)
         if request_id:
             formatted = f"[{request_id[:8]}] {formatted}"
 
         return formatted
 
 
+class DroppingQueueHandler(QueueHandler):
+    """
+    Постановка записей в ограниченную очередь без блокировки event loop.
+    При заполнении очереди выше debug_watermark отбрасываются DEBUG записи,
+    при полной очереди - любые; отброшенные записи считаются по уровням.
+    Пока фоновый поток остановлен, записи передаются обработчикам синхронно.
+    """
+
+    def __init__(self: Self, log_queue: queue.Queue, debug_watermark: float = 0.8):
+        super().__init__(log_queue)
+        self.debug_threshold = int(log_queue.maxsize * debug_watermark)
+        self.dropped: Counter[str] = Counter()
+        self._dropped_lock = threading.Lock()
+        self._exception_formatter = logging.Formatter()
+        # Обработчики для синхронной записи; None - записи идут в очередь
+        self.direct_handlers: Optional[Tuple[logging.Handler, ...]] = None
+
+    def prepare(self: Self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Фиксирует данные, зависящие от контекста вызова и изменяемые после него:
+        request_id, сообщение, копию extra и текст traceback.
+        JSON форматирование выполняет поток QueueListener.
+        """
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_context.get()
+        record.msg = record.getMessage()
+        record.args = None
+        extra = getattr(record, "extra", None)
+        if isinstance(extra, dict):
+            record.extra = dict(extra)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(
+                    record.exc_info
+                )
+            # Traceback держит кадры стека со всеми локальными переменными
+            record.exc_info = None
+        return record
+
+    def _drop(self: Self, record: logging.LogRecord) -> None:
+        with self._dropped_lock:
+            self.dropped[record.levelname] += 1
+
+    def enqueue(self: Self, record: logging.LogRecord) -> None:
+        if (
+            record.levelno <= logging.DEBUG
+            and self.queue.qsize() >= self.debug_threshold
+        ):
+            self._drop(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop(record)
+
+    def emit(self: Self, record: logging.LogRecord) -> None:
+        handlers = self.direct_handlers
+        if handlers is None:
+            super().emit(record)
+            return
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class FlushingQueueListener(QueueListener):
+    """QueueListener, который при остановке дожидается записи всей очереди"""
+
+    def enqueue_sentinel(self: Self) -> None:
+        # put_nowait базового класса теряет sentinel при полной очереди
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Очередь и фоновый поток записи логов для одного набора обработчиков.
+    Event loop только кладет запись в очередь, форматирование и запись
+    в stdout/файл выполняются в потоке QueueListener. После остановки
+    записи пишутся синхронно до следующего запуска.
+    """
+
+    def __init__(
+        self: Self,
+        format_type: LogFormat,
+        file_path: Optional[str],
+        max_queue_size: int,
+    ) -> None:
+        if format_type == LogFormat.JSON:
+            formatter = StructuredFormatter()
+        else:
+            formatter = ReadableFormatter()
+
+        handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+        if file_path:
+            handlers.append(logging.FileHandler(file_path, encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        self.handlers = tuple(handlers)
+
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.listener = FlushingQueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self._running = False
+        self._state_lock = threading.Lock()
+        self.start()
+
+    @property
+    def running(self: Self) -> bool:
+        return self._running
+
+    def start(self: Self) -> None:
+        """Запускает фоновый поток записи; повторный вызов ничего не делает"""
+        with self._state_lock:
+            if self._running:
+                return
+            self.listener.start()
+            self._running = True
+            self.handler.direct_handlers = None
+
+    def stop(self: Self) -> None:
+        """
+        Записывает оставшиеся в очереди записи и останавливает поток.
+        Дальнейшие записи пишутся синхронно; повторный вызов ничего не делает.
+        """
+        with self._state_lock:
+            if not self._running:
+                return
+            # Новые записи идут мимо очереди, затем поток дописывает очередь
+            self.handler.direct_handlers = self.handlers
+            self.listener.stop()
+            self._running = False
+            # Записи, попавшие в очередь после sentinel
+            while True:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.listener.handle(record)
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # Поток вывода уже закрыт (например, при завершении интерпретатора)
+                pass
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queue_size": self.queue.qsize(),
+            "queue_max_size": self.queue.maxsize,
+            "dropped": dict(self.handler.dropped),
+        }
+
+
+# Один конвейер на комбинацию формата и файла логов
+_pipelines: Dict[Tuple[LogFormat, Optional[str]], LogPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_log_pipeline(format_type: LogFormat, file_path: Optional[str]) -> LogPipeline:
+    """Получение (создание при первом вызове) конвейера логов"""
+    key = (format_type, file_path)
+    with _pipelines_lock:
+        if key not in _pipelines:
+            from core.config import settings
+
+            _pipelines[key] = LogPipeline(
+                format_type, file_path, max_queue_size=settings.LOG_QUEUE_SIZE
+            )
+        return _pipelines[key]
+
+
+def start_logging() -> None:
+    """
+    Запускает фоновую запись логов, остановленную shutdown_logging.
+    Вызывается при старте приложения (в том числе повторном в том же процессе).
+    """
+    with _pipelines_lock:
+        for pipeline in _pipelines.values():
+            pipeline.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Останавливает все конвейеры, дописав накопленные записи.
+    Вызывается при остановке приложения и при выходе из процесса;
+    повторный вызов безопасен, последующие записи пишутся синхронно.
+    """
+    with _pipelines_lock:
+        for pipeline in _pipelines.values():
+            pipeline.stop()
+
+
+def get_logging_metrics() -> Dict[str, Any]:
+    """Глубина очередей логов и количество отброшенных записей"""
+    return {
+        f"{format_type.value}:{file_path or 'stdout'}": pipeline.get_metrics()
+        for (format_type, file_path), pipeline in _pipelines.items()
+    }
+
+
+atexit.register(shutdown_logging)
+
+
 class VectorAILogger:
     """Централизованный логгер для VectorAI"""
 
@@ -112,22 +391,8 @@ class VectorAILogger:
         # Очищаем существующие handlers
         self.logger.handlers.clear()
 
-        # Настраиваем форматтер
-        if format_type == LogFormat.JSON:
-            formatter = StructuredFormatter()
-        else:
-            formatter = ReadableFormatter()
-
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-
-        # File handler (опционально)
-        if file_path:
-            file_handler = logging.FileHandler(file_path, encoding="utf-8")
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+        # Запись в stdout и файл выполняет фоновый поток конвейера
+        self.logger.addHandler(get_log_pipeline(format_type, file_path).handler)
 
         # Предотвращаем дублирование логов
         self.logger.propagate = False
@@ -141,16 +406,26 @@ class VectorAILogger:
     ):
         """Внутренний метод логирования с контекстом"""
 
+        # Отключенный уровень не требует ни контекста, ни записи
+        if not self.logger.isEnabledFor(level):
+            return
+
         # Подготавливаем extra данные
         log_extra = extra or {}
 
+        # Traceback берется только при обрабатываемом исключении,
+        # стэк вызова собирается лишь для ERROR+ записей без него
+        error = sys.exc_info() if exc_info else None
+        if error is not None and error[0] is None:
+            error = None
+
         # Логируем с дополнительной информацией
         self.logger.log(
             level,
             message,
             extra={"extra": log_extra},
-            exc_info=exc_info,
-            stack_info=level >= logging.ERROR,
+            exc_info=error,
+            stack_info=level >= logging.ERROR and error is None,
         )
 
     def debug(self, message: str, **context):
@@ -193,6 +468,11 @@ def clear_request_id():
     request_context.set(None)
 
 
+def get_client_ip() -> Optional[str]:
+    """Получение IP клиента текущего запроса"""
+    return client_ip_context.get()
+
+
 # Глобальная фабрика логгеров
 _loggers: Dict[str, VectorAILogger] = {}
 
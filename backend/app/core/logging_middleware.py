@@ -1,75 +1,82 @@
 """
-Middleware для автоматического логирования API запросов.
+ASGI middleware контекста запроса: request_id и логирование API запросов.
+Реализован без BaseHTTPMiddleware, чтобы не создавать на каждый запрос
+отдельную задачу и поток памяти и не оборачивать ответ (важно для streaming).
 """
 
 import time
-from typing import Callable
+import uuid
 
-from core.logger import get_logger
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from core.constants import RequestTracing
+from core.logger import client_ip_context, get_logger, request_context
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from utils.log_helper import log_api_request
 
 
-class APILoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware для логирования всех API запросов и ответов"""
+class RequestContextMiddleware:
+    """
+    Назначает запросу request_id (из заголовка X-Request-ID или новый),
+    кладет его в request.state и контекст логгера, возвращает в заголовке ответа
+    и пишет одну строку лога по завершении запроса.
+    """
 
-    def __init__(self, app, logger_name: str = "vectorai.api"):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, logger_name: str = "vectorai.api"):
+        self.app = app
         self.logger = get_logger(logger_name)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Обработка запроса с логированием"""
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        start_time = time.time()
-
-        # Извлекаем базовую информацию о запросе
-        method = request.method
-        path = str(request.url.path)
-
-        # Логируем начало запроса
-        self.logger.info(
-            f"API Request started: {method} {path}",
-            event_type="api_request_start",
-            method=method,
-            path=path,
-            client_ip=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent"),
+        request_id = Headers(scope=scope).get(RequestTracing.HEADER_REQUEST_ID) or str(
+            uuid.uuid4()
         )
+        # request.state хранится в scope["state"]
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_context.set(request_id)
+        client = scope.get("client")
+        client_ip_token = client_ip_context.set(client[0] if client else None)
+
+        start_time = time.perf_counter()
+        status_code = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    RequestTracing.HEADER_REQUEST_ID, request_id
+                )
+            await send(message)
 
         try:
-            # Выполняем запрос
-            response = await call_next(request)
-
-            # Вычисляем время выполнения
-            duration_ms = (time.time() - start_time) * 1000
-
-            # Логируем завершение запроса
-            log_api_request(
-                request=request,
-                logger=self.logger,
-                method=method,
-                path=path,
-                status_code=response.status_code,
-                duration_ms=duration_ms,
-            )
-
-            return response
-
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Логируем ошибку
-            duration_ms = (time.time() - start_time) * 1000
-
+            connection = HTTPConnection(scope)
             self.logger.error(
-                f"API Request failed: {method} {path}",
+                f"API Request failed: {scope['method']} {scope['path']}",
                 event_type="api_request_error",
-                method=method,
-                path=path,
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code or 500,
                 error_type=type(e).__name__,
                 error_message=str(e),
-                duration_ms=duration_ms,
-                client_ip=request.client.host if request.client else None,
+                duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+                client_ip=connection.client.host if connection.client else None,
             )
-
-            # Повторно поднимаем исключение
             raise
+        else:
+            log_api_request(
+                request=HTTPConnection(scope),
+                logger=self.logger,
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration_ms=(time.perf_counter() - start_time) * 1000,
+            )
+        finally:
+            request_context.reset(token)
+            client_ip_context.reset(client_ip_token)
@@ -0,0 +1,127 @@
+"""
+Выделенный пул потоков для хеширования и проверки паролей.
+Выносит CPU-нагрузку bcrypt из event loop и ограничивает очередь ожидания.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Self, TypeVar
+
+from core.config import settings
+from core.exceptions import ServiceUnavailableError
+
+T = TypeVar("T")
+
+
+class PasswordHashingExecutor:
+    """
+    Пул потоков для операций с паролями.
+    Принимает не больше max_workers + max_queue_size задач одновременно,
+    при переполнении сразу отвечает ServiceUnavailableError (503).
+    """
+
+    def __init__(
+        self: Self,
+        max_workers: int = 4,
+        max_queue_size: int = 32,
+        retry_after: int | None = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+
+        # Задача освобождает место по завершении в потоке пула, а не при отмене
+        # ожидающей корутины, поэтому счетчики защищены блокировкой
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+
+    @property
+    def queue_depth(self: Self) -> int:
+        """Количество задач, ожидающих свободный поток"""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self: Self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Выполняет функцию в пуле потоков.
+
+        Args:
+            func: Синхронная функция (хеширование или проверка пароля)
+            *args: Аргументы функции
+
+        Returns:
+            Результат выполнения функции
+
+        Raises:
+            ServiceUnavailableError: Если очередь пула заполнена
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue_size:
+                self._rejected += 1
+                raise ServiceUnavailableError(retry_after=self.retry_after)
+            self._in_flight += 1
+
+        submitted_at = time.perf_counter()
+
+        def job() -> T:
+            wait_ms = (time.perf_counter() - submitted_at) * 1000
+            with self._lock:
+                self._total_wait_ms += wait_ms
+                self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+            return func(*args)
+
+        try:
+            future = self._executor.submit(job)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        # Отмена корутины отменяет только еще не начатую задачу;
+        # начатое хеширование занимает место в пуле до своего завершения
+        return await asyncio.wrap_future(future)
+
+    def _release(self: Self, future: Future | None) -> None:
+        """Освобождает место в пуле по завершении (или отмене) задачи"""
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None and not future.cancelled():
+                self._completed += 1
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        """
+        Метрики пула: глубина очереди и время ожидания потока.
+
+        Returns:
+            Словарь с метриками
+        """
+        avg_wait_ms = self._total_wait_ms / self._completed if self._completed else 0.0
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(avg_wait_ms, 2),
+            "max_wait_ms": round(self._max_wait_ms, 2),
+        }
+
+    def shutdown(self: Self) -> None:
+        """Останавливает пул, дожидаясь завершения текущих задач"""
+        self._executor.shutdown(wait=True)
+
+
+password_executor = PasswordHashingExecutor(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
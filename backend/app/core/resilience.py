@@ -0,0 +1,313 @@
+"""
+Защита от деградации внешних сервисов (Google, SMTP).
+Каждый вызов ограничен таймаутом, повторы расходуют общий бюджет,
+а circuit breaker при серии ошибок сразу отвечает 503, не занимая воркеры.
+"""
+
+import asyncio
+import math
+import random
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, Self, TypeVar
+
+from core.exceptions import ExternalServiceError, ServiceUnavailableError
+from core.logger import get_logger
+
+T = TypeVar("T")
+
+log = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker с полуоткрытым состоянием.
+    После failure_threshold ошибок подряд вызовы отклоняются recovery_timeout секунд,
+    затем пропускается half_open_max_calls пробных вызовов: успех закрывает цепь,
+    ошибка снова открывает ее.
+    """
+
+    def __init__(
+        self: Self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._rejected = 0
+
+    @property
+    def state(self: Self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _transition(self: Self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        log.warning(
+            f"Circuit breaker {self.name}: {self._state.value} -> {state.value}",
+            event_type="circuit_breaker",
+            dependency=self.name,
+            state=state.value,
+        )
+        self._state = state
+        self._half_open_calls = 0
+        if state in (CircuitState.OPEN, CircuitState.HALF_OPEN):
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._failures = 0
+
+    def before_call(self: Self) -> None:
+        """
+        Проверяет, можно ли выполнить вызов.
+
+        Raises:
+            ServiceUnavailableError: Если цепь открыта или пробные вызовы уже идут
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        if state == CircuitState.HALF_OPEN:
+            # Пробный вызов мог быть отменен без результата - разрешаем новый
+            if time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._half_open_calls = 0
+                self._opened_at = time.monotonic()
+            if self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return
+
+        self._rejected += 1
+        retry_after = self.recovery_timeout - (time.monotonic() - self._opened_at)
+        raise ServiceUnavailableError(
+            f"Сервис {self.name} временно недоступен",
+            retry_after=max(1, math.ceil(retry_after)),
+        )
+
+    def record_success(self: Self) -> None:
+        self._failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self: Self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.HALF_OPEN or (
+            self._state == CircuitState.CLOSED
+            and self._failures >= self.failure_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "rejected": self._rejected,
+        }
+
+
+class RetryBudget:
+    """
+    Бюджет повторов: каждый вызов пополняет его на ratio, каждый повтор
+    тратит единицу, плюс min_per_second повторов в секунду при малой нагрузке.
+    При массовых отказах доля повторов не превышает ratio от трафика.
+    """
+
+    def __init__(
+        self: Self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_balance: float = 10.0,
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance
+        self._balance = max_balance
+        self._updated_at = time.monotonic()
+        self._exhausted = 0
+
+    def _refill(self: Self) -> None:
+        now = time.monotonic()
+        self._balance = min(
+            self.max_balance,
+            self._balance + (now - self._updated_at) * self.min_per_second,
+        )
+        self._updated_at = now
+
+    def deposit(self: Self) -> None:
+        self._refill()
+        self._balance = min(self.max_balance, self._balance + self.ratio)
+
+    def try_withdraw(self: Self) -> bool:
+        self._refill()
+        if self._balance >= 1:
+            self._balance -= 1
+            return True
+        self._exhausted += 1
+        return False
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        self._refill()
+        return {"balance": round(self._balance, 2), "exhausted": self._exhausted}
+
+
+class ExternalDependency:
+    """
+    Обертка вызовов внешнего сервиса: таймаут на попытку, повторы с
+    экспоненциальной задержкой и jitter в пределах бюджета, circuit breaker.
+    Ошибки, для которых is_failure возвращает False (например, 4xx),
+    не повторяются и не влияют на состояние цепи.
+    """
+
+    def __init__(
+        self: Self,
+        name: str,
+        timeout: float,
+        breaker: CircuitBreaker,
+        retry_budget: RetryBudget,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ) -> None:
+        self.name = name
+        self.timeout = timeout
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.is_failure = is_failure or (lambda e: True)
+
+        self._calls = 0
+        self._failures = 0
+        self._retries = 0
+        self._timeouts = 0
+
+    def _backoff(self: Self, attempt: int) -> float:
+        """Full jitter: случайная задержка до base * 2^attempt"""
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        )
+
+    async def call(
+        self: Self, func: Callable[..., Awaitable[T]], *args: Any, retry: bool = True
+    ) -> T:
+        """
+        Выполняет вызов внешнего сервиса.
+
+        Args:
+            func: Асинхронная функция вызова
+            *args: Аргументы функции
+            retry: Разрешены ли повторы (False для неидемпотентных вызовов)
+
+        Returns:
+            Результат функции
+
+        Raises:
+            ServiceUnavailableError: Если цепь открыта
+            ExternalServiceError: Если попытка не уложилась в таймаут
+        """
+        self._calls += 1
+        self.retry_budget.deposit()
+        attempt = 0
+
+        while True:
+            self.breaker.before_call()
+            try:
+                async with asyncio.timeout(self.timeout):
+                    result = await func(*args)
+            except TimeoutError as e:
+                self._timeouts += 1
+                error: Exception = ExternalServiceError(
+                    self.name, f"нет ответа за {self.timeout} с"
+                )
+                error.__cause__ = e
+            except Exception as e:
+                if not self.is_failure(e):
+                    self.breaker.record_success()
+                    raise
+                error = e
+            else:
+                self.breaker.record_success()
+                return result
+
+            self._failures += 1
+            self.breaker.record_failure()
+            attempt += 1
+            if (
+                not retry
+                or attempt > self.max_retries
+                or not self.retry_budget.try_withdraw()
+            ):
+                raise error
+            self._retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        return {
+            "calls": self._calls,
+            "failures": self._failures,
+            "retries": self._retries,
+            "timeouts": self._timeouts,
+            "circuit": self.breaker.get_metrics(),
+            "retry_budget": self.retry_budget.get_metrics(),
+        }
+
+
+class DependencyRegistry:
+    """Реестр внешних зависимостей для метрик"""
+
+    def __init__(self: Self) -> None:
+        self._dependencies: Dict[str, ExternalDependency] = {}
+
+    def register(self: Self, dependency: ExternalDependency) -> ExternalDependency:
+        self._dependencies[dependency.name] = dependency
+        return dependency
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        return {
+            name: dependency.get_metrics()
+            for name, dependency in self._dependencies.items()
+        }
+
+
+def create_dependency(
+    name: str,
+    timeout: float,
+    failure_threshold: int,
+    recovery_timeout: float,
+    max_retries: int,
+    is_failure: Optional[Callable[[Exception], bool]] = None,
+) -> ExternalDependency:
+    """Создание зависимости с регистрацией в реестре метрик"""
+    return external_dependencies.register(
+        ExternalDependency(
+            name=name,
+            timeout=timeout,
+            breaker=CircuitBreaker(name, failure_threshold, recovery_timeout),
+            retry_budget=RetryBudget(),
+            max_retries=max_retries,
+            is_failure=is_failure,
+        )
+    )
+
+
+external_dependencies = DependencyRegistry()
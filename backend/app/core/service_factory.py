@@ -1,12 +1,15 @@
 """
-Фабрика сервисов для создания всех сервисов с их зависимостями.
+Фабрика сервисов: регистрация всех сервисов и их зависимостей в DI контейнере.
 Содержит всю логику создания сервисов в одном месте.
 """
 
+from core.container import DIContainer, Lifetime
+from core.http_client import HTTPClientRegistry, http_clients
+from services.auth.google import GoogleOAuthClient, google_oauth
 from services.auth.repositories.auth import AuthRepository
 from services.auth.repositories.token_refresh import RefreshTokenRepository
 from services.auth.service import AuthService
-from sqlalchemy.ext.asyncio import AsyncSession
+from services.email.repositories.outbox import EmailOutboxRepository
 
 
 class ServiceFactory:
@@ -16,19 +19,25 @@ class ServiceFactory:
     """
 
     @staticmethod
-    def create_auth_service(session: AsyncSession) -> AuthService:
+    def register_services(container: DIContainer) -> None:
         """
-        Создает сервис аутентификации со всеми зависимостями.
+        Регистрирует сервисы приложения и строит планы их создания.
+        Сессия БД не регистрируется - она передается в get_service(session=...).
 
         Args:
-            session: Асинхронная сессия БД
-
-        Returns:
-            Настроенный AuthService
+            container: DI контейнер
         """
-        auth_repo = AuthRepository(session)
-        refresh_token_repo = RefreshTokenRepository(session)
+        container.register_singleton(HTTPClientRegistry, http_clients)
+        container.register_singleton(GoogleOAuthClient, google_oauth)
 
-        return AuthService(
-            session=session, auth_repo=auth_repo, refresh_token_repo=refresh_token_repo
+        # Репозитории держат сессию запроса, поэтому живут в пределах запроса
+        container.register_factory(AuthRepository, AuthRepository, Lifetime.SCOPED)
+        container.register_factory(
+            RefreshTokenRepository, RefreshTokenRepository, Lifetime.SCOPED
+        )
+        container.register_factory(
+            EmailOutboxRepository, EmailOutboxRepository, Lifetime.SCOPED
         )
+        container.register_factory(AuthService, AuthService, Lifetime.SCOPED)
+
+        container.compile()
@@ -0,0 +1,226 @@
+"""
+Пул постоянных SMTP соединений.
+Соединение (TCP + STARTTLS + AUTH) открывается один раз и используется для многих писем,
+простаивающие соединения проверяются NOOP, оборванные - переоткрываются.
+"""
+
+import asyncio
+import time
+from email.message import EmailMessage
+from typing import Any, Dict, Optional, Self
+
+import aiosmtplib
+from core.config import settings
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class PooledSMTPConnection:
+    """SMTP соединение пула со счетчиками использования"""
+
+    def __init__(self: Self, client: aiosmtplib.SMTP) -> None:
+        self.client = client
+        self.messages_sent = 0
+        self.last_used_at = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Пул SMTP соединений.
+    Одновременно используется не больше max_connections соединений,
+    остальные отправители ждут свободное. Соединение, простоявшее дольше
+    health_check_interval, перед отправкой проверяется NOOP, дольше idle_timeout -
+    закрывается и открывается заново.
+    """
+
+    def __init__(
+        self: Self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        start_tls: bool = True,
+        timeout: float = 30,
+        max_connections: int = 4,
+        max_messages_per_connection: int = 100,
+        health_check_interval: float = 30,
+        idle_timeout: float = 300,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.health_check_interval = health_check_interval
+        self.idle_timeout = idle_timeout
+
+        self._idle: list[PooledSMTPConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._connects = 0
+        self._connect_failures = 0
+        self._reconnects = 0
+        self._sent = 0
+        self._failed = 0
+
+    @property
+    def semaphore(self: Self) -> asyncio.Semaphore:
+        # Создается в работающем event loop при первой отправке
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        return self._semaphore
+
+    async def _connect(self: Self) -> PooledSMTPConnection:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        try:
+            await client.connect()
+        except Exception:
+            self._connect_failures += 1
+            client.close()
+            raise
+        self._connects += 1
+        return PooledSMTPConnection(client)
+
+    @staticmethod
+    async def _close(connection: PooledSMTPConnection) -> None:
+        try:
+            await connection.client.quit()
+        except Exception:
+            connection.client.close()
+
+    async def _is_alive(self: Self, connection: PooledSMTPConnection) -> bool:
+        """Проверяет соединение: простоявшее дольше health_check_interval - через NOOP"""
+        if not connection.client.is_connected:
+            return False
+        idle_for = time.monotonic() - connection.last_used_at
+        if idle_for >= self.idle_timeout:
+            return False
+        if idle_for < self.health_check_interval:
+            return True
+        try:
+            await connection.client.noop()
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self: Self) -> PooledSMTPConnection:
+        """Берет живое соединение из пула или открывает новое"""
+        while self._idle:
+            connection = self._idle.pop()
+            if await self._is_alive(connection):
+                return connection
+            self._reconnects += 1
+            await self._close(connection)
+        return await self._connect()
+
+    async def _release(self: Self, connection: PooledSMTPConnection) -> None:
+        """Возвращает соединение в пул или закрывает его по лимиту писем"""
+        connection.last_used_at = time.monotonic()
+        if (
+            connection.client.is_connected
+            and connection.messages_sent < self.max_messages_per_connection
+        ):
+            self._idle.append(connection)
+        else:
+            await self._close(connection)
+
+    async def send(self: Self, message: EmailMessage) -> None:
+        """
+        Отправляет письмо через соединение из пула.
+        Если переиспользованное соединение оказалось оборванным,
+        письмо повторяется один раз через новое соединение.
+
+        Args:
+            message: Письмо
+
+        Raises:
+            aiosmtplib.SMTPException: Если сервер отклонил письмо или недоступен
+        """
+        async with self.semaphore:
+            for attempt in range(2):
+                try:
+                    connection = await self._acquire()
+                except (aiosmtplib.SMTPException, OSError):
+                    # Сервер недоступен - письмо не отправлено
+                    self._failed += 1
+                    raise
+                reused = connection.messages_sent > 0
+                try:
+                    await connection.client.send_message(message)
+                except (
+                    aiosmtplib.SMTPResponseException,
+                    aiosmtplib.SMTPRecipientsRefused,
+                ):
+                    # Сервер ответил ошибкой или отклонил получателей -
+                    # соединение рабочее, письмо нет
+                    self._failed += 1
+                    await self._release(connection)
+                    raise
+                except asyncio.CancelledError:
+                    # Отмена по таймауту посреди диалога - состояние соединения неизвестно
+                    connection.client.close()
+                    raise
+                except (aiosmtplib.SMTPException, OSError):
+                    connection.client.close()
+                    if attempt == 0 and reused:
+                        self._reconnects += 1
+                        continue
+                    self._failed += 1
+                    raise
+
+                connection.messages_sent += 1
+                self._sent += 1
+                await self._release(connection)
+                return
+
+    def get_metrics(self: Self) -> Dict[str, Any]:
+        """
+        Метрики пула: соединения и отправленные письма.
+
+        Returns:
+            Словарь с метриками
+        """
+        return {
+            "max_connections": self.max_connections,
+            "idle_connections": len(self._idle),
+            "connects": self._connects,
+            "connect_failures": self._connect_failures,
+            "reconnects": self._reconnects,
+            "sent": self._sent,
+            "failed": self._failed,
+        }
+
+    async def close(self: Self) -> None:
+        """Закрывает все простаивающие соединения (QUIT)"""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._close(connection) for connection in idle))
+        log.info("SMTP connection pool closed", **self.get_metrics())
+
+
+smtp_pool = SMTPConnectionPool(
+    hostname=settings.MAIL_SERVER,
+    port=settings.MAIL_PORT,
+    username=settings.MAIL_USERNAME,
+    password=settings.MAIL_PASSWORD,
+    use_tls=settings.MAIL_SSL_TLS,
+    start_tls=settings.MAIL_STARTTLS,
+    timeout=settings.MAIL_TIMEOUT,
+    max_connections=settings.MAIL_POOL_SIZE,
+    max_messages_per_connection=settings.MAIL_POOL_MAX_MESSAGES_PER_CONNECTION,
+    health_check_interval=settings.MAIL_POOL_HEALTH_CHECK_SECONDS,
+    idle_timeout=settings.MAIL_POOL_IDLE_TIMEOUT_SECONDS,
+)
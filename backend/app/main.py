@@ -1,15 +1,63 @@
+from contextlib import asynccontextmanager
+
 from api.v1.router import api_v1_router
 from core.config import settings
 from core.exception_handler import register_exception_handlers
-from core.logger import get_logger
-from core.logging_middleware import APILoggingMiddleware
+from core.http_client import http_clients
+from core.logger import get_logger, shutdown_logging, start_logging
+from core.logging_middleware import RequestContextMiddleware
+from core.password_executor import password_executor
+from core.smtp_pool import smtp_pool
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from services.auth.hashers import password_hashers
+from services.auth.token_reaper import refresh_token_reaper
+from services.email.outbox_worker import email_outbox_worker
+from utils.log_helper import log_sampler
 
 # Создаем централизованный логгер для приложения
 log = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Фоновая запись логов могла быть остановлена предыдущим lifespan
+    start_logging()
+    log_sampler.start()
+    if settings.PASSWORD_HASH_CALIBRATE:
+        # Подбираем стоимость хеширования под текущее железо
+        params = await password_executor.run(
+            password_hashers.calibrate, settings.PASSWORD_HASH_TARGET_MS
+        )
+        log.info(
+            "Password hashing cost calibrated",
+            scheme=password_hashers.default_scheme,
+            target_ms=settings.PASSWORD_HASH_TARGET_MS,
+            **params,
+        )
+    # Без партиций на ближайшие недели вставка refresh токенов уходит в DEFAULT
+    # партицию; ошибка здесь останавливает запуск приложения
+    created = await refresh_token_reaper.ensure_partitions()
+    if created:
+        log.info("Refresh token partitions created", partitions=created)
+    refresh_token_reaper.start()
+    if settings.EMAIL_OUTBOX_ENABLED:
+        email_outbox_worker.start()
+    yield
+    await email_outbox_worker.stop()
+    await smtp_pool.close()
+    await http_clients.aclose()
+    await refresh_token_reaper.stop()
+    # Дожидаемся завершения операций с паролями
+    password_executor.shutdown()
+    # Пишем сводки по отказам и дописываем накопленные в очереди логи
+    await log_sampler.stop()
+    log_sampler.flush()
+    shutdown_logging()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     docs_url="/api/docs",
     redoc_url=None,
     openapi_url="/api/openapi.json",
@@ -17,9 +65,6 @@ app = FastAPI(
 
 ALLOW_ORIGINS = [settings.DOMAIN]
 
-# API логирование middleware (добавляем перед CORS)
-app.add_middleware(APILoggingMiddleware)
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOW_ORIGINS,
@@ -28,6 +73,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# request_id и логирование запросов (добавляется последним - внешний слой)
+app.add_middleware(RequestContextMiddleware)
+
 # Регистрация обработчиков исключений
 register_exception_handlers(app)
 
@@ -0,0 +1,125 @@
+"""users email lower unique index
+
+Revision ID: 6237b1eea608
+Revises: 821bd763ebb4
+Create Date: 2026-10-18 09:30:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6237b1eea608"
+down_revision: Union[str, None] = "821bd763ebb4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_users_email_lower"
+
+# Сколько групп дубликатов показывать в сообщении об ошибке
+DUPLICATES_REPORT_LIMIT = 20
+
+
+def check_email_duplicates() -> None:
+    """
+    Проверяет, что email уникальны без учета регистра.
+    Иначе построение индекса упадет и оставит INVALID индекс,
+    поэтому дубликаты нужно объединить или удалить до миграции.
+    """
+    if op.get_context().as_sql:
+        return
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT lower(trim(email)) AS email, count(*) AS users, "
+                "array_agg(id::text ORDER BY id) AS user_ids "
+                "FROM users GROUP BY lower(trim(email)) HAVING count(*) > 1 "
+                "ORDER BY count(*) DESC, 1"
+            )
+        )
+        .all()
+    )
+    if not duplicates:
+        return
+
+    report = "\n".join(
+        f"  {row.email}: {row.users} users ({', '.join(row.user_ids)})"
+        for row in duplicates[:DUPLICATES_REPORT_LIMIT]
+    )
+    if len(duplicates) > DUPLICATES_REPORT_LIMIT:
+        report += f"\n  ... and {len(duplicates) - DUPLICATES_REPORT_LIMIT} more"
+    raise RuntimeError(
+        f"{len(duplicates)} emails are used by several users when compared "
+        f"case-insensitively. Merge or remove the duplicate accounts before "
+        f"building {INDEX_NAME}:\n{report}"
+    )
+
+
+def drop_invalid_index() -> None:
+    """Удаляет INVALID индекс, оставшийся от прерванного CREATE INDEX CONCURRENTLY"""
+    if op.get_context().as_sql:
+        # В offline режиме состояние индекса неизвестно
+        op.drop_index(
+            INDEX_NAME,
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        return
+    invalid = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": INDEX_NAME},
+        )
+        .scalar()
+    )
+    if invalid:
+        op.drop_index(
+            INDEX_NAME,
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    check_email_duplicates()
+
+    # Приводим существующие email к каноническому виду
+    op.execute(
+        "UPDATE users SET email = lower(trim(email)) "
+        "WHERE email <> lower(trim(email))"
+    )
+
+    # CONCURRENTLY не блокирует запись в users, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        drop_invalid_index()
+        op.create_index(
+            INDEX_NAME,
+            "users",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="users",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,58 @@
+"""refresh tokens selector verifier
+
+Revision ID: 3ebad3c258b4
+Revises: 6237b1eea608
+Create Date: 2026-10-18 10:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3ebad3c258b4"
+down_revision: Union[str, None] = "6237b1eea608"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens", sa.Column("selector", sa.String(length=32), nullable=True)
+    )
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("verifier_hash", sa.LargeBinary(length=32), nullable=True),
+    )
+
+    # Выданные токены остаются валидными: selector - первые 16 символов,
+    # verifier - остаток строки (см. split_refresh_token)
+    op.execute(
+        "UPDATE refresh_tokens SET selector = left(token, 16), "
+        "verifier_hash = sha256(convert_to(substr(token, 17), 'UTF8'))"
+    )
+    op.alter_column("refresh_tokens", "selector", nullable=False)
+    op.alter_column("refresh_tokens", "verifier_hash", nullable=False)
+
+    op.drop_index(op.f("ix_refresh_tokens_token"), table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "token")
+    op.create_index(
+        op.f("ix_refresh_tokens_selector"), "refresh_tokens", ["selector"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Исходные строки токенов не восстановить по хешу - пользователи войдут заново
+    op.execute("DELETE FROM refresh_tokens")
+
+    op.drop_index(op.f("ix_refresh_tokens_selector"), table_name="refresh_tokens")
+    op.add_column("refresh_tokens", sa.Column("token", sa.String(), nullable=False))
+    op.create_index(
+        op.f("ix_refresh_tokens_token"), "refresh_tokens", ["token"], unique=True
+    )
+    op.drop_column("refresh_tokens", "verifier_hash")
+    op.drop_column("refresh_tokens", "selector")
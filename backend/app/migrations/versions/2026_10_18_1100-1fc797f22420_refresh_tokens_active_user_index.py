@@ -0,0 +1,40 @@
+"""refresh tokens active user index
+
+Revision ID: 1fc797f22420
+Revises: 3ebad3c258b4
+Create Date: 2026-10-18 11:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1fc797f22420"
+down_revision: Union[str, None] = "3ebad3c258b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_refresh_tokens_user_id_active",
+            "refresh_tokens",
+            ["user_id", "created_at"],
+            postgresql_where=sa.text("NOT revoked"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_refresh_tokens_user_id_active",
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+        )
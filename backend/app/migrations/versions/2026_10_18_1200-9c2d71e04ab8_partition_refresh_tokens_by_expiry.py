@@ -0,0 +1,128 @@
+"""partition refresh tokens by expiry
+
+Revision ID: 9c2d71e04ab8
+Revises: 1fc797f22420
+Create Date: 2026-10-18 12:00:00.000000+00:00
+
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2d71e04ab8"
+down_revision: Union[str, None] = "1fc797f22420"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Дальнейшие партиции создает RefreshTokenReaper с теми же границами и именами
+PARTITION_INTERVAL = timedelta(days=7)
+PARTITIONS_AHEAD = 2
+# Принимает токены вне созданных диапазонов, если партиции не были созданы вовремя
+DEFAULT_PARTITION = "refresh_tokens_default"
+
+COLUMNS = "id, user_id, selector, verifier_hash, expires_at, created_at, revoked"
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("selector", sa.String(length=32), nullable=False),
+        sa.Column("verifier_hash", sa.LargeBinary(length=32), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("revoked", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    ]
+
+
+def _partition_start(moment: datetime) -> datetime:
+    day = moment.astimezone(timezone.utc).date()
+    monday = day - timedelta(days=day.weekday())
+    return datetime.combine(monday, time.min, tzinfo=timezone.utc)
+
+
+def _detach_old_table() -> None:
+    """Переименовывает текущую таблицу, освобождая имена ее индексов"""
+    op.rename_table("refresh_tokens", "refresh_tokens_old")
+    op.execute("ALTER INDEX refresh_tokens_pkey RENAME TO refresh_tokens_old_pkey")
+    op.drop_index("ix_refresh_tokens_user_id_active", table_name="refresh_tokens_old")
+    op.drop_index(op.f("ix_refresh_tokens_selector"), table_name="refresh_tokens_old")
+
+
+def _create_active_user_index() -> None:
+    op.create_index(
+        "ix_refresh_tokens_user_id_active",
+        "refresh_tokens",
+        ["user_id", "created_at"],
+        postgresql_where=sa.text("NOT revoked"),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _detach_old_table()
+
+    op.create_table(
+        "refresh_tokens",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "expires_at"),
+        postgresql_partition_by="RANGE (expires_at)",
+    )
+    # Уникальный индекс обязан включать expires_at, поэтому selector без UNIQUE
+    op.create_index(op.f("ix_refresh_tokens_selector"), "refresh_tokens", ["selector"])
+    _create_active_user_index()
+
+    now, last_expiry = (
+        op.get_bind()
+        .execute(sa.text("SELECT now(), max(expires_at) FROM refresh_tokens_old"))
+        .one()
+    )
+    start = _partition_start(now)
+    horizon = max(last_expiry or now, now) + PARTITION_INTERVAL * PARTITIONS_AHEAD
+    while start < horizon:
+        end = start + PARTITION_INTERVAL
+        op.execute(
+            f"CREATE TABLE refresh_tokens_p{start:%Y%m%d} PARTITION OF refresh_tokens "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF refresh_tokens DEFAULT")
+
+    # Истекшие токены не переносим - они все равно не принимаются
+    op.execute(
+        f"INSERT INTO refresh_tokens ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM refresh_tokens_old WHERE expires_at > now()"
+    )
+    op.drop_table("refresh_tokens_old")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _detach_old_table()
+
+    op.create_table(
+        "refresh_tokens",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_selector"), "refresh_tokens", ["selector"], unique=True
+    )
+    _create_active_user_index()
+
+    op.execute(
+        f"INSERT INTO refresh_tokens ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM refresh_tokens_old WHERE expires_at > now()"
+    )
+    # Партиции удаляются вместе с родительской таблицей
+    op.drop_table("refresh_tokens_old")
@@ -0,0 +1,82 @@
+"""add email outbox
+
+Revision ID: 5e0a8f3b7c19
+Revises: 9c2d71e04ab8
+Create Date: 2026-10-18 13:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0a8f3b7c19"
+down_revision: Union[str, None] = "9c2d71e04ab8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    sa.Enum("VERIFICATION", "PASSWORD_RESET", name="email_kind_enum").create(
+        op.get_bind()
+    )
+    sa.Enum("PENDING", "SENT", "FAILED", name="email_status_enum").create(op.get_bind())
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "kind",
+            postgresql.ENUM(
+                "VERIFICATION",
+                "PASSWORD_RESET",
+                name="email_kind_enum",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("recipient", sa.String(length=256), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING", "SENT", "FAILED", name="email_status_enum", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_email_outbox_pending",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_email_outbox_pending", table_name="email_outbox")
+    op.drop_table("email_outbox")
+    sa.Enum("PENDING", "SENT", "FAILED", name="email_status_enum").drop(op.get_bind())
+    sa.Enum("VERIFICATION", "PASSWORD_RESET", name="email_kind_enum").drop(
+        op.get_bind()
+    )
@@ -0,0 +1,49 @@
+"""email outbox retention
+
+Revision ID: b41f6d2c9e57
+Revises: 5e0a8f3b7c19
+Create Date: 2026-10-18 14:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b41f6d2c9e57"
+down_revision: Union[str, None] = "5e0a8f3b7c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "email_outbox",
+        "payload",
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        nullable=True,
+    )
+    # Токены в уже обработанных письмах больше не нужны
+    op.execute("UPDATE email_outbox SET payload = NULL WHERE status <> 'PENDING'")
+    op.create_index(
+        "ix_email_outbox_finished",
+        "email_outbox",
+        ["created_at"],
+        postgresql_where=sa.text("status <> 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_email_outbox_finished", table_name="email_outbox")
+    op.execute("UPDATE email_outbox SET payload = '{}'::jsonb WHERE payload IS NULL")
+    op.alter_column(
+        "email_outbox",
+        "payload",
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        nullable=False,
+    )
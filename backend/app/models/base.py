@@ -3,12 +3,14 @@ from datetime import datetime
 from enum import Enum
 
 from core.database import Base
-from sqlalchemy import ForeignKey, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import ForeignKey, Index, LargeBinary, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.functions import func
 from sqlalchemy.sql.sqltypes import Boolean, DateTime
 from sqlalchemy.sql.sqltypes import Enum as SqlEnum
+from sqlalchemy.sql.sqltypes import Integer
+from utils.uuid7 import uuid7
 
 
 class UserRole(str, Enum):
@@ -19,7 +21,7 @@ class UserRole(str, Enum):
 class UserModel(Base):
     __tablename__ = "users"
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     username: Mapped[str] = mapped_column(String(128), nullable=False)
     password: Mapped[str] = mapped_column(String(256), nullable=False)
@@ -29,6 +31,10 @@ class UserModel(Base):
     role: Mapped[UserRole] = mapped_column(
         SqlEnum(UserRole, name="user_role_enum"), default=UserRole.USER, nullable=False
     )
+    # Увеличивается при смене пароля, делает выданные access токены устаревшими
+    token_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     refresh_tokens: Mapped[list["RefreshTokenModel"]] = relationship(
         back_populates="user",
@@ -36,18 +42,28 @@ class UserModel(Base):
     )
 
 
+# Уникальность email без учета регистра, по этому индексу идут все поиски по email
+Index("ix_users_email_lower", func.lower(UserModel.email), unique=True)
+
+
 class RefreshTokenModel(Base):
     __tablename__ = "refresh_tokens"
+    # Недельные партиции по expires_at создает и удаляет RefreshTokenReaper
+    __table_args__ = {"postgresql_partition_by": "RANGE (expires_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    token: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    # Токен выдается как selector.verifier, в БД хранится только SHA-256 от verifier.
+    # Уникальный индекс секционированной таблицы должен включать ключ секционирования,
+    # поэтому selector (96 случайных бит) индексируется без UNIQUE
+    selector: Mapped[str] = mapped_column(String(32), index=True, nullable=False)
+    verifier_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), primary_key=True, nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -57,3 +73,76 @@ class RefreshTokenModel(Base):
     user: Mapped["UserModel"] = relationship(
         back_populates="refresh_tokens", lazy="selectin"
     )
+
+
+# Активные сессии пользователя: выдача токена, лимит сессий и /auth/sessions
+Index(
+    "ix_refresh_tokens_user_id_active",
+    RefreshTokenModel.user_id,
+    RefreshTokenModel.created_at,
+    postgresql_where=text("NOT revoked"),
+)
+
+
+class EmailKind(str, Enum):
+    VERIFICATION = "verification"
+    PASSWORD_RESET = "password_reset"
+
+
+class EmailStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutboxModel(Base):
+    """
+    Исходящее письмо (transactional outbox).
+    Пишется в одной транзакции с изменением пользователя, отправляется EmailOutboxWorker
+    """
+
+    __tablename__ = "email_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid7
+    )
+    kind: Mapped[EmailKind] = mapped_column(
+        SqlEnum(EmailKind, name="email_kind_enum"), nullable=False
+    )
+    recipient: Mapped[str] = mapped_column(String(256), nullable=False)
+    # Параметры шаблона письма (например, токен для ссылки).
+    # Очищается после отправки или исчерпания попыток, чтобы токены не хранились в БД
+    payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    status: Mapped[EmailStatus] = mapped_column(
+        SqlEnum(EmailStatus, name="email_status_enum"),
+        default=EmailStatus.PENDING,
+        nullable=False,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    # Время следующей попытки; у захваченного письма - конец аренды воркера
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+# Очередь неотправленных писем для EmailOutboxWorker
+Index(
+    "ix_email_outbox_pending",
+    EmailOutboxModel.next_attempt_at,
+    postgresql_where=text("status = 'PENDING'"),
+)
+# Удаление обработанных писем по сроку хранения
+Index(
+    "ix_email_outbox_finished",
+    EmailOutboxModel.created_at,
+    postgresql_where=text("status <> 'PENDING'"),
+)
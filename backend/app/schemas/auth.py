@@ -1,3 +1,6 @@
+from datetime import datetime
+from uuid import UUID
+
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 
@@ -27,3 +30,11 @@ class ResetPasswordRequest(BaseModel):
 
 class GoogleLoginRequest(BaseModel):
     code: str
+
+
+class SessionInfo(BaseModel):
+    id: UUID
+    created_at: datetime
+    expires_at: datetime
+    current: bool = False
+    model_config = ConfigDict(from_attributes=True)
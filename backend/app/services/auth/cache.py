@@ -0,0 +1,51 @@
+"""
+Кеши аутентификации: пользователи (principal cache) и проверенные access токены.
+Позволяют get_current_user не обращаться к БД и не проверять подпись на каждый запрос.
+"""
+
+from core.cache import TTLCache
+from core.config import settings
+from schemas.user import UserBase
+
+# Ключ - email пользователя (sub в access токене)
+principal_cache: TTLCache[str, UserBase] = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Ключ - SHA-256 от строки токена, запись истекает вместе с exp токена
+access_token_cache: TTLCache[bytes, dict] = TTLCache(
+    max_size=settings.ACCESS_TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+# Последняя известная версия токенов пользователя: ключ - id пользователя.
+# Кеш локален для процесса, поэтому TTL ограничивает задержку отзыва
+# токенов, выполненного в другом процессе
+token_version_cache: TTLCache[str, int] = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.JWT_TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(email: str) -> None:
+    """
+    Сбрасывает закешированного пользователя.
+    Вызывается при любом изменении пользователя: пароля, верификации, роли.
+
+    Args:
+        email: Email пользователя
+    """
+    principal_cache.invalidate(email)
+
+
+def remember_token_version(user_id: str, token_version: int) -> None:
+    """
+    Запоминает актуальную версию токенов пользователя.
+    Access токены с меньшей версией считаются устаревшими.
+
+    Args:
+        user_id: ID пользователя
+        token_version: Текущее значение UserModel.token_version
+    """
+    token_version_cache.set(user_id, token_version)
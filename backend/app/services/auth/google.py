@@ -0,0 +1,287 @@
+"""
+Вход через Google: обмен кода на токены и локальная проверка id_token.
+Ключи подписи Google (JWKS) кешируются в памяти на время из Cache-Control
+и обновляются в фоне до истечения, поэтому вход не требует запроса userinfo.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional, Self
+
+import httpx
+import jwt
+from core.config import settings
+from core.constants import AuthErrorMessages
+from core.exceptions import ExternalServiceError
+from core.http_client import HTTPClientRegistry, http_clients
+from core.resilience import ExternalDependency, create_dependency
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# Google подписывает id_token только RSA ключами, алгоритм не берется из заголовка
+GOOGLE_ID_TOKEN_ALGORITHM = "RS256"
+GOOGLE_ID_TOKEN_KEY_TYPE = "RSA"
+GOOGLE_ID_TOKEN_REQUIRED_CLAIMS = ["exp", "iat", "iss", "aud", "sub"]
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def is_google_failure(error: Exception) -> bool:
+    """Ошибки, говорящие о деградации Google, а не о неверном запросе"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code >= 500 or status_code == 429
+    if isinstance(error, ExternalServiceError):
+        return error.status_code is None or error.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def cache_max_age(headers: httpx.Headers, default: int) -> int:
+    """Время жизни ответа в секундах по Cache-Control: max-age с учетом Age"""
+    match = _MAX_AGE_RE.search(headers.get("cache-control", ""))
+    if match is None:
+        return default
+    age = headers.get("age", "0")
+    return max(0, int(match.group(1)) - (int(age) if age.isdigit() else 0))
+
+
+class JWKSCache:
+    """
+    Кеш набора ключей JWKS.
+    Свежие ключи отдаются из памяти; за refresh_margin секунд до истечения
+    запускается фоновое обновление, истекший набор обновляется синхронно.
+    Неизвестный kid (ротация ключей) обновляет набор не чаще min_refresh_interval.
+    """
+
+    def __init__(
+        self: Self,
+        http_clients: HTTPClientRegistry,
+        dependency: ExternalDependency,
+        jwks_url: str,
+        default_max_age: int = 3600,
+        refresh_margin: int = 300,
+        min_refresh_interval: int = 60,
+    ) -> None:
+        self.http_clients = http_clients
+        self.dependency = dependency
+        self.jwks_url = jwks_url
+        self.default_max_age = default_max_age
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def lock(self: Self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _get_jwks(self: Self) -> httpx.Response:
+        response = await self.http_clients.get("google").get(self.jwks_url)
+        response.raise_for_status()
+        return response
+
+    async def _fetch(self: Self) -> None:
+        response = await self.dependency.call(self._get_jwks)
+        key_set = jwt.PyJWKSet.from_dict(response.json())
+
+        now = time.monotonic()
+        self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+        self._fetched_at = now
+        self._expires_at = now + cache_max_age(response.headers, self.default_max_age)
+
+    async def refresh(self: Self, force: bool = False) -> None:
+        """
+        Загружает набор ключей. Параллельные вызовы ждут одну загрузку.
+
+        Args:
+            force: Загрузить даже если набор еще не истек
+        """
+        async with self.lock:
+            now = time.monotonic()
+            if force:
+                if now - self._fetched_at < self.min_refresh_interval:
+                    return
+            elif now < self._expires_at:
+                return
+            await self._fetch()
+
+    async def _background_refresh(self: Self) -> None:
+        try:
+            async with self.lock:
+                await self._fetch()
+        except Exception:
+            # Текущий набор остается в силе, до истечения будет еще попытка
+            pass
+        finally:
+            self._refresh_task = None
+
+    async def get_key(self: Self, kid: str) -> jwt.PyJWK:
+        """
+        Получает ключ подписи по kid.
+
+        Raises:
+            jwt.InvalidTokenError: Если ключа с таким kid нет у Google
+            httpx.HTTPError: Если набор ключей не удалось загрузить
+        """
+        now = time.monotonic()
+        if now >= self._expires_at:
+            await self.refresh()
+        elif (
+            now >= self._expires_at - self.refresh_margin and self._refresh_task is None
+        ):
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+        key = self._keys.get(kid)
+        if key is None:
+            await self.refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Неизвестный kid: {kid}")
+        return key
+
+
+class GoogleOAuthClient:
+    """Клиент OAuth Google: адреса эндпоинтов задаются в конструкторе"""
+
+    def __init__(
+        self: Self,
+        http_clients: HTTPClientRegistry,
+        dependency: ExternalDependency,
+        jwks: JWKSCache,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str,
+        token_url: str,
+    ) -> None:
+        self.http_clients = http_clients
+        self.dependency = dependency
+        self.jwks = jwks
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.token_url = token_url
+
+    async def exchange_code(self: Self, code: str) -> Dict[str, Any]:
+        """
+        Обменивает код авторизации на токены.
+        Код одноразовый, поэтому запрос не повторяется.
+
+        Raises:
+            ExternalServiceError: Если Google не выдал токены
+            ServiceUnavailableError: Если Google недоступен (цепь открыта)
+        """
+        token_data = {
+            "code": code,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "redirect_uri": self.redirect_uri,
+            "grant_type": "authorization_code",
+        }
+        return await self.dependency.call(self._post_token, token_data, retry=False)
+
+    async def _post_token(self: Self, token_data: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            response = await self.http_clients.get("google").post(
+                self.token_url, data=token_data
+            )
+        except httpx.HTTPError as e:
+            raise ExternalServiceError(
+                "Google", AuthErrorMessages.GOOGLE_TOKEN_FAILED
+            ) from e
+
+        if response.status_code != 200:
+            raise ExternalServiceError(
+                "Google", AuthErrorMessages.GOOGLE_TOKEN_FAILED, response.status_code
+            )
+        return response.json()
+
+    async def verify_id_token(self: Self, id_token: str) -> Dict[str, Any]:
+        """
+        Проверяет подпись, аудиторию, издателя и срок id_token.
+        Принимается только RS256 и только RSA ключ JWKS с тем же алгоритмом.
+
+        Returns:
+            Claims токена
+
+        Raises:
+            ExternalServiceError: Если токен невалиден или ключи недоступны
+        """
+        try:
+            header = jwt.get_unverified_header(id_token)
+            if header.get("alg") != GOOGLE_ID_TOKEN_ALGORITHM:
+                raise jwt.InvalidAlgorithmError(
+                    f"Неподдерживаемый алгоритм: {header.get('alg')}"
+                )
+            key = await self.jwks.get_key(header.get("kid", ""))
+            if (
+                key.key_type != GOOGLE_ID_TOKEN_KEY_TYPE
+                or key.algorithm_name != GOOGLE_ID_TOKEN_ALGORITHM
+            ):
+                raise jwt.InvalidKeyError(
+                    f"Ключ {key.key_id} не подходит для {GOOGLE_ID_TOKEN_ALGORITHM}"
+                )
+            return jwt.decode(
+                id_token,
+                key,
+                algorithms=[GOOGLE_ID_TOKEN_ALGORITHM],
+                audience=self.client_id,
+                issuer=GOOGLE_ISSUERS,
+                options={"require": GOOGLE_ID_TOKEN_REQUIRED_CLAIMS},
+            )
+        except (jwt.PyJWTError, httpx.HTTPError) as e:
+            raise ExternalServiceError(
+                "Google", AuthErrorMessages.GOOGLE_ID_TOKEN_INVALID
+            ) from e
+
+    async def authenticate(self: Self, code: str) -> Dict[str, Any]:
+        """
+        Вход по коду авторизации без запроса userinfo.
+
+        Returns:
+            Claims проверенного id_token с подтвержденным email
+
+        Raises:
+            ExternalServiceError: При ошибке Google или отсутствии email
+        """
+        tokens = await self.exchange_code(code)
+        id_token = tokens.get("id_token")
+        if not id_token:
+            raise ExternalServiceError(
+                "Google", AuthErrorMessages.GOOGLE_ID_TOKEN_INVALID
+            )
+
+        claims = await self.verify_id_token(id_token)
+        if not claims.get("email") or not claims.get("email_verified"):
+            raise ExternalServiceError("Google", AuthErrorMessages.GOOGLE_EMAIL_MISSING)
+        return claims
+
+
+google_dependency = create_dependency(
+    "Google",
+    timeout=settings.GOOGLE_CALL_TIMEOUT_SECONDS,
+    failure_threshold=settings.EXTERNAL_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=settings.EXTERNAL_BREAKER_RECOVERY_SECONDS,
+    max_retries=settings.GOOGLE_MAX_RETRIES,
+    is_failure=is_google_failure,
+)
+
+google_oauth = GoogleOAuthClient(
+    http_clients=http_clients,
+    dependency=google_dependency,
+    jwks=JWKSCache(
+        http_clients=http_clients,
+        dependency=google_dependency,
+        jwks_url=settings.GOOGLE_JWKS_URL,
+        default_max_age=settings.GOOGLE_JWKS_DEFAULT_MAX_AGE,
+    ),
+    client_id=settings.GOOGLE_CLIENT_ID,
+    client_secret=settings.GOOGLE_CLIENT_SECRET,
+    redirect_uri=settings.GOOGLE_REDIRECT_URI,
+    token_url=settings.GOOGLE_TOKEN_URL,
+)
@@ -0,0 +1,246 @@
+"""
+Реестр алгоритмов хеширования паролей.
+Определяет схему по сохраненному хешу, сообщает о необходимости перехеширования
+и подбирает стоимость хеширования под заданный бюджет времени.
+"""
+
+import math
+import time
+from typing import Dict, Optional, Self
+
+import bcrypt
+from argon2 import PasswordHasher as Argon2PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from core.config import settings
+
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+class PasswordHasher:
+    """Базовый интерфейс алгоритма хеширования паролей"""
+
+    scheme: str = ""
+
+    def identify(self: Self, hashed_password: str) -> bool:
+        """Проверяет, создан ли хеш этим алгоритмом"""
+        raise NotImplementedError
+
+    def hash(self: Self, password: str) -> str:
+        """Создает хеш пароля с текущими параметрами"""
+        raise NotImplementedError
+
+    def verify(self: Self, password: str, hashed_password: str) -> bool:
+        """Проверяет пароль против хеша"""
+        raise NotImplementedError
+
+    def needs_rehash(self: Self, hashed_password: str) -> bool:
+        """Проверяет, устарели ли параметры сохраненного хеша"""
+        raise NotImplementedError
+
+    def calibrate(self: Self, target_ms: float) -> None:
+        """Подбирает стоимость хеширования под бюджет времени"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _measure_ms(func, *args) -> float:
+        started_at = time.perf_counter()
+        func(*args)
+        return (time.perf_counter() - started_at) * 1000
+
+
+class BcryptHasher(PasswordHasher):
+    """bcrypt с настраиваемым количеством раундов"""
+
+    scheme = "bcrypt"
+    prefixes = ("$2a$", "$2b$", "$2y$")
+    max_rounds = 31
+
+    def __init__(self: Self, rounds: int = 12, min_rounds: int = 10) -> None:
+        self.rounds = rounds
+        self.min_rounds = min_rounds
+
+    def identify(self: Self, hashed_password: str) -> bool:
+        return hashed_password.startswith(self.prefixes)
+
+    def hash(self: Self, password: str) -> str:
+        hashed = bcrypt.hashpw(
+            password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds)
+        )
+        return hashed.decode("utf-8")
+
+    def verify(self: Self, password: str, hashed_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(
+                password.encode("utf-8"), hashed_password.encode("utf-8")
+            )
+        except ValueError:
+            return False
+
+    def needs_rehash(self: Self, hashed_password: str) -> bool:
+        try:
+            stored_rounds = int(hashed_password.split("$")[2])
+        except (IndexError, ValueError):
+            return True
+        return stored_rounds < self.rounds
+
+    def calibrate(self: Self, target_ms: float) -> None:
+        # Каждый дополнительный раунд удваивает время хеширования
+        base_ms = self._measure_ms(
+            bcrypt.hashpw,
+            CALIBRATION_PASSWORD.encode("utf-8"),
+            bcrypt.gensalt(rounds=self.min_rounds),
+        )
+        extra_rounds = math.floor(math.log2(max(target_ms, 1) / max(base_ms, 0.001)))
+        self.rounds = min(self.max_rounds, self.min_rounds + max(0, extra_rounds))
+
+
+class Argon2Hasher(PasswordHasher):
+    """Argon2id (argon2-cffi)"""
+
+    scheme = "argon2"
+    prefix = "$argon2"
+    max_time_cost = 32
+
+    def __init__(
+        self: Self,
+        time_cost: int = 3,
+        memory_cost: int = 65536,
+        parallelism: int = 4,
+    ) -> None:
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._configure(time_cost)
+
+    def _configure(self: Self, time_cost: int) -> None:
+        self.time_cost = time_cost
+        self._hasher = Argon2PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+        )
+
+    def identify(self: Self, hashed_password: str) -> bool:
+        return hashed_password.startswith(self.prefix)
+
+    def hash(self: Self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self: Self, password: str, hashed_password: str) -> bool:
+        try:
+            return self._hasher.verify(hashed_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self: Self, hashed_password: str) -> bool:
+        try:
+            return self._hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
+
+    def calibrate(self: Self, target_ms: float) -> None:
+        # Время растет линейно с time_cost при фиксированной памяти
+        self._configure(1)
+        base_ms = self._measure_ms(self._hasher.hash, CALIBRATION_PASSWORD)
+        time_cost = math.floor(max(target_ms, 1) / max(base_ms, 0.001))
+        self._configure(min(self.max_time_cost, max(1, time_cost)))
+
+
+class PasswordHasherRegistry:
+    """
+    Реестр алгоритмов хеширования.
+    Новые хеши создаются схемой по умолчанию, проверка выполняется
+    алгоритмом, определенным по формату сохраненного хеша.
+    """
+
+    def __init__(self: Self, default_scheme: str) -> None:
+        self.default_scheme = default_scheme
+        self._hashers: Dict[str, PasswordHasher] = {}
+
+    def register(self: Self, hasher: PasswordHasher) -> None:
+        """Регистрирует алгоритм хеширования"""
+        self._hashers[hasher.scheme] = hasher
+
+    @property
+    def default(self: Self) -> PasswordHasher:
+        """Алгоритм для создания новых хешей"""
+        try:
+            return self._hashers[self.default_scheme]
+        except KeyError:
+            raise ValueError(
+                f"Схема хеширования {self.default_scheme} не зарегистрирована"
+            )
+
+    def identify(self: Self, hashed_password: str) -> Optional[PasswordHasher]:
+        """
+        Определяет алгоритм по сохраненному хешу.
+
+        Args:
+            hashed_password: Хеш из UserModel.password
+
+        Returns:
+            Алгоритм хеширования или None если формат не распознан
+        """
+        for hasher in self._hashers.values():
+            if hasher.identify(hashed_password):
+                return hasher
+        return None
+
+    def hash(self: Self, password: str) -> str:
+        """Создает хеш пароля схемой по умолчанию"""
+        return self.default.hash(password)
+
+    def verify(self: Self, password: str, hashed_password: str) -> bool:
+        """Проверяет пароль; хеши неизвестного формата не проходят проверку"""
+        hasher = self.identify(hashed_password)
+        if hasher is None:
+            return False
+        return hasher.verify(password, hashed_password)
+
+    def needs_rehash(self: Self, hashed_password: str) -> bool:
+        """Проверяет, нужно ли перехешировать пароль текущей схемой"""
+        hasher = self.identify(hashed_password)
+        if hasher is not self.default:
+            return True
+        return hasher.needs_rehash(hashed_password)
+
+    def calibrate(self: Self, target_ms: float) -> Dict[str, int]:
+        """
+        Подбирает стоимость схемы по умолчанию под бюджет времени.
+
+        Args:
+            target_ms: Целевое время хеширования одного пароля
+
+        Returns:
+            Итоговые параметры схемы по умолчанию
+        """
+        hasher = self.default
+        hasher.calibrate(target_ms)
+        if isinstance(hasher, BcryptHasher):
+            return {"rounds": hasher.rounds}
+        if isinstance(hasher, Argon2Hasher):
+            return {"time_cost": hasher.time_cost}
+        return {}
+
+
+def create_password_hashers() -> PasswordHasherRegistry:
+    """Создание реестра алгоритмов по настройкам приложения"""
+    registry = PasswordHasherRegistry(default_scheme=settings.PASSWORD_HASH_SCHEME)
+    registry.register(
+        BcryptHasher(
+            rounds=settings.PASSWORD_HASH_BCRYPT_ROUNDS,
+            min_rounds=settings.PASSWORD_HASH_BCRYPT_MIN_ROUNDS,
+        )
+    )
+    registry.register(
+        Argon2Hasher(
+            time_cost=settings.PASSWORD_HASH_ARGON2_TIME_COST,
+            memory_cost=settings.PASSWORD_HASH_ARGON2_MEMORY_COST,
+            parallelism=settings.PASSWORD_HASH_ARGON2_PARALLELISM,
+        )
+    )
+    # Проверяем, что схема по умолчанию доступна
+    registry.default
+    return registry
+
+
+password_hashers = create_password_hashers()
@@ -0,0 +1,184 @@
+"""
+Набор ключей для подписи и проверки JWT.
+Поддерживает HS256 с общим секретом и асимметричные алгоритмы (RS256, ES256, EdDSA)
+с ротацией ключей: подпись активным kid, проверка всеми ключами из набора.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Self
+
+import jwt
+from core.config import settings
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import get_default_algorithms
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class JWTKey:
+    """Ключ из набора: приватная часть есть только у ключей, которыми можно подписывать"""
+
+    def __init__(
+        self: Self, kid: Optional[str], signing_key: Any, verifying_key: Any
+    ) -> None:
+        self.kid = kid
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+
+class JWTKeyRing:
+    """
+    Набор ключей JWT.
+    Новые токены подписываются активным ключом с его kid в заголовке,
+    выведенные из ротации ключи продолжают использоваться для проверки.
+    """
+
+    def __init__(self: Self, algorithm: str) -> None:
+        self.algorithm = algorithm
+        self._algorithm_impl = get_default_algorithms()[algorithm]
+        self._keys: Dict[Optional[str], JWTKey] = {}
+        self._active: Optional[JWTKey] = None
+
+    @property
+    def is_symmetric(self: Self) -> bool:
+        return self.algorithm in SYMMETRIC_ALGORITHMS
+
+    @property
+    def active_kid(self: Self) -> Optional[str]:
+        return self._active.kid if self._active else None
+
+    def add_key(
+        self: Self,
+        kid: Optional[str],
+        signing_key: Any = None,
+        verifying_key: Any = None,
+        active: bool = False,
+    ) -> None:
+        """
+        Добавляет ключ в набор.
+
+        Args:
+            kid: Идентификатор ключа (None для общего секрета HS256)
+            signing_key: Секрет или приватный ключ
+            verifying_key: Секрет или публичный ключ
+            active: Использовать ли ключ для подписи новых токенов
+        """
+        if verifying_key is None and signing_key is not None:
+            verifying_key = (
+                signing_key if self.is_symmetric else signing_key.public_key()
+            )
+        key = JWTKey(kid, signing_key, verifying_key)
+        self._keys[kid] = key
+
+        if active:
+            if signing_key is None:
+                raise ValueError(
+                    f"Активный ключ {kid} должен содержать приватную часть"
+                )
+            self._active = key
+
+    def encode(self: Self, payload: Dict[str, Any]) -> str:
+        """Подписывает payload активным ключом"""
+        if self._active is None:
+            raise ValueError("Не задан активный ключ для подписи JWT")
+
+        headers = {"kid": self._active.kid} if self._active.kid else None
+        return jwt.encode(
+            payload, self._active.signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def decode(self: Self, token: str) -> Dict[str, Any]:
+        """
+        Проверяет подпись ключом из заголовка kid и возвращает payload.
+        Токены без kid проверяются активным ключом.
+
+        Raises:
+            jwt.PyJWTError: Если токен невалиден, просрочен или kid неизвестен
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid) if kid else self._active
+        if key is None:
+            raise jwt.InvalidTokenError(f"Неизвестный kid: {kid}")
+
+        return jwt.decode(token, key.verifying_key, algorithms=[self.algorithm])
+
+    def jwks(self: Self) -> Dict[str, Any]:
+        """
+        Публичные ключи в формате JWKS.
+        Для симметричных алгоритмов набор пуст - секрет не публикуется.
+        """
+        if self.is_symmetric:
+            return {"keys": []}
+
+        keys = []
+        for key in self._keys.values():
+            jwk = self._algorithm_impl.to_jwk(key.verifying_key, as_dict=True)
+            jwk.update({"kid": key.kid, "alg": self.algorithm, "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+
+def _load_pem_keys(keys_dir: str) -> Dict[str, tuple[Any, Any]]:
+    """
+    Загружает ключи из каталога: <kid>.pem с приватным или публичным ключом.
+
+    Returns:
+        Словарь kid -> (приватный ключ или None, публичный ключ)
+    """
+    keys: Dict[str, tuple[Any, Any]] = {}
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        data = path.read_bytes()
+        if b"PRIVATE KEY" in data:
+            private_key = load_pem_private_key(data, password=None)
+            keys[path.stem] = (private_key, private_key.public_key())
+        else:
+            keys[path.stem] = (None, load_pem_public_key(data))
+    return keys
+
+
+def create_jwt_key_ring() -> JWTKeyRing:
+    """Создание набора ключей по настройкам приложения"""
+    key_ring = JWTKeyRing(settings.JWT_ALGORITHM)
+
+    if key_ring.is_symmetric:
+        key_ring.add_key(None, signing_key=settings.JWT_SECRET_KEY, active=True)
+        return key_ring
+
+    if not settings.JWT_KEYS_DIR or not settings.JWT_ACTIVE_KID:
+        raise ValueError(
+            f"Для {settings.JWT_ALGORITHM} требуются JWT_KEYS_DIR и JWT_ACTIVE_KID"
+        )
+
+    for kid, (private_key, public_key) in _load_pem_keys(settings.JWT_KEYS_DIR).items():
+        key_ring.add_key(
+            kid,
+            signing_key=private_key,
+            verifying_key=public_key,
+            active=kid == settings.JWT_ACTIVE_KID,
+        )
+
+    if key_ring.active_kid != settings.JWT_ACTIVE_KID:
+        raise ValueError(f"Ключ {settings.JWT_ACTIVE_KID} не найден в JWT_KEYS_DIR")
+    return key_ring
+
+
+def serialize_jwks(key_ring: JWTKeyRing) -> tuple[bytes, str]:
+    """
+    Тело ответа JWKS и его ETag.
+
+    Returns:
+        Кортеж (JSON тело, ETag в кавычках)
+    """
+    body = json.dumps(key_ring.jwks(), separators=(",", ":")).encode("utf-8")
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+jwt_keys = create_jwt_key_ring()
+
+# JWKS не меняется до перезапуска, сериализуем один раз
+JWKS_BODY, JWKS_ETAG = serialize_jwks(jwt_keys)
@@ -3,14 +3,27 @@
 Наследует BaseRepository и добавляет специфичные для аутентификации методы.
 """
 
-from typing import Optional
+import uuid
+from typing import Any, Optional
 
 from core.exceptions import DatabaseError
 from models.base import UserModel
 from services.base.repository import BaseRepository
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+# Уникальный индекс на lower(email), см. models/base.py
+USERS_EMAIL_UNIQUE_INDEX = "ix_users_email_lower"
+
+
+def normalize_email(email: str) -> str:
+    """
+    Приводит email к каноническому виду для хранения и поиска.
+    Поиск выполняется по индексу ix_users_email_lower на lower(email).
+    """
+    return email.strip().lower()
+
 
 class AuthRepository(BaseRepository[UserModel]):
     """
@@ -18,6 +31,8 @@ class AuthRepository(BaseRepository[UserModel]):
     Предоставляет методы для поиска пользователей по email и другие auth-специфичные операции.
     """
 
+    __slots__ = ()
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, UserModel)
 
@@ -36,7 +51,9 @@ class AuthRepository(BaseRepository[UserModel]):
         """
         try:
             result = await self.session.execute(
-                select(UserModel).where(UserModel.email == email)
+                select(UserModel).where(
+                    func.lower(UserModel.email) == normalize_email(email)
+                )
             )
             return result.scalars().first()
         except Exception as e:
@@ -54,3 +71,87 @@ class AuthRepository(BaseRepository[UserModel]):
         """
         user = await self.get_by_email(email)
         return user is not None
+
+    async def get_token_version(self, user_id: uuid.UUID) -> Optional[int]:
+        """
+        Получает текущую версию токенов пользователя без загрузки модели.
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            Версия токенов или None если пользователь не найден
+
+        Raises:
+            DatabaseError: При ошибке запроса к БД
+        """
+        try:
+            result = await self.session.execute(
+                select(UserModel.token_version).where(UserModel.id == user_id)
+            )
+            return result.scalar_one_or_none()
+        except Exception as e:
+            raise DatabaseError(
+                f"Ошибка при получении версии токенов пользователя {user_id}", e
+            )
+
+    async def update_password_hash(
+        self, user_id: uuid.UUID, old_hash: str, new_hash: str
+    ) -> bool:
+        """
+        Заменяет хеш пароля, если он не менялся с момента чтения.
+
+        Args:
+            user_id: ID пользователя
+            old_hash: Ожидаемый текущий хеш
+            new_hash: Новый хеш
+
+        Returns:
+            True если хеш был обновлен
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            stmt = (
+                update(UserModel)
+                .where(UserModel.id == user_id, UserModel.password == old_hash)
+                .values(password=new_hash)
+            )
+            result = await self.session.execute(stmt)
+            return bool(result.rowcount)
+        except Exception as e:
+            raise DatabaseError(
+                f"Ошибка при обновлении пароля пользователя {user_id}", e
+            )
+
+    async def increment_token_version(
+        self, user_id: uuid.UUID, **values: Any
+    ) -> Optional[int]:
+        """
+        Атомарно увеличивает версию токенов пользователя одним UPDATE,
+        чтобы параллельные отзывы не перезаписали версию друг друга.
+
+        Args:
+            user_id: ID пользователя
+            **values: Поля, обновляемые тем же запросом (например, password)
+
+        Returns:
+            Новая версия токенов или None если пользователь не найден
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            stmt = (
+                update(UserModel)
+                .where(UserModel.id == user_id)
+                .values(token_version=UserModel.token_version + 1, **values)
+                .returning(UserModel.token_version)
+            )
+            result = await self.session.execute(stmt)
+            return result.scalar_one_or_none()
+        except Exception as e:
+            raise DatabaseError(
+                f"Ошибка при обновлении версии токенов пользователя {user_id}", e
+            )
@@ -3,15 +3,99 @@
 Наследует BaseRepository и добавляет специфичные для токенов методы.
 """
 
+import hashlib
+import hmac
+import secrets
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, time, timedelta, timezone
 from typing import Optional
 
 from core.exceptions import DatabaseError, NotFoundError
-from models import RefreshTokenModel
+from models import RefreshTokenModel, UserModel
 from services.base.repository import BaseRepository
-from sqlalchemy import select, update
+from sqlalchemy import (
+    DateTime,
+    LargeBinary,
+    String,
+    Uuid,
+    false,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+from utils.uuid7 import uuid7
+
+REFRESH_TOKEN_SELECTOR_BYTES = 12
+REFRESH_TOKEN_VERIFIER_BYTES = 32
+# Длина selector у токенов, выданных до перехода на формат selector.verifier
+LEGACY_SELECTOR_LENGTH = 16
+
+# Таблица секционирована по expires_at недельными диапазонами (понедельник 00:00 UTC)
+REFRESH_TOKEN_PARTITION_INTERVAL = timedelta(days=7)
+REFRESH_TOKEN_PARTITION_PREFIX = "refresh_tokens_p"
+# Партиция для строк вне созданных диапазонов: вставка не падает,
+# даже если обслуживание партиций отстало
+REFRESH_TOKEN_DEFAULT_PARTITION = "refresh_tokens_default"
+# Ключ advisory lock, сериализующего создание партиций между процессами
+REFRESH_TOKEN_PARTITION_LOCK_KEY = 0x52544B50
+
+
+def hash_refresh_verifier(verifier: str) -> bytes:
+    """SHA-256 от verifier части refresh токена"""
+    return hashlib.sha256(verifier.encode("utf-8")).digest()
+
+
+def generate_refresh_token() -> tuple[str, str, bytes]:
+    """
+    Генерирует refresh токен вида selector.verifier.
+
+    Returns:
+        Строка токена для cookie, selector и SHA-256 от verifier
+    """
+    selector = secrets.token_urlsafe(REFRESH_TOKEN_SELECTOR_BYTES)
+    verifier = secrets.token_urlsafe(REFRESH_TOKEN_VERIFIER_BYTES)
+    return f"{selector}.{verifier}", selector, hash_refresh_verifier(verifier)
+
+
+def split_refresh_token(token: str) -> tuple[str, str]:
+    """
+    Разделяет refresh токен на selector и verifier.
+    Токены старого формата (без точки) делятся по LEGACY_SELECTOR_LENGTH,
+    так же как при миграции таблицы.
+    """
+    if "." in token:
+        selector, verifier = token.split(".", 1)
+        return selector, verifier
+    return token[:LEGACY_SELECTOR_LENGTH], token[LEGACY_SELECTOR_LENGTH:]
+
+
+def refresh_token_partition_start(moment: datetime) -> datetime:
+    """Начало недельной партиции, в которую попадает момент времени"""
+    day = moment.astimezone(timezone.utc).date()
+    monday = day - timedelta(days=day.weekday())
+    return datetime.combine(monday, time.min, tzinfo=timezone.utc)
+
+
+def refresh_token_partition_name(start: datetime) -> str:
+    """Имя партиции по началу ее диапазона: refresh_tokens_pYYYYMMDD"""
+    return f"{REFRESH_TOKEN_PARTITION_PREFIX}{start:%Y%m%d}"
+
+
+def parse_refresh_token_partition_name(name: str) -> Optional[datetime]:
+    """Начало диапазона партиции по ее имени или None для чужих таблиц"""
+    if not name.startswith(REFRESH_TOKEN_PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(
+            name[len(REFRESH_TOKEN_PARTITION_PREFIX) :], "%Y%m%d"
+        ).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
 
 
 class RefreshTokenRepository(BaseRepository[RefreshTokenModel]):
@@ -20,15 +104,42 @@ class RefreshTokenRepository(BaseRepository[RefreshTokenModel]):
     Предоставляет методы для поиска, отзыва и управления токенами.
     """
 
+    __slots__ = ()
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, RefreshTokenModel)
 
-    async def get_by_token(self, token: str) -> Optional[RefreshTokenModel]:
+    async def get_by_id(self, ident: uuid.UUID) -> Optional[RefreshTokenModel]:
+        """
+        Получает токен по ID.
+        Первичный ключ секционированной таблицы - (id, expires_at), поэтому
+        session.get по одному id не подходит.
+
+        Args:
+            ident: ID токена
+
+        Returns:
+            RefreshTokenModel или None если не найден
+        """
+        try:
+            stmt = select(RefreshTokenModel).where(RefreshTokenModel.id == ident)
+            result = await self.session.execute(stmt)
+            return result.scalar_one_or_none()
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при получении RefreshTokenModel по ID", e)
+
+    async def get_by_token(
+        self, token: str, expires_after: Optional[datetime] = None
+    ) -> Optional[RefreshTokenModel]:
         """
         Получает refresh токен по строковому значению.
+        Поиск идет по короткому selector, verifier сверяется по хешу.
+        Условие на expires_at отсекает старые партиции (partition pruning).
 
         Args:
-            token: Строковое значение токена
+            token: Строковое значение токена (selector.verifier)
+            expires_after: Искать только среди токенов, истекающих позже
+                этого момента (по умолчанию - только неистекшие)
 
         Returns:
             RefreshTokenModel или None если не найден
@@ -36,13 +147,258 @@ class RefreshTokenRepository(BaseRepository[RefreshTokenModel]):
         Raises:
             DatabaseError: При ошибке запроса к БД
         """
+        selector, verifier = split_refresh_token(token)
+        if not selector or not verifier:
+            return None
+
+        if expires_after is None:
+            expires_after = datetime.now(timezone.utc)
+
         try:
-            stmt = select(RefreshTokenModel).where(RefreshTokenModel.token == token)
+            stmt = select(RefreshTokenModel).where(
+                RefreshTokenModel.selector == selector,
+                RefreshTokenModel.expires_at > expires_after,
+            )
             result = await self.session.execute(stmt)
-            return result.scalar_one_or_none()
+            refresh_token = result.scalar_one_or_none()
         except Exception as e:
             raise DatabaseError(f"Ошибка при поиске токена", e)
 
+        if refresh_token is None or not hmac.compare_digest(
+            refresh_token.verifier_hash, hash_refresh_verifier(verifier)
+        ):
+            return None
+        return refresh_token
+
+    async def issue(
+        self,
+        user_id: uuid.UUID,
+        selector: str,
+        verifier_hash: bytes,
+        expires_at: datetime,
+        max_sessions: int,
+    ) -> None:
+        """
+        Выдает новый токен одним запросом, отзывая самые старые активные
+        сессии пользователя сверх лимита.
+
+        Args:
+            user_id: ID пользователя
+            selector: Selector нового токена
+            verifier_hash: SHA-256 от verifier нового токена
+            expires_at: Время истечения нового токена
+            max_sessions: Лимит активных сессий с учетом новой
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            excess_ids = (
+                select(RefreshTokenModel.id)
+                .where(
+                    RefreshTokenModel.user_id == user_id,
+                    RefreshTokenModel.revoked == False,
+                    RefreshTokenModel.expires_at > func.now(),
+                )
+                .order_by(RefreshTokenModel.created_at.desc())
+                .offset(max(max_sessions - 1, 0))
+            )
+            revoked = (
+                update(RefreshTokenModel)
+                .where(RefreshTokenModel.id.in_(excess_ids.scalar_subquery()))
+                .values(revoked=True)
+                .cte("revoked")
+            )
+            stmt = (
+                insert(RefreshTokenModel)
+                .values(
+                    id=uuid7(),
+                    user_id=user_id,
+                    selector=selector,
+                    verifier_hash=verifier_hash,
+                    expires_at=expires_at,
+                    revoked=False,
+                )
+                .add_cte(revoked)
+            )
+            await self.session.execute(stmt)
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при выдаче токена пользователю {user_id}", e)
+
+    async def rotate(
+        self,
+        token: str,
+        new_selector: str,
+        new_verifier_hash: bytes,
+        expires_at: datetime,
+    ) -> Optional[UserModel]:
+        """
+        Проверяет, отзывает и заменяет refresh токен одним запросом
+        (UPDATE ... RETURNING и INSERT ... RETURNING в CTE).
+
+        Args:
+            token: Предъявленный токен (selector.verifier)
+            new_selector: Selector нового токена
+            new_verifier_hash: SHA-256 от verifier нового токена
+            expires_at: Время истечения нового токена
+
+        Returns:
+            Пользователь-владелец (не привязан к сессии) или None,
+            если токен не найден, отозван или истек
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        selector, verifier = split_refresh_token(token)
+        if not selector or not verifier:
+            return None
+
+        try:
+            revoked = (
+                update(RefreshTokenModel)
+                .where(
+                    RefreshTokenModel.selector == selector,
+                    RefreshTokenModel.verifier_hash == hash_refresh_verifier(verifier),
+                    RefreshTokenModel.revoked == False,
+                    RefreshTokenModel.expires_at > func.now(),
+                )
+                .values(revoked=True)
+                .returning(RefreshTokenModel.user_id)
+                .cte("revoked")
+            )
+            issued = (
+                insert(RefreshTokenModel)
+                .from_select(
+                    [
+                        RefreshTokenModel.id,
+                        RefreshTokenModel.user_id,
+                        RefreshTokenModel.selector,
+                        RefreshTokenModel.verifier_hash,
+                        RefreshTokenModel.expires_at,
+                        RefreshTokenModel.revoked,
+                    ],
+                    select(
+                        literal(uuid7(), Uuid()),
+                        revoked.c.user_id,
+                        literal(new_selector, String()),
+                        literal(new_verifier_hash, LargeBinary()),
+                        literal(expires_at, DateTime(timezone=True)),
+                        false(),
+                    ),
+                )
+                .returning(RefreshTokenModel.user_id)
+                .cte("issued")
+            )
+            stmt = select(
+                UserModel.id,
+                UserModel.email,
+                UserModel.username,
+                UserModel.role,
+                UserModel.is_verified,
+                UserModel.token_version,
+            ).join(issued, UserModel.id == issued.c.user_id)
+            row = (await self.session.execute(stmt)).first()
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при ротации токена", e)
+
+        if row is None:
+            return None
+        return UserModel(**row._asdict())
+
+    async def list_active_for_user(self, user_id: uuid.UUID) -> list[RefreshTokenModel]:
+        """
+        Получает активные сессии пользователя, новые первыми.
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            Список активных refresh токенов
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            stmt = (
+                select(RefreshTokenModel)
+                .where(
+                    RefreshTokenModel.user_id == user_id,
+                    RefreshTokenModel.revoked == False,
+                    RefreshTokenModel.expires_at > func.now(),
+                )
+                .order_by(RefreshTokenModel.created_at.desc())
+                .options(noload(RefreshTokenModel.user))
+            )
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+        except Exception as e:
+            raise DatabaseError(
+                f"Ошибка при получении сессий пользователя {user_id}", e
+            )
+
+    async def revoke_for_user(self, token_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        """
+        Отзывает активный токен, если он принадлежит пользователю.
+
+        Args:
+            token_id: ID токена
+            user_id: ID владельца
+
+        Returns:
+            True если токен был отозван
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            stmt = (
+                update(RefreshTokenModel)
+                .where(
+                    RefreshTokenModel.id == token_id,
+                    RefreshTokenModel.user_id == user_id,
+                    RefreshTokenModel.revoked == False,
+                    RefreshTokenModel.expires_at > func.now(),
+                )
+                .values(revoked=True)
+            )
+            result = await self.session.execute(stmt)
+            return bool(result.rowcount)
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при отзыве токена {token_id}", e)
+
+    async def revoke_by_token(self, token: str) -> bool:
+        """
+        Отзывает активный токен по строковому значению одним запросом.
+
+        Args:
+            token: Предъявленный токен (selector.verifier)
+
+        Returns:
+            True если токен был отозван
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        selector, verifier = split_refresh_token(token)
+        if not selector or not verifier:
+            return False
+
+        try:
+            stmt = (
+                update(RefreshTokenModel)
+                .where(
+                    RefreshTokenModel.selector == selector,
+                    RefreshTokenModel.verifier_hash == hash_refresh_verifier(verifier),
+                    RefreshTokenModel.revoked == False,
+                    RefreshTokenModel.expires_at > func.now(),
+                )
+                .values(revoked=True)
+            )
+            result = await self.session.execute(stmt)
+            return bool(result.rowcount)
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при отзыве токена", e)
+
     async def revoke(self, token_id: uuid.UUID) -> bool:
         """
         Отзывает refresh токен по ID.
@@ -118,3 +474,171 @@ class RefreshTokenRepository(BaseRepository[RefreshTokenModel]):
             return False
         except Exception as e:
             raise DatabaseError(f"Ошибка при удалении токена {token_id}", e)
+
+    async def list_partitions(self) -> list[tuple[str, datetime]]:
+        """
+        Получает партиции таблицы refresh_tokens.
+
+        Returns:
+            Список (имя партиции, начало диапазона), отсортированный по времени
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            result = await self.session.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'refresh_tokens'::regclass"
+                )
+            )
+            names = result.scalars().all()
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при получении партиций refresh_tokens", e)
+
+        partitions = []
+        for name in names:
+            start = parse_refresh_token_partition_name(name)
+            if start is not None:
+                partitions.append((name, start))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    async def create_partition(self, start: datetime, lock_timeout_ms: int) -> str:
+        """
+        Создает недельную партицию, начинающуюся в start.
+
+        Args:
+            start: Начало диапазона (результат refresh_token_partition_start)
+            lock_timeout_ms: Сколько ждать блокировку родительской таблицы
+
+        Returns:
+            Имя партиции
+
+        Raises:
+            DatabaseError: При ошибке БД или таймауте блокировки
+        """
+        name = refresh_token_partition_name(start)
+        end = start + REFRESH_TOKEN_PARTITION_INTERVAL
+        bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        try:
+            # Без таймаута DDL в очереди за долгим запросом блокирует всю таблицу
+            await self.session.execute(
+                text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}")
+            )
+            # Несколько процессов приложения создают партиции при старте
+            await self.session.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": REFRESH_TOKEN_PARTITION_LOCK_KEY},
+            )
+            if await self._partition_exists(name):
+                return name
+
+            in_default = await self.session.scalar(
+                text(
+                    f"SELECT EXISTS (SELECT 1 FROM {REFRESH_TOKEN_DEFAULT_PARTITION} "
+                    f"WHERE expires_at >= :start AND expires_at < :end)"
+                ),
+                {"start": start, "end": end},
+            )
+            if not in_default:
+                await self.session.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF refresh_tokens "
+                        f"FOR VALUES {bounds}"
+                    )
+                )
+                return name
+
+            # Строки диапазона уже попали в DEFAULT партицию: переносим их
+            # в новую таблицу и присоединяем ее как партицию
+            await self.session.execute(
+                text(
+                    f"CREATE TABLE {name} "
+                    f"(LIKE refresh_tokens INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+            )
+            await self.session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {REFRESH_TOKEN_DEFAULT_PARTITION} "
+                    f"WHERE expires_at >= :start AND expires_at < :end RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                {"start": start, "end": end},
+            )
+            await self.session.execute(
+                text(
+                    f"ALTER TABLE refresh_tokens ATTACH PARTITION {name} FOR VALUES {bounds}"
+                )
+            )
+            return name
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при создании партиции {name}", e)
+
+    async def _partition_exists(self, name: str) -> bool:
+        return bool(
+            await self.session.scalar(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'refresh_tokens'::regclass "
+                    "AND c.relname = :name)"
+                ),
+                {"name": name},
+            )
+        )
+
+    async def purge_default_partition(self, expired_before: datetime) -> int:
+        """
+        Удаляет истекшие токены из DEFAULT партиции.
+        Обычно она пуста: строки попадают туда, только если партиция
+        нужной недели не была создана заранее.
+
+        Args:
+            expired_before: Удаляются токены, истекшие раньше этого момента
+
+        Returns:
+            Количество удаленных токенов
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            result = await self.session.execute(
+                text(
+                    f"DELETE FROM {REFRESH_TOKEN_DEFAULT_PARTITION} "
+                    f"WHERE expires_at < :expired_before"
+                ),
+                {"expired_before": expired_before},
+            )
+            return result.rowcount
+        except Exception as e:
+            raise DatabaseError(
+                f"Ошибка при очистке DEFAULT партиции refresh_tokens", e
+            )
+
+    async def drop_partition(self, name: str, lock_timeout_ms: int) -> None:
+        """
+        Удаляет партицию целиком: отсоединение и DROP TABLE вместо
+        построчного DELETE, без мертвых строк и нагрузки на VACUUM.
+
+        Args:
+            name: Имя партиции (refresh_tokens_pYYYYMMDD)
+            lock_timeout_ms: Сколько ждать блокировку родительской таблицы
+
+        Raises:
+            DatabaseError: При ошибке БД или таймауте блокировки
+        """
+        if parse_refresh_token_partition_name(name) is None:
+            raise DatabaseError(f"{name} не является партицией refresh_tokens")
+
+        try:
+            await self.session.execute(
+                text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}")
+            )
+            await self.session.execute(
+                text(f"ALTER TABLE refresh_tokens DETACH PARTITION {name}")
+            )
+            await self.session.execute(text(f"DROP TABLE {name}"))
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при удалении партиции {name}", e)
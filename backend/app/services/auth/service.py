@@ -1,13 +1,13 @@
+import asyncio
 import secrets
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Self
+from typing import NoReturn, Self
 
-import bcrypt
-import httpx
 import jwt
 from core.config import settings
 from core.constants import AuthErrorMessages
+from core.database import LazyAsyncSession, db_helper
 from core.exceptions import (
     AuthenticationError,
     AuthorizationError,
@@ -15,47 +15,107 @@ from core.exceptions import (
     DuplicateError,
     ExternalServiceError,
     NotFoundError,
+    ServiceUnavailableError,
     TokenError,
     ValidationError,
 )
-from models import RefreshTokenModel, UserModel
+from core.password_executor import password_executor
+from models import EmailKind, UserModel
 from pydantic import EmailStr
-from schemas import Token
-from services.auth.repositories.auth import AuthRepository
-from services.auth.repositories.token_refresh import RefreshTokenRepository
-from sqlalchemy.ext.asyncio import AsyncSession
-from utils.email_sender import send_password_reset_email, send_verification_email
+from schemas import SessionInfo, Token
+from services.auth.cache import invalidate_principal, remember_token_version
+from services.auth.google import GoogleOAuthClient
+from services.auth.hashers import password_hashers
+from services.auth.keys import jwt_keys
+from services.auth.repositories.auth import (
+    USERS_EMAIL_UNIQUE_INDEX,
+    AuthRepository,
+    normalize_email,
+)
+from services.auth.repositories.token_refresh import (
+    RefreshTokenRepository,
+    generate_refresh_token,
+    split_refresh_token,
+)
+from services.base.repository import is_unique_violation
+from services.email.outbox_worker import email_outbox_worker
+from services.email.repositories.outbox import EmailOutboxRepository
+from sqlalchemy.exc import IntegrityError
 from utils.log_helper import create_auth_logger, log_auth_event, log_business_event
 
 
 class AuthService:
+    # Создается на каждый запрос: атрибуты фиксированы, логгер общий
+    __slots__ = (
+        "session",
+        "auth_repo",
+        "refresh_token_repo",
+        "email_outbox_repo",
+        "google_oauth",
+    )
+
+    # Ссылки на фоновые задачи, чтобы их не собрал GC до завершения
+    _background_tasks: set[asyncio.Task] = set()
+    logger = create_auth_logger()
+
     def __init__(
         self: Self,
-        session: AsyncSession,
+        session: LazyAsyncSession,
         auth_repo: AuthRepository,
         refresh_token_repo: RefreshTokenRepository,
+        email_outbox_repo: EmailOutboxRepository,
+        google_oauth: GoogleOAuthClient,
     ) -> None:
         self.session = session
         self.auth_repo = auth_repo
         self.refresh_token_repo = refresh_token_repo
-        self.logger = create_auth_logger()
+        self.email_outbox_repo = email_outbox_repo
+        self.google_oauth = google_oauth
 
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Проверка пароля против хеша"""
-        return bcrypt.checkpw(
-            bytes(plain_password, encoding="utf-8"),
-            bytes(hashed_password, encoding="utf-8"),
-        )
+        """Проверка пароля против хеша (схема определяется по хешу)"""
+        return password_hashers.verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        """Создание хеша пароля"""
-        hashed = bcrypt.hashpw(
-            password.encode("utf-8"),
-            bcrypt.gensalt(rounds=12),
-        )
-        return hashed.decode("utf-8")
+        """Создание хеша пароля схемой по умолчанию"""
+        return password_hashers.hash(password)
+
+    def _schedule_password_rehash(
+        self, user_id: uuid.UUID, password: str, old_hash: str
+    ) -> None:
+        """Запуск фонового перехеширования пароля с устаревшими параметрами"""
+        task = asyncio.create_task(self._rehash_password(user_id, password, old_hash))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _rehash_password(
+        self, user_id: uuid.UUID, password: str, old_hash: str
+    ) -> None:
+        """
+        Перехеширование пароля текущей схемой.
+        Использует отдельную сессию, так как сессия запроса к этому моменту закрыта.
+        """
+        try:
+            new_hash = await password_executor.run(self.get_password_hash, password)
+            async with db_helper.session_factory() as session:
+                updated = await AuthRepository(session).update_password_hash(
+                    user_id, old_hash, new_hash
+                )
+                await session.commit()
+            if updated:
+                self.logger.info(
+                    "Password rehashed with current parameters",
+                    event_type="password_rehash",
+                    user_id=str(user_id),
+                )
+        except Exception as e:
+            self.logger.warning(
+                f"Password rehash failed: {e}",
+                event_type="password_rehash",
+                user_id=str(user_id),
+            )
 
     @staticmethod
     def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -65,10 +125,28 @@ class AuthService:
             expires_delta or timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
         )
         to_encode.update({"exp": expire.timestamp()})
-        encoded_jwt = jwt.encode(
-            to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-        )
-        return encoded_jwt
+        return jwt_keys.encode(to_encode)
+
+    @staticmethod
+    def build_access_token_claims(user: UserModel) -> dict:
+        """
+        Формирует claims access токена для пользователя.
+        В режиме JWT_STATELESS_CLAIMS токен несет id, роль, флаг верификации
+        и версию токена, достаточные для авторизации без БД.
+        """
+        claims = {"sub": user.email}
+        if settings.JWT_STATELESS_CLAIMS:
+            claims.update(
+                {
+                    "uid": str(user.id),
+                    "name": user.username,
+                    "role": user.role.value,
+                    "ver": user.is_verified,
+                    "tv": user.token_version,
+                }
+            )
+            remember_token_version(str(user.id), user.token_version)
+        return claims
 
     async def authenticate_user(self, email: EmailStr, password: str) -> UserModel:
         """
@@ -87,7 +165,9 @@ class AuthService:
             DatabaseError: При ошибке базы данных
 
         Note:
-            Пароль проверяется с использованием bcrypt для безопасности
+            Пароль проверяется в отдельном пуле потоков, чтобы не блокировать
+            event loop, соединение с БД на это время возвращается в пул.
+            Хеш с устаревшими параметрами перехешируется в фоне
         """
         # Валидация входных данных
         if not email or not password:
@@ -98,7 +178,10 @@ class AuthService:
 
         try:
             user = await self.auth_repo.get_by_email(email)
-            if not user or not self.verify_password(password, user.password):
+            await self.session.release()
+            if not user or not await password_executor.run(
+                self.verify_password, password, user.password
+            ):
                 log_auth_event(
                     self.logger,
                     "login",
@@ -118,12 +201,15 @@ class AuthService:
                 )
                 raise AuthorizationError(AuthErrorMessages.EMAIL_NOT_VERIFIED)
 
+            if password_hashers.needs_rehash(user.password):
+                self._schedule_password_rehash(user.id, password, user.password)
+
             # Успешная аутентификация
             log_auth_event(
                 self.logger, "login", str(email), success=True, user_id=str(user.id)
             )
             return user
-        except (AuthenticationError, AuthorizationError):
+        except (AuthenticationError, AuthorizationError, ServiceUnavailableError):
             # Пропускаем наши кастомные исключения
             raise
         except Exception as e:
@@ -147,7 +233,9 @@ class AuthService:
             DatabaseError: При ошибке сохранения в БД
 
         Note:
-            После регистрации отправляется email с токеном подтверждения
+            Письмо подтверждения ставится в очередь email_outbox в одной транзакции
+            с пользователем и отправляется фоновым воркером. Хеширование пароля
+            выполняется вне транзакции
         """
         # Валидация входных данных
         if not email or not password:
@@ -161,22 +249,41 @@ class AuthService:
 
         try:
             # Проверяем существование пользователя
-            if await self.auth_repo.email_exists(email):
+            email_taken = await self.auth_repo.email_exists(email)
+            await self.session.release()
+            if email_taken:
                 raise DuplicateError("User", "email", email)
 
             # Создаем пользователя
-            hashed_password = self.get_password_hash(password)
+            hashed_password = await password_executor.run(
+                self.get_password_hash, password
+            )
             username = email.split("@")[0]
-            user = UserModel(email=email, password=hashed_password, username=username)
+            user = UserModel(
+                email=normalize_email(email),
+                password=hashed_password,
+                username=username,
+            )
 
-            # Сохраняем в БД
+            # Сохраняем пользователя и письмо подтверждения в одной транзакции.
+            # id и значения по умолчанию заполняются на стороне приложения,
+            # повторное чтение строки не нужно
             await self.auth_repo.save(user)
-            await self.session.commit()
-            await self.session.refresh(user)
-
-            # Отправляем email подтверждения
-            verification_token = self.create_email_verification_token(user.email)
-            await send_verification_email(email, verification_token)
+            await self.email_outbox_repo.enqueue(
+                EmailKind.VERIFICATION,
+                user.email,
+                {"token": self.create_email_verification_token(user.email)},
+            )
+            try:
+                await self.session.commit()
+            except IntegrityError as e:
+                # Проверка email_exists выполнена до хеширования вне транзакции:
+                # параллельная регистрация ловится уникальным индексом
+                await self.session.rollback()
+                if is_unique_violation(e, USERS_EMAIL_UNIQUE_INDEX):
+                    raise DuplicateError("User", "email", email) from e
+                raise
+            email_outbox_worker.notify()
 
             # Логируем успешную регистрацию
             log_business_event(
@@ -189,7 +296,7 @@ class AuthService:
             )
 
             return user
-        except (DuplicateError, ValidationError):
+        except (DuplicateError, ValidationError, ServiceUnavailableError):
             # Пропускаем кастомные исключения
             raise
         except Exception as e:
@@ -198,36 +305,38 @@ class AuthService:
             raise DatabaseError(AuthErrorMessages.REGISTRATION_FAILED) from e
 
     @staticmethod
-    def _generate_refresh_token_string(length: int = 64) -> str:
-        """Генерация строки refresh токена"""
-        return secrets.token_urlsafe(length)
+    def _refresh_token_expires_at() -> datetime:
+        """Время истечения нового refresh токена"""
+        expires_delta = timedelta(minutes=settings.JWT_REFRESH_TOKEN_EXPIRE_MINUTES)
+        return datetime.now(timezone.utc) + expires_delta
 
-    async def create_refresh_token(self, user_id: uuid.UUID) -> RefreshTokenModel:
+    async def create_refresh_token(self, user_id: uuid.UUID) -> str:
         """
         Создание нового refresh токена для пользователя.
+        Отзыв самых старых сессий сверх REFRESH_TOKEN_MAX_SESSIONS и вставка
+        нового токена выполняются одним запросом, в БД сохраняется только
+        selector и хеш verifier.
 
         Args:
             user_id: ID пользователя
 
         Returns:
-            Созданный refresh токен
+            Строка refresh токена для cookie
 
         Raises:
             DatabaseError: При ошибке создания токена
         """
         try:
-            await self.refresh_token_repo.revoke_all_for_user(user_id)
-
-            token_str = self._generate_refresh_token_string()
-            expires_delta = timedelta(minutes=settings.JWT_REFRESH_TOKEN_EXPIRE_MINUTES)
-            expires_at = datetime.now(timezone.utc) + expires_delta
-            refresh_token_db = RefreshTokenModel(
-                user_id=user_id, token=token_str, expires_at=expires_at
+            token_str, selector, verifier_hash = generate_refresh_token()
+            await self.refresh_token_repo.issue(
+                user_id,
+                selector,
+                verifier_hash,
+                self._refresh_token_expires_at(),
+                max_sessions=settings.REFRESH_TOKEN_MAX_SESSIONS,
             )
-            self.session.add(refresh_token_db)
             await self.session.commit()
-            await self.session.refresh(refresh_token_db)
-            return refresh_token_db
+            return token_str
         except Exception as e:
             await self.session.rollback()
             raise DatabaseError(AuthErrorMessages.REFRESH_TOKEN_CREATION_FAILED) from e
@@ -242,10 +351,7 @@ class AuthService:
             "exp": expire.timestamp(),
             "type": "email_verification",
         }
-        encoded_jwt = jwt.encode(
-            to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-        )
-        return encoded_jwt
+        return jwt_keys.encode(to_encode)
 
     @staticmethod
     def create_password_reset_token(email: EmailStr) -> str:
@@ -257,16 +363,11 @@ class AuthService:
             "exp": expire.timestamp(),
             "type": "password_reset",
         }
-        encoded_jwt = jwt.encode(
-            to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-        )
-        return encoded_jwt
+        return jwt_keys.encode(to_encode)
 
     async def verify_user_email(self, token: str) -> bool:
         try:
-            payload = jwt.decode(
-                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-            )
+            payload = jwt_keys.decode(token)
             if payload.get("type") != "email_verification":
                 raise AuthenticationError(AuthErrorMessages.INVALID_TOKEN_TYPE)
             email: EmailStr = payload.get("sub")
@@ -282,6 +383,7 @@ class AuthService:
             user.is_verified = True
             self.session.add(user)
             await self.session.commit()
+            invalidate_principal(user.email)
             return True
         except jwt.ExpiredSignatureError:
             raise AuthenticationError(AuthErrorMessages.TOKEN_EXPIRED)
@@ -289,42 +391,130 @@ class AuthService:
             raise AuthenticationError(AuthErrorMessages.INVALID_TOKEN)
 
     async def refresh_access_token(self, refresh_token_str: str) -> dict[str, str]:
-        rt_from_db = await self.refresh_token_repo.get_by_token(refresh_token_str)
-        if not rt_from_db:
-            raise AuthenticationError(AuthErrorMessages.REFRESH_TOKEN_NOT_FOUND)
-        if rt_from_db.revoked:
-            raise AuthenticationError(AuthErrorMessages.REFRESH_TOKEN_REVOKED)
-        if rt_from_db.expires_at <= datetime.now(timezone.utc):
-            raise AuthenticationError(AuthErrorMessages.REFRESH_TOKEN_EXPIRED)
+        """
+        Ротация refresh токена: проверка, отзыв старого и выдача нового
+        выполняются одним запросом к БД.
 
-        user = rt_from_db.user
-        if not user:
-            _user_check = await self.auth_repo.get_by_id(ident=rt_from_db.user_id)
-            if not _user_check:
-                raise AuthenticationError(AuthErrorMessages.USER_NOT_FOUND)
-            user = _user_check
-        new_access_token = self.create_access_token(data={"sub": user.email})
+        Args:
+            refresh_token_str: Refresh токен из cookie
+
+        Returns:
+            Новые access и refresh токены
+
+        Raises:
+            AuthenticationError: Если токен не найден, отозван или истек
+            DatabaseError: При ошибке БД
+        """
+        new_refresh_token, selector, verifier_hash = generate_refresh_token()
+        user = await self.refresh_token_repo.rotate(
+            refresh_token_str,
+            selector,
+            verifier_hash,
+            self._refresh_token_expires_at(),
+        )
+        if user is None:
+            await self.session.rollback()
+            await self._raise_refresh_token_error(refresh_token_str)
+        await self.session.commit()
 
-        await self.refresh_token_repo.revoke(rt_from_db.id)
-        new_refresh_token_db = await self.create_refresh_token(user_id=user.id)
+        new_access_token = self.create_access_token(
+            data=self.build_access_token_claims(user)
+        )
 
         return {
             "access_token": new_access_token,
-            "refresh_token": new_refresh_token_db.token,
+            "refresh_token": new_refresh_token,
         }
 
+    async def list_sessions(
+        self, user_id: uuid.UUID, current_refresh_token: str | None = None
+    ) -> list[SessionInfo]:
+        """
+        Список активных сессий пользователя.
+
+        Args:
+            user_id: ID пользователя
+            current_refresh_token: Refresh токен текущего клиента для пометки сессии
+
+        Returns:
+            Активные сессии, новые первыми
+        """
+        current_selector = None
+        if current_refresh_token:
+            current_selector = split_refresh_token(current_refresh_token)[0]
+
+        tokens = await self.refresh_token_repo.list_active_for_user(user_id)
+        return [
+            SessionInfo(
+                id=token.id,
+                created_at=token.created_at,
+                expires_at=token.expires_at,
+                current=token.selector == current_selector,
+            )
+            for token in tokens
+        ]
+
+    async def revoke_session(self, user_id: uuid.UUID, session_id: uuid.UUID) -> None:
+        """
+        Завершение сессии пользователя (отзыв refresh токена).
+
+        Args:
+            user_id: ID пользователя
+            session_id: ID сессии (refresh токена)
+
+        Raises:
+            NotFoundError: Если активной сессии пользователя с таким ID нет
+        """
+        if not await self.refresh_token_repo.revoke_for_user(session_id, user_id):
+            raise NotFoundError("Session", session_id)
+        await self.session.commit()
+
+    async def logout(self, refresh_token_str: str | None) -> None:
+        """
+        Выход из системы: отзыв refresh токена текущего клиента.
+        Без отзыва токен из cookie оставался бы рабочим до истечения.
+
+        Args:
+            refresh_token_str: Refresh токен из cookie (если есть)
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        if not refresh_token_str:
+            return
+        if await self.refresh_token_repo.revoke_by_token(refresh_token_str):
+            await self.session.commit()
+
+    async def _raise_refresh_token_error(self, refresh_token_str: str) -> NoReturn:
+        """Определение причины отказа в ротации (выполняется только при ошибке)"""
+        # Недавно истекшие токены еще лежат в неудаленных партициях
+        rt_from_db = await self.refresh_token_repo.get_by_token(
+            refresh_token_str,
+            expires_after=datetime.now(timezone.utc)
+            - timedelta(hours=settings.REFRESH_TOKEN_RETENTION_HOURS),
+        )
+        if not rt_from_db:
+            raise AuthenticationError(AuthErrorMessages.REFRESH_TOKEN_NOT_FOUND)
+        if rt_from_db.revoked:
+            raise AuthenticationError(AuthErrorMessages.REFRESH_TOKEN_REVOKED)
+        raise AuthenticationError(AuthErrorMessages.REFRESH_TOKEN_EXPIRED)
+
     async def forgot_password(self, email: EmailStr):
         user = await self.auth_repo.get_by_email(email)
         if not user:
             raise NotFoundError("User", email)
-        reset_token = self.create_password_reset_token(email)
-        await send_password_reset_email(email, reset_token)
+        # Письмо отправит фоновый воркер, запрос ждет только commit
+        await self.email_outbox_repo.enqueue(
+            EmailKind.PASSWORD_RESET,
+            user.email,
+            {"token": self.create_password_reset_token(email)},
+        )
+        await self.session.commit()
+        email_outbox_worker.notify()
 
     async def reset_password(self, token: str, new_password: str):
         try:
-            payload = jwt.decode(
-                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-            )
+            payload = jwt_keys.decode(token)
             if payload.get("type") != "password_reset":
                 raise AuthenticationError(AuthErrorMessages.INVALID_TOKEN_TYPE)
             email: str = payload.get("sub")
@@ -336,66 +526,50 @@ class AuthService:
             raise AuthenticationError(AuthErrorMessages.INVALID_TOKEN)
 
         user = await self.auth_repo.get_by_email(email)
+        await self.session.release()
         if not user:
             raise NotFoundError("User", email)
 
-        user.password = self.get_password_hash(new_password)
-        self.session.add(user)
+        password_hash = await password_executor.run(
+            self.get_password_hash, new_password
+        )
+        # Выданные ранее access токены становятся устаревшими, refresh токены
+        # отзываются: иначе украденный токен выдавал бы новые access токены
+        token_version = await self.auth_repo.increment_token_version(
+            user.id, password=password_hash
+        )
+        await self.refresh_token_repo.revoke_all_for_user(user.id)
         await self.session.commit()
+        if token_version is None:
+            raise NotFoundError("User", email)
+        invalidate_principal(user.email)
+        remember_token_version(str(user.id), token_version)
 
     async def login_with_google(self, code: str) -> UserModel:
-        token_url = "https://oauth2.googleapis.com/token"
-        token_data = {
-            "code": code,
-            "client_id": settings.GOOGLE_CLIENT_ID,
-            "client_secret": settings.GOOGLE_CLIENT_SECRET,
-            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-            "grant_type": "authorization_code",
-        }
-
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(token_url, data=token_data)
-
-        if token_response.status_code != 200:
-            raise ExternalServiceError(
-                "Google",
-                AuthErrorMessages.GOOGLE_TOKEN_FAILED,
-                token_response.status_code,
-            )
-
-        token_json = token_response.json()
-        access_token = token_json.get("access_token")
-
-        user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        async with httpx.AsyncClient() as client:
-            user_response = await client.get(user_info_url, headers=headers)
-
-        if user_response.status_code != 200:
-            raise ExternalServiceError(
-                "Google",
-                AuthErrorMessages.GOOGLE_USER_INFO_FAILED,
-                user_response.status_code,
-            )
-
-        user_info = user_response.json()
-        email = user_info.get("email")
-        if not email:
-            raise ExternalServiceError("Google", AuthErrorMessages.GOOGLE_EMAIL_MISSING)
+        # Email берется из локально проверенного id_token, без запроса userinfo
+        claims = await self.google_oauth.authenticate(code)
+        email = claims["email"]
 
         user = await self.auth_repo.get_by_email(email)
         if not user:
             # Создаем нового пользователя
             username = email.split("@")[0]
             user = UserModel(
-                email=email,
+                email=normalize_email(email),
                 username=username,
                 password=secrets.token_urlsafe(32),  # Случайный пароль
                 is_verified=True,  # Google уже верифицировал email
             )
             self.session.add(user)
-            await self.session.commit()
-            await self.session.refresh(user)
+            try:
+                await self.session.commit()
+            except IntegrityError as e:
+                # Пользователя создал параллельный вход через Google
+                await self.session.rollback()
+                if not is_unique_violation(e, USERS_EMAIL_UNIQUE_INDEX):
+                    raise
+                user = await self.auth_repo.get_by_email(email)
+                if user is None:
+                    raise
 
         return user
@@ -0,0 +1,189 @@
+"""
+Обслуживание секционированной таблицы refresh_tokens.
+Заранее создает недельные партиции на срок жизни токенов вперед и удаляет
+партиции, все токены которых истекли, целиком - без построчного DELETE.
+Создание партиций выполняется всегда (и при старте приложения), удаление
+старых партиций можно отключить.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Self
+
+from core.config import settings
+from core.database import db_helper
+from core.exceptions import DatabaseError
+from services.auth.repositories.token_refresh import (
+    REFRESH_TOKEN_PARTITION_INTERVAL,
+    RefreshTokenRepository,
+    refresh_token_partition_start,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from utils.log_helper import create_db_logger
+
+
+class RefreshTokenReaper:
+    """Периодическая задача обслуживания партиций refresh токенов"""
+
+    def __init__(
+        self: Self,
+        session_factory: async_sessionmaker[AsyncSession],
+        retention: timedelta,
+        token_lifetime: timedelta,
+        partitions_ahead: int = 2,
+        lock_timeout_ms: int = 2000,
+        interval_seconds: int = 3600,
+        drop_expired: bool = True,
+    ) -> None:
+        self.session_factory = session_factory
+        self.retention = retention
+        self.token_lifetime = token_lifetime
+        self.partitions_ahead = partitions_ahead
+        self.lock_timeout_ms = lock_timeout_ms
+        self.interval_seconds = interval_seconds
+        self.drop_expired = drop_expired
+        self.logger = create_db_logger()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _list_partitions(self: Self) -> list[tuple[str, datetime]]:
+        async with self.session_factory() as session:
+            return await RefreshTokenRepository(session).list_partitions()
+
+    async def ensure_partitions(self: Self) -> list[str]:
+        """
+        Создает недостающие партиции: от текущей недели до максимального
+        срока жизни нового токена плюс partitions_ahead недель запаса.
+
+        Returns:
+            Имена созданных партиций
+
+        Raises:
+            DatabaseError: Если партицию не удалось создать
+        """
+        now = datetime.now(timezone.utc)
+        existing = {start for _, start in await self._list_partitions()}
+
+        start = refresh_token_partition_start(now)
+        horizon = (
+            now
+            + self.token_lifetime
+            + REFRESH_TOKEN_PARTITION_INTERVAL * self.partitions_ahead
+        )
+        created = []
+        while start < horizon:
+            if start not in existing:
+                # Каждая партиция в своей короткой транзакции
+                async with self.session_factory() as session:
+                    name = await RefreshTokenRepository(session).create_partition(
+                        start, self.lock_timeout_ms
+                    )
+                    await session.commit()
+                created.append(name)
+            start += REFRESH_TOKEN_PARTITION_INTERVAL
+        return created
+
+    async def drop_expired_partitions(self: Self) -> list[str]:
+        """
+        Удаляет партиции, верхняя граница которых старше окна хранения.
+        Партиция, которую не удалось заблокировать, пропускается до следующего прохода.
+
+        Returns:
+            Имена удаленных партиций
+        """
+        cutoff = datetime.now(timezone.utc) - self.retention
+        dropped = []
+        for name, start in await self._list_partitions():
+            if start + REFRESH_TOKEN_PARTITION_INTERVAL > cutoff:
+                break
+            try:
+                async with self.session_factory() as session:
+                    await RefreshTokenRepository(session).drop_partition(
+                        name, self.lock_timeout_ms
+                    )
+                    await session.commit()
+            except DatabaseError as e:
+                self.logger.warning(
+                    f"Refresh token partition {name} not dropped: {e}",
+                    event_type="refresh_token_reaper",
+                )
+                continue
+            dropped.append(name)
+        return dropped
+
+    async def purge_default_partition(self: Self) -> int:
+        """
+        Удаляет истекшие токены из DEFAULT партиции.
+
+        Returns:
+            Количество удаленных токенов
+        """
+        cutoff = datetime.now(timezone.utc) - self.retention
+        async with self.session_factory() as session:
+            purged = await RefreshTokenRepository(session).purge_default_partition(
+                cutoff
+            )
+            await session.commit()
+        return purged
+
+    async def run_once(self: Self) -> int:
+        """
+        Один проход обслуживания партиций.
+
+        Returns:
+            Количество удаленных партиций
+        """
+        started_at = time.perf_counter()
+        created = await self.ensure_partitions()
+        dropped = await self.drop_expired_partitions() if self.drop_expired else []
+        purged = await self.purge_default_partition()
+
+        self.logger.info(
+            f"Refresh token partitions maintained: "
+            f"{len(created)} created, {len(dropped)} dropped",
+            event_type="refresh_token_reaper",
+            partitions_created=created,
+            partitions_dropped=dropped,
+            default_partition_purged=purged,
+            duration_ms=round((time.perf_counter() - started_at) * 1000, 2),
+        )
+        return len(dropped)
+
+    async def _run_forever(self: Self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                # Новые токены попадут в DEFAULT партицию, но это нужно чинить
+                self.logger.error(
+                    f"Refresh token reaper failed: {e}",
+                    event_type="refresh_token_reaper",
+                )
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self: Self) -> None:
+        """Запускает периодическое обслуживание в фоне"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self: Self) -> None:
+        """Останавливает фоновую задачу"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+refresh_token_reaper = RefreshTokenReaper(
+    session_factory=db_helper.session_factory,
+    retention=timedelta(hours=settings.REFRESH_TOKEN_RETENTION_HOURS),
+    token_lifetime=timedelta(minutes=settings.JWT_REFRESH_TOKEN_EXPIRE_MINUTES),
+    partitions_ahead=settings.REFRESH_TOKEN_PARTITIONS_AHEAD,
+    lock_timeout_ms=settings.REFRESH_TOKEN_PARTITION_LOCK_TIMEOUT_MS,
+    interval_seconds=settings.REFRESH_TOKEN_REAPER_INTERVAL_SECONDS,
+    drop_expired=settings.REFRESH_TOKEN_REAPER_ENABLED,
+)
@@ -8,11 +8,40 @@ from uuid import UUID
 
 from core.exceptions import DatabaseError, NotFoundError
 from sqlalchemy import Select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 T = TypeVar("T")
 
+# SQLSTATE нарушения уникальности в PostgreSQL
+UNIQUE_VIOLATION = "23505"
+
+
+def is_unique_violation(
+    error: IntegrityError, constraint: Optional[str] = None
+) -> bool:
+    """
+    Проверяет, что ошибка вызвана нарушением уникальности.
+
+    Args:
+        error: Ошибка SQLAlchemy
+        constraint: Имя ограничения или уникального индекса (None - любое)
+
+    Returns:
+        True если нарушено указанное ограничение
+    """
+    orig = error.orig
+    if getattr(orig, "sqlstate", None) != UNIQUE_VIOLATION:
+        return False
+    if constraint is None:
+        return True
+    # Исходная ошибка asyncpg содержит имя ограничения
+    constraint_name = getattr(orig.__cause__, "constraint_name", None)
+    if constraint_name is not None:
+        return constraint_name == constraint
+    return constraint in str(orig)
+
 
 class BaseRepository(Generic[T]):
     """
@@ -20,6 +49,8 @@ class BaseRepository(Generic[T]):
     Предоставляет основные CRUD операции с правильной обработкой исключений.
     """
 
+    __slots__ = ("session", "model")
+
     def __init__(self, session: AsyncSession, model: Type[T]):
         """
         Инициализация репозитория.
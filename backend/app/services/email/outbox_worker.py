@@ -0,0 +1,217 @@
+"""
+Фоновая отправка писем из таблицы email_outbox.
+Письма забираются пачками, отправляются вне транзакции и повторяются
+с экспоненциальной задержкой; результаты попыток пачки сохраняются в БД
+одной транзакцией. Обработанные письма удаляются по сроку хранения.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Self
+
+from core.config import settings
+from core.database import db_helper
+from models import EmailKind, EmailOutboxModel
+from services.email.repositories.outbox import EmailOutboxRepository
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from utils.email_sender import send_password_reset_email, send_verification_email
+from utils.log_helper import create_email_logger
+
+EMAIL_SENDERS: dict[EmailKind, Callable[..., Awaitable[None]]] = {
+    EmailKind.VERIFICATION: send_verification_email,
+    EmailKind.PASSWORD_RESET: send_password_reset_email,
+}
+
+
+class EmailOutboxWorker:
+    """Воркер очереди исходящих писем"""
+
+    def __init__(
+        self: Self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = 20,
+        lease: timedelta = timedelta(seconds=60),
+        max_attempts: int = 8,
+        backoff_base: timedelta = timedelta(seconds=10),
+        backoff_max: timedelta = timedelta(hours=1),
+        poll_interval_seconds: float = 5,
+        retention: timedelta = timedelta(days=7),
+        purge_interval_seconds: float = 3600,
+        purge_batch_size: int = 1000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention = retention
+        self.purge_interval_seconds = purge_interval_seconds
+        self.purge_batch_size = purge_batch_size
+        self._last_purge: Optional[float] = None
+        self.logger = create_email_logger()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self: Self) -> None:
+        """Будит воркер после commit нового письма, не дожидаясь интервала опроса"""
+        self._wakeup.set()
+
+    def _retry_at(self: Self, attempts: int) -> Optional[datetime]:
+        """Время следующей попытки с full jitter или None, если попытки исчерпаны"""
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return datetime.now(timezone.utc) + delay * random.uniform(0.5, 1.0)
+
+    async def _send(self: Self, message: EmailOutboxModel) -> Optional[Exception]:
+        """Отправляет одно письмо, возвращает ошибку отправки или None"""
+        try:
+            await EMAIL_SENDERS[message.kind](message.recipient, **message.payload)
+        except Exception as e:
+            return e
+        return None
+
+    async def _record_results(
+        self: Self,
+        batch: list[EmailOutboxModel],
+        errors: list[Optional[Exception]],
+    ) -> None:
+        """Сохраняет результаты попыток всей пачки в одной сессии"""
+        async with self.session_factory() as session:
+            repo = EmailOutboxRepository(session)
+            for message, error in zip(batch, errors):
+                if error is None:
+                    await repo.mark_sent(message.id)
+                    continue
+                retry_at = self._retry_at(message.attempts)
+                await repo.mark_failed(message.id, repr(error)[:1000], retry_at)
+                self.logger.warning(
+                    f"Email delivery failed: {error}",
+                    event_type="email_outbox",
+                    email_id=str(message.id),
+                    email_kind=message.kind.value,
+                    attempts=message.attempts,
+                    gave_up=retry_at is None,
+                )
+            await session.commit()
+
+    async def run_once(self: Self) -> int:
+        """
+        Захватывает и отправляет одну пачку писем.
+
+        Returns:
+            Количество обработанных писем
+        """
+        # Захват коммитится сразу: соединение не удерживается на время SMTP
+        async with self.session_factory() as session:
+            batch = await EmailOutboxRepository(session).claim_batch(
+                self.batch_size, self.lease
+            )
+            await session.commit()
+        if not batch:
+            return 0
+
+        # Параллельность отправки ограничена пулом SMTP соединений,
+        # соединение с БД на время отправки не занимается
+        errors = await asyncio.gather(*(self._send(message) for message in batch))
+        await self._record_results(batch, errors)
+        return len(batch)
+
+    async def purge_once(self: Self) -> int:
+        """
+        Удаляет обработанные письма старше срока хранения.
+        Каждая порция удаляется в отдельной транзакции.
+
+        Returns:
+            Количество удаленных писем
+        """
+        total = 0
+        while True:
+            async with self.session_factory() as session:
+                deleted = await EmailOutboxRepository(session).purge_finished(
+                    self.retention, self.purge_batch_size
+                )
+                await session.commit()
+            total += deleted
+            if deleted < self.purge_batch_size:
+                return total
+
+    async def _purge_if_due(self: Self) -> None:
+        """Запускает удаление не чаще purge_interval_seconds"""
+        now = time.monotonic()
+        if (
+            self._last_purge is not None
+            and now - self._last_purge < self.purge_interval_seconds
+        ):
+            return
+        self._last_purge = now
+        deleted = await self.purge_once()
+        if deleted:
+            self.logger.info(
+                f"Purged {deleted} processed emails from outbox",
+                event_type="email_outbox",
+                deleted=deleted,
+            )
+
+    async def _run_forever(self: Self) -> None:
+        while True:
+            try:
+                await self._purge_if_due()
+            except Exception as e:
+                self.logger.warning(
+                    f"Email outbox purge failed: {e}",
+                    event_type="email_outbox",
+                )
+            try:
+                # Полная пачка - вероятно, в очереди есть еще письма
+                if await self.run_once() >= self.batch_size:
+                    continue
+            except Exception as e:
+                self.logger.warning(
+                    f"Email outbox worker failed: {e}",
+                    event_type="email_outbox",
+                )
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.poll_interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self: Self) -> None:
+        """Запускает обработку очереди в фоне"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self: Self) -> None:
+        """
+        Останавливает воркер. Захваченные, но не отмеченные письма
+        будут повторно отправлены после окончания аренды.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+email_outbox_worker = EmailOutboxWorker(
+    session_factory=db_helper.session_factory,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    lease=timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff_base=timedelta(seconds=settings.EMAIL_OUTBOX_BACKOFF_BASE_SECONDS),
+    backoff_max=timedelta(seconds=settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS),
+    poll_interval_seconds=settings.EMAIL_OUTBOX_POLL_INTERVAL_SECONDS,
+    retention=timedelta(hours=settings.EMAIL_OUTBOX_RETENTION_HOURS),
+    purge_interval_seconds=settings.EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS,
+    purge_batch_size=settings.EMAIL_OUTBOX_PURGE_BATCH_SIZE,
+)
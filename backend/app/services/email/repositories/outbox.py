@@ -0,0 +1,183 @@
+"""
+Репозиторий для работы с таблицей исходящих писем (transactional outbox).
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from core.exceptions import DatabaseError
+from models import EmailKind, EmailOutboxModel, EmailStatus
+from services.base.repository import BaseRepository
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class EmailOutboxRepository(BaseRepository[EmailOutboxModel]):
+    """
+    Репозиторий очереди исходящих писем.
+    Письма добавляются в транзакции бизнес-операции и забираются воркером
+    пачками с FOR UPDATE SKIP LOCKED.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, EmailOutboxModel)
+
+    async def enqueue(
+        self, kind: EmailKind, recipient: str, payload: dict[str, Any]
+    ) -> EmailOutboxModel:
+        """
+        Добавляет письмо в очередь. Запись сохраняется при commit
+        текущей транзакции вместе с остальными изменениями.
+
+        Args:
+            kind: Тип письма
+            recipient: Email получателя
+            payload: Параметры шаблона письма
+
+        Returns:
+            Добавленная запись
+        """
+        return await self.save(
+            EmailOutboxModel(kind=kind, recipient=recipient, payload=payload)
+        )
+
+    async def claim_batch(
+        self, batch_size: int, lease: timedelta
+    ) -> list[EmailOutboxModel]:
+        """
+        Захватывает пачку писем, готовых к отправке.
+        Захват продлевает next_attempt_at на время аренды: если воркер упадет
+        до отметки результата, письмо снова станет доступным после ее окончания.
+
+        Args:
+            batch_size: Максимальное количество писем
+            lease: Время аренды письма воркером
+
+        Returns:
+            Захваченные письма
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            due_ids = (
+                select(EmailOutboxModel.id)
+                .where(
+                    EmailOutboxModel.status == EmailStatus.PENDING,
+                    EmailOutboxModel.next_attempt_at <= func.now(),
+                )
+                .order_by(EmailOutboxModel.next_attempt_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            stmt = (
+                update(EmailOutboxModel)
+                .where(EmailOutboxModel.id.in_(due_ids.scalar_subquery()))
+                .values(
+                    attempts=EmailOutboxModel.attempts + 1,
+                    next_attempt_at=func.now() + lease,
+                )
+                .returning(EmailOutboxModel)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.scalars(stmt)
+            return list(result.all())
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при захвате писем для отправки", e)
+
+    async def mark_sent(self, message_id: uuid.UUID) -> None:
+        """
+        Отмечает письмо как отправленное и очищает параметры шаблона.
+
+        Args:
+            message_id: ID письма
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            await self.session.execute(
+                update(EmailOutboxModel)
+                .where(EmailOutboxModel.id == message_id)
+                .values(
+                    status=EmailStatus.SENT,
+                    sent_at=func.now(),
+                    last_error=None,
+                    payload=None,
+                )
+            )
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при отметке письма {message_id}", e)
+
+    async def mark_failed(
+        self,
+        message_id: uuid.UUID,
+        error: str,
+        retry_at: Optional[datetime],
+    ) -> None:
+        """
+        Записывает неудачную попытку отправки.
+        Параметры шаблона нужны для повтора и очищаются только
+        после исчерпания попыток.
+
+        Args:
+            message_id: ID письма
+            error: Текст ошибки
+            retry_at: Время следующей попытки или None, если попытки исчерпаны
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        values: dict[str, Any] = {"last_error": error}
+        if retry_at is None:
+            values["status"] = EmailStatus.FAILED
+            values["payload"] = None
+        else:
+            values["next_attempt_at"] = retry_at
+
+        try:
+            await self.session.execute(
+                update(EmailOutboxModel)
+                .where(EmailOutboxModel.id == message_id)
+                .values(**values)
+            )
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при отметке письма {message_id}", e)
+
+    async def purge_finished(self, older_than: timedelta, limit: int) -> int:
+        """
+        Удаляет отправленные и окончательно неотправленные письма старше
+        срока хранения. За один вызов удаляется не больше limit записей,
+        чтобы не держать долгие блокировки.
+
+        Args:
+            older_than: Срок хранения обработанных писем
+            limit: Максимальное количество удаляемых записей
+
+        Returns:
+            Количество удаленных записей
+
+        Raises:
+            DatabaseError: При ошибке БД
+        """
+        try:
+            expired_ids = (
+                select(EmailOutboxModel.id)
+                .where(
+                    EmailOutboxModel.status != EmailStatus.PENDING,
+                    EmailOutboxModel.created_at < func.now() - older_than,
+                )
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            result = await self.session.execute(
+                delete(EmailOutboxModel)
+                .where(EmailOutboxModel.id.in_(expired_ids.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            raise DatabaseError(f"Ошибка при удалении обработанных писем", e)
@@ -1,3 +1,6 @@
+import hashlib
+import time
+import uuid
 from typing import List
 
 import jwt
@@ -8,6 +11,13 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from models import UserModel, UserRole
 from schemas.user import UserBase
+from services.auth.cache import (
+    access_token_cache,
+    principal_cache,
+    remember_token_version,
+    token_version_cache,
+)
+from services.auth.keys import jwt_keys
 from services.auth.service import AuthService
 from starlette import status
 
@@ -15,18 +25,69 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/auth/login")
 log = get_logger(__name__)
 
 
-def decode_access_token(token: str) -> dict | None:
-    import jwt
+def verify_access_token(token: str) -> dict:
+    """
+    Проверяет подпись access токена и возвращает его payload.
+    Повторно предъявленный токен берется из кеша без проверки подписи
+    до наступления его exp.
 
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+    Raises:
+        jwt.PyJWTError: Если токен невалиден или просрочен
+    """
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = access_token_cache.get(cache_key)
+    if payload is not None:
         return payload
+
+    payload = jwt_keys.decode(token)
+    expires_in = payload.get("exp", 0) - time.time()
+    access_token_cache.set(cache_key, payload, ttl=expires_in)
+    return payload
+
+
+def decode_access_token(token: str) -> dict | None:
+    try:
+        return verify_access_token(token)
     except jwt.PyJWTError:
         return None
 
 
+def principal_from_claims(payload: dict) -> UserBase:
+    """
+    Собирает пользователя из claims проверенного токена (режим JWT_STATELESS_CLAIMS).
+    Подпись уже проверена, поэтому повторная валидация не выполняется.
+    """
+    return UserBase.model_construct(
+        id=uuid.UUID(payload["uid"]),
+        email=payload["sub"],
+        username=payload["name"],
+        role=UserRole(payload["role"]),
+    )
+
+
+async def is_token_version_current(payload: dict, auth_service: AuthService) -> bool:
+    """
+    Проверяет, что версия токена (claim tv) не отозвана.
+    Версия берется из кеша процесса, при промахе (старт процесса, токен выдан
+    другим процессом, запись истекла) - из БД одним запросом по первичному ключу.
+    Версия только растет, поэтому токен с меньшей версией отклоняется без БД.
+
+    Returns:
+        False если токен отозван или пользователь удален
+    """
+    user_id = payload["uid"]
+    known_version = token_version_cache.get(user_id)
+    if known_version is None:
+        known_version = await auth_service.auth_repo.get_token_version(
+            uuid.UUID(user_id)
+        )
+        await auth_service.session.release()
+        if known_version is None:
+            return False
+        remember_token_version(user_id, known_version)
+    return payload["tv"] >= known_version
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service),
@@ -37,9 +98,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = verify_access_token(token)
         email: str = payload.get("sub")
         log.info(f"payload: {payload}")
         if not email:
@@ -48,10 +107,24 @@ async def get_current_user(
         log.exception(f"Error in get_current_user: {e}")
         raise credentials_exception
 
+    if settings.JWT_STATELESS_CLAIMS and "tv" in payload:
+        if not await is_token_version_current(payload, auth_service):
+            raise credentials_exception
+        return principal_from_claims(payload)
+
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
     user = await auth_service.auth_repo.get_by_email(email)
+    # Читающая транзакция закончена - не держим соединение до конца запроса
+    await auth_service.session.release()
     if not user:
         raise credentials_exception
-    return UserBase.model_validate(user)
+
+    principal = UserBase.model_validate(user)
+    principal_cache.set(email, principal)
+    return principal
 
 
 def require_roles(required_roles: List[UserRole]):
@@ -1,55 +1,62 @@
 import logging
+from email.message import EmailMessage
 
+import aiosmtplib
 from core.config import settings
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+from core.resilience import create_dependency
+from core.smtp_pool import smtp_pool
 from pydantic import EmailStr
 
 log = logging.getLogger(__name__)
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
+
+def is_smtp_failure(error: Exception) -> bool:
+    """
+    Постоянный отказ (5xx) и отказ в получателях не считаются деградацией:
+    плохие адреса не должны открывать circuit breaker.
+    """
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return error.code < 500
+    return True
+
+
+# Повторами писем управляет EmailOutboxWorker, здесь только таймаут и circuit breaker
+smtp_dependency = create_dependency(
+    "SMTP",
+    timeout=settings.MAIL_SEND_TIMEOUT_SECONDS,
+    failure_threshold=settings.EXTERNAL_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=settings.EXTERNAL_BREAKER_RECOVERY_SECONDS,
+    max_retries=0,
+    is_failure=is_smtp_failure,
 )
 
 
-async def send_verification_email(email: EmailStr, token: str):
-    try:
-        verification_link = f"{settings.DOMAIN}/verify_email?token={token}"
-        html_content = f"""<p>Пожалуйста, подтвердите свой адрес электронной почты, перейдя по этой ссылке: <a href="{verification_link}">Подтвердить почту</a></p>"""
-        log.info(html_content)
+def build_html_message(recipient: str, subject: str, html_content: str) -> EmailMessage:
+    """Собирает HTML письмо от MAIL_FROM"""
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(html_content, subtype="html")
+    return message
 
-        message = MessageSchema(
-            subject="Подтверждение электронной почты",
-            recipients=[email],
-            body=html_content,
-            subtype=MessageType.html,
-        )
 
-        fm = FastMail(conf)
-        await fm.send_message(message)
-    except Exception as e:
-        log.error(f"Error sending email: {e}", exc_info=True)
+# Ошибки отправки не подавляются: повторными попытками управляет EmailOutboxWorker
+async def send_verification_email(email: EmailStr, token: str):
+    verification_link = f"{settings.DOMAIN}/verify_email?token={token}"
+    html_content = f"""<p>Пожалуйста, подтвердите свой адрес электронной почты, перейдя по этой ссылке: <a href="{verification_link}">Подтвердить почту</a></p>"""
+    log.info(html_content)
+
+    message = build_html_message(email, "Подтверждение электронной почты", html_content)
+    await smtp_dependency.call(smtp_pool.send, message, retry=False)
 
 
 async def send_password_reset_email(email_to: EmailStr, token: str):
-    try:
-        reset_url = f"{settings.DOMAIN}/reset_password?token={token}"
-        html_content = f"""<p>Для сброса пароля, пожалуйста, перейдите по следующей ссылке: <a href="{reset_url}">Сбросить пароль</a></p>"""
-        log.info(html_content)
-
-        message = MessageSchema(
-            subject="Сброс пароля",
-            recipients=[email_to],
-            body=html_content,
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message)
-    except Exception as e:
-        log.error(f"Error sending email: {e}", exc_info=True)
+    reset_url = f"{settings.DOMAIN}/reset_password?token={token}"
+    html_content = f"""<p>Для сброса пароля, пожалуйста, перейдите по следующей ссылке: <a href="{reset_url}">Сбросить пароль</a></p>"""
+    log.info(html_content)
+
+    message = build_html_message(email_to, "Сброс пароля", html_content)
+    await smtp_dependency.call(smtp_pool.send, message, retry=False)
@@ -3,17 +3,213 @@
 Предоставляет удобные API для различных типов логирования.
 """
 
+import asyncio
+import random
+import threading
 import time
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from core.logger import VectorAILogger, get_logger
-from fastapi import Request
+from core.config import settings
+from core.logger import VectorAILogger, get_client_ip, get_logger
+from starlette.requests import HTTPConnection
+
+
+class _FailureWindow:
+    """Счетчик одинаковых отказов в текущем окне агрегации"""
+
+    __slots__ = ("logger", "started_at", "count", "suppressed")
+
+    def __init__(self, logger: VectorAILogger, started_at: float):
+        self.logger = logger
+        self.started_at = started_at
+        self.count = 0
+        self.suppressed = 0
+
+
+# Ключ агрегации запросов, не совпавших ни с одним маршрутом (сканирование путей)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class LogSampler:
+    """
+    Ограничение объема логов под нагрузкой.
+    Успешные запросы пишутся с вероятностью success_sample_rate. Из одинаковых
+    отказов (IP, событие, причина) за окно пишутся первые failure_burst, остальные
+    попадают в одну сводную запись по окончании окна. Ошибки и 5xx не ограничиваются.
+    Сводки пишет фоновая задача (start) в момент окончания окна; без нее
+    они пишутся при следующем отказе или запросе, то есть с опозданием
+    до summary_interval_seconds.
+    """
+
+    OVERFLOW_IP = "*"
+
+    def __init__(
+        self,
+        success_sample_rate: float = 1.0,
+        failure_burst: int = 5,
+        summary_interval_seconds: float = 60,
+        max_keys: int = 10000,
+    ):
+        self.success_sample_rate = success_sample_rate
+        self.failure_burst = failure_burst
+        self.summary_interval_seconds = summary_interval_seconds
+        self.max_keys = max_keys
+        self._windows: Dict[Tuple[str, str, str], _FailureWindow] = {}
+        self._last_flush = time.monotonic()
+        self._suppressed_total = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def sample_success(self) -> bool:
+        """Записывать ли очередной успешный запрос"""
+        return self.success_sample_rate >= 1.0 or (
+            random.random() < self.success_sample_rate
+        )
+
+    def allow_failure(
+        self,
+        logger: VectorAILogger,
+        client_ip: Optional[str],
+        event: str,
+        reason: str,
+    ) -> bool:
+        """
+        Учитывает отказ и решает, писать ли его отдельной записью.
+
+        Args:
+            logger: Логгер, в который пойдет сводная запись
+            client_ip: IP клиента
+            event: Тип события (login, api_request, ...)
+            reason: Причина отказа
+
+        Returns:
+            True, если запись нужно писать, False - отказ учтен в сводке
+        """
+        now = time.monotonic()
+        key = (client_ip or "unknown", event, reason)
+        with self._lock:
+            expired = self._pop_expired(now)
+            window = self._windows.get(key)
+            if window is None and len(self._windows) >= self.max_keys:
+                # При большом числе источников отказы агрегируются без IP
+                key = (self.OVERFLOW_IP, event, reason)
+                window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _FailureWindow(logger, now)
+            window.count += 1
+            allowed = window.count <= self.failure_burst
+            if not allowed:
+                window.suppressed += 1
+                self._suppressed_total += 1
+
+        self._write_summaries(expired)
+        return allowed
+
+    def _pop_expired(
+        self, now: float, force: bool = False, throttle: bool = True
+    ) -> list[Tuple[Tuple[str, str, str], _FailureWindow]]:
+        """
+        Забирает закончившиеся окна (force - все окна).
+        С throttle проверка выполняется не чаще раза в интервал.
+        """
+        if (
+            throttle
+            and not force
+            and now - self._last_flush < self.summary_interval_seconds
+        ):
+            return []
+        self._last_flush = now
+        expired = [
+            (key, window)
+            for key, window in self._windows.items()
+            if force or now - window.started_at >= self.summary_interval_seconds
+        ]
+        for key, _ in expired:
+            del self._windows[key]
+        return expired
+
+    def _write_summaries(
+        self, expired: list[Tuple[Tuple[str, str, str], _FailureWindow]]
+    ) -> None:
+        now = time.monotonic()
+        for (client_ip, event, reason), window in expired:
+            if not window.suppressed:
+                continue
+            window.logger.warning(
+                f"Repeated {event} failures: {window.suppressed} suppressed",
+                event_type="log_summary",
+                summarized_event=event,
+                reason=reason,
+                client_ip=client_ip,
+                total=window.count,
+                suppressed=window.suppressed,
+                window_seconds=round(now - window.started_at, 1),
+            )
+
+    def maybe_flush(self) -> None:
+        """Пишет сводки по окнам, закончившимся к текущему моменту"""
+        with self._lock:
+            expired = self._pop_expired(time.monotonic())
+        self._write_summaries(expired)
+
+    def flush(self) -> None:
+        """Пишет сводки по всем окнам (при остановке приложения)"""
+        with self._lock:
+            expired = self._pop_expired(time.monotonic(), force=True)
+        self._write_summaries(expired)
+
+    def _next_expiry_delay(self) -> float:
+        """Секунды до окончания самого раннего окна"""
+        with self._lock:
+            if not self._windows:
+                return self.summary_interval_seconds
+            earliest = min(window.started_at for window in self._windows.values())
+        delay = earliest + self.summary_interval_seconds - time.monotonic()
+        return min(self.summary_interval_seconds, max(0.1, delay))
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._next_expiry_delay())
+            with self._lock:
+                expired = self._pop_expired(time.monotonic(), throttle=False)
+            self._write_summaries(expired)
+
+    def start(self) -> None:
+        """Запускает фоновую запись сводок по окончании окон"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую запись сводок"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "success_sample_rate": self.success_sample_rate,
+            "tracked_failure_keys": len(self._windows),
+            "suppressed_total": self._suppressed_total,
+        }
+
+
+log_sampler = LogSampler(
+    success_sample_rate=settings.LOG_SUCCESS_SAMPLE_RATE,
+    failure_burst=settings.LOG_FAILURE_BURST,
+    summary_interval_seconds=settings.LOG_FAILURE_SUMMARY_INTERVAL_SECONDS,
+    max_keys=settings.LOG_FAILURE_MAX_KEYS,
+)
 
 
 def log_api_request(
-    request: Request,
+    request: HTTPConnection,
     logger: VectorAILogger,
     method: str,
     path: str,
@@ -24,9 +220,11 @@ def log_api_request(
 ):
     """
     Логирование API запроса с контекстной информацией.
+    Успешные запросы сэмплируются, повторяющиеся 4xx агрегируются (см. LogSampler),
+    5xx пишутся всегда.
 
     Args:
-        request: FastAPI Request объект
+        request: Запрос (Request или HTTPConnection из ASGI scope)
         logger: Экземпляр логгера
         method: HTTP метод
         path: Путь запроса
@@ -36,12 +234,34 @@ def log_api_request(
         **additional_context: Дополнительный контекст
     """
 
+    log_sampler.maybe_flush()
+    client_ip = request.client.host if request.client else None
+
+    if status_code and status_code >= 500:
+        log = logger.error
+    elif status_code and status_code >= 400:
+        # Ключ по шаблону маршрута: иначе каждый путь (/users/1, /users/2, ...)
+        # получает свое окно и агрегация не работает
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+        if not log_sampler.allow_failure(
+            logger, client_ip, "api_request", f"{method} {route_path} {status_code}"
+        ):
+            return
+        log = logger.warning
+    else:
+        if not log_sampler.sample_success():
+            return
+        log = logger.info
+        if log_sampler.success_sample_rate < 1.0:
+            additional_context["sample_rate"] = log_sampler.success_sample_rate
+
     # Базовый контекст API запроса
     context = {
         "event_type": "api_request",
         "method": method,
         "path": path,
-        "client_ip": request.client.host if request.client else None,
+        "client_ip": client_ip,
         "user_agent": request.headers.get("user-agent"),
         **additional_context,
     }
@@ -56,16 +276,11 @@ def log_api_request(
     if user_id:
         context["user_id"] = user_id
 
-    # Выбираем уровень логирования по статус коду
+    # Уровень логирования выбран по статус коду
     if status_code:
-        if status_code >= 500:
-            logger.error(f"API {method} {path} - {status_code}", **context)
-        elif status_code >= 400:
-            logger.warning(f"API {method} {path} - {status_code}", **context)
-        else:
-            logger.info(f"API {method} {path} - {status_code}", **context)
+        log(f"API {method} {path} - {status_code}", **context)
     else:
-        logger.info(f"API {method} {path}", **context)
+        log(f"API {method} {path}", **context)
 
 
 def log_business_event(
@@ -150,17 +365,27 @@ def log_auth_event(
 ):
     """
     Логирование событий аутентификации.
+    Повторяющиеся неудачи с одного IP по одной причине агрегируются (см. LogSampler).
 
     Args:
         logger: Экземпляр логгера
         event_type: Тип события (login, logout, register, etc.)
         user_email: Email пользователя
         success: Успешность операции
-        client_ip: IP адрес клиента
+        client_ip: IP адрес клиента (по умолчанию IP текущего запроса)
         user_agent: User Agent браузера
         **additional_context: Дополнительный контекст
     """
 
+    client_ip = client_ip or get_client_ip()
+    if not success and not log_sampler.allow_failure(
+        logger,
+        client_ip,
+        event_type,
+        str(additional_context.get("failure_reason", "unknown")),
+    ):
+        return
+
     context = {
         "event_type": "auth_event",
         "auth_event_type": event_type,
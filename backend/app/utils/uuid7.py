@@ -0,0 +1,50 @@
+"""
+Генерация UUIDv7 (RFC 9562): 48 бит unix-времени в миллисекундах,
+12-битный счетчик для монотонности внутри одной миллисекунды и 62 случайных бита.
+Ключи растут со временем, поэтому вставки идут в правый край B-tree индекса.
+"""
+
+import secrets
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_MAX = 0xFFF
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Создает UUID версии 7.
+
+    Returns:
+        UUID, упорядоченный по времени создания
+    """
+    global _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Старший бит счетчика оставляем нулевым, чтобы был запас на инкремент
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                # Счетчик исчерпан - заимствуем следующую миллисекунду
+                _last_ms += 1
+                _counter = secrets.randbits(11)
+        timestamp_ms = _last_ms
+        counter = _counter
+
+    value = (
+        (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return uuid.UUID(int=value)
@@ -0,0 +1,32 @@
+"""
+Общая подготовка микробенчмарков.
+Запуск из каталога backend: python -m benchmarks.<имя_модуля>
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+sys.path.insert(0, str(APP_DIR))
+
+os.environ.setdefault("AILEARNING_JWT_SECRET_KEY", "benchmark-secret-key-" + "x" * 32)
+os.environ.setdefault("AILEARNING_MAIL_FROM", "noreply@example.com")
+
+
+def measure(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """
+    Лучшая из repeat серий по number вызовов.
+
+    Returns:
+        Операций в секунду
+    """
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return number / best
+
+
+def report(name: str, ops_per_second: float, unit: str = "ops/s") -> None:
+    """Печатает строку результата"""
+    print(f"{name:<45} {ops_per_second:>14,.0f} {unit}")
@@ -0,0 +1,34 @@
+"""
+Пропускная способность проверки access токена: jwt.decode на каждый запрос
+против кеша проверенных токенов (verify_access_token).
+"""
+
+import time
+
+from benchmarks._setup import measure, report
+
+# isort: split
+
+from services.auth.cache import access_token_cache
+from services.auth.keys import jwt_keys
+from utils.auth_utils import verify_access_token
+
+NUMBER = 20_000
+
+
+def main() -> None:
+    token = jwt_keys.encode(
+        {"sub": "user@example.com", "type": "access", "exp": int(time.time()) + 600}
+    )
+    access_token_cache.clear()
+    verify_access_token(token)
+
+    report("uncached jwt_keys.decode", measure(lambda: jwt_keys.decode(token), NUMBER))
+    report(
+        "cached verify_access_token",
+        measure(lambda: verify_access_token(token), NUMBER),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Стоимость разрешения AuthService на запрос: прямые вызовы конструкторов,
+исходный путь контейнера (get_service вызывает зарегистрированную
+ServiceFactory.create_auth_service), план контейнера (DIContainer.get_service)
+и обход графа с разбором аннотаций фабрик на каждый запрос (без плана).
+"""
+
+from benchmarks._setup import measure, report
+
+# isort: split
+
+from typing import Any, Callable, Dict, Type
+
+from core.container import DIContainer
+from core.service_factory import ServiceFactory
+from services.auth.google import google_oauth
+from services.auth.repositories.auth import AuthRepository
+from services.auth.repositories.token_refresh import RefreshTokenRepository
+from services.auth.service import AuthService
+from services.email.repositories.outbox import EmailOutboxRepository
+
+# Короткие серии и много повторов: разница путей - десятки наносекунд,
+# минимум по длинным сериям съедает шум планировщика
+NUMBER = 5_000
+REPEAT = 100
+
+
+def walk_graph(container: DIContainer, service_type: Type, **kwargs: Any) -> Any:
+    """Разрешение без плана: аннотации разбираются на каждый запрос"""
+    scoped: Dict[Type, Any] = {}
+
+    def resolve(current: Type) -> Any:
+        if current in container._singletons:
+            return container._singletons[current]
+        if current in scoped:
+            return scoped[current]
+        factory = container._factories[current]
+        arguments = {}
+        for name, annotation in container._dependencies(factory).items():
+            if (
+                annotation in container._singletons
+                or annotation in container._factories
+            ):
+                arguments[name] = resolve(annotation)
+            else:
+                arguments[name] = kwargs[name]
+        scoped[current] = factory(**arguments)
+        return scoped[current]
+
+    return resolve(service_type)
+
+
+class BaselineContainer:
+    """get_service исходного контейнера: проверка синглтонов и вызов фабрики"""
+
+    def __init__(self):
+        self._factories: Dict[Type, Callable] = {}
+        self._singletons: Dict[Type, Any] = {}
+
+    def register_factory(self, service_type: Type, factory_func: Callable):
+        self._factories[service_type] = factory_func
+
+    def get_service(self, service_type: Type, **kwargs) -> Any:
+        if service_type in self._singletons:
+            return self._singletons[service_type]
+        if service_type in self._factories:
+            factory = self._factories[service_type]
+            return factory(**kwargs)
+        raise ValueError(service_type.__name__)
+
+
+def create_auth_service(session: object) -> AuthService:
+    """ServiceFactory.create_auth_service исходного дерева для текущего графа"""
+    auth_repo = AuthRepository(session)
+    refresh_token_repo = RefreshTokenRepository(session)
+    email_outbox_repo = EmailOutboxRepository(session)
+
+    return AuthService(
+        session=session,
+        auth_repo=auth_repo,
+        refresh_token_repo=refresh_token_repo,
+        email_outbox_repo=email_outbox_repo,
+        google_oauth=google_oauth,
+    )
+
+
+def construct_directly(session: object) -> AuthService:
+    return AuthService(
+        session=session,
+        auth_repo=AuthRepository(session),
+        refresh_token_repo=RefreshTokenRepository(session),
+        email_outbox_repo=EmailOutboxRepository(session),
+        google_oauth=google_oauth,
+    )
+
+
+def main() -> None:
+    container = DIContainer()
+    ServiceFactory.register_services(container)
+    baseline = BaselineContainer()
+    baseline.register_factory(AuthService, create_auth_service)
+    session = object()
+
+    report(
+        "direct constructors",
+        measure(lambda: construct_directly(session), NUMBER, REPEAT),
+    )
+    report(
+        "baseline get_service (create_auth_service)",
+        measure(
+            lambda: baseline.get_service(AuthService, session=session), NUMBER, REPEAT
+        ),
+    )
+    report(
+        "DIContainer.get_service (plan)",
+        measure(
+            lambda: container.get_service(AuthService, session=session), NUMBER, REPEAT
+        ),
+    )
+    report(
+        "graph walk per request",
+        measure(
+            lambda: walk_graph(container, AuthService, session=session), NUMBER // 10
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
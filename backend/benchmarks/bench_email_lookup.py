@@ -0,0 +1,80 @@
+"""
+Задержка поиска пользователя по email на N пользователях (по умолчанию 1M):
+последовательное сканирование против индекса на lower(email).
+Требует PostgreSQL из настроек AILEARNING_POSTGRES_*; данные создаются
+во временной таблице и удаляются вместе с соединением.
+
+    python -m benchmarks.bench_email_lookup --users 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks._setup import report
+
+# isort: split
+
+from core.config import settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+LOOKUP = text("SELECT id FROM users_bench WHERE lower(email) = :email")
+
+
+async def measure_lookups(
+    connection: AsyncConnection, users: int, lookups: int
+) -> list[float]:
+    """Задержки lookups случайных поисков в миллисекундах"""
+    latencies = []
+    for _ in range(lookups):
+        email = f"User{random.randint(1, users)}@Example.com".lower()
+        started_at = time.perf_counter()
+        await connection.execute(LOOKUP, {"email": email})
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return latencies
+
+
+def report_latencies(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:<45} p50 {quantiles[49]:8.3f} ms   p99 {quantiles[98]:8.3f} ms")
+    report(f"{name} throughput", len(latencies) / (sum(latencies) / 1000), "lookups/s")
+
+
+async def main(users: int, seq_lookups: int, index_lookups: int) -> None:
+    engine = create_async_engine(settings.POSTGRES_URL)
+    async with engine.connect() as connection:
+        await connection.execute(
+            text(
+                "CREATE TEMP TABLE users_bench AS "
+                "SELECT gen_random_uuid() AS id, 'user' || g || '@example.com' AS email "
+                "FROM generate_series(1, :users) AS g"
+            ),
+            {"users": users},
+        )
+        await connection.execute(text("ANALYZE users_bench"))
+        report_latencies(
+            "sequential scan",
+            await measure_lookups(connection, users, seq_lookups),
+        )
+
+        await connection.execute(
+            text("CREATE UNIQUE INDEX ON users_bench (lower(email))")
+        )
+        await connection.execute(text("ANALYZE users_bench"))
+        report_latencies(
+            "lower(email) index",
+            await measure_lookups(connection, users, index_lookups),
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--seq-lookups", type=int, default=50)
+    parser.add_argument("--index-lookups", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.seq_lookups, args.index_lookups))
@@ -0,0 +1,107 @@
+"""
+Пропускная способность JSON форматтера логов: прежний StructuredFormatter
+(dict на запись, datetime.utcnow, json.dumps) против текущего с кешем
+секунды и заранее сериализованными полями, на json и на orjson (если установлен).
+"""
+
+from benchmarks._setup import measure, report
+
+# isort: split
+
+import json
+import logging
+import sys
+import warnings
+from datetime import datetime
+
+from core import logger as logger_module
+from core.constants import RequestTracing
+from core.logger import StructuredFormatter, request_context
+
+NUMBER = 20_000
+
+
+class BaselineFormatter(logging.Formatter):
+    """StructuredFormatter до оптимизации"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_data = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        request_id = request_context.get()
+        if request_id:
+            log_data[RequestTracing.LOG_REQUEST_ID_KEY] = request_id
+        if hasattr(record, "extra") and getattr(record, "extra", None):
+            extra_data = getattr(record, "extra")
+            if isinstance(extra_data, dict):
+                log_data.update(extra_data)
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        if record.levelno >= logging.ERROR and record.stack_info:
+            log_data["stack_trace"] = self.formatStack(record.stack_info)
+        return json.dumps(log_data, ensure_ascii=False, separators=(",", ":"))
+
+
+def make_records() -> dict[str, logging.LogRecord]:
+    info = logging.LogRecord(
+        "api.requests", logging.INFO, __file__, 10, "Request completed", None, None
+    )
+    info.extra = {
+        "event_type": "api_request",
+        "method": "POST",
+        "path": "/api/v1/auth/login",
+        "status_code": 200,
+        "duration_ms": 12.5,
+        "client_ip": "10.0.0.1",
+    }
+    info.request_id = "3f0c6f1e-6a3b-4c1d-9d7e-1b2c3d4e5f60"
+
+    try:
+        raise ValueError("invalid token")
+    except ValueError:
+        exc_info = sys.exc_info()
+    error = logging.LogRecord(
+        "auth.service", logging.ERROR, __file__, 20, "Login failed", None, exc_info
+    )
+    error.extra = {"event_type": "auth", "reason": "invalid_token"}
+    return {"info": info, "error": error}
+
+
+def stdlib_formatter() -> StructuredFormatter:
+    orjson, logger_module.orjson = logger_module.orjson, None
+    try:
+        return StructuredFormatter()
+    finally:
+        logger_module.orjson = orjson
+
+
+def main() -> None:
+    # datetime.utcnow прежнего форматтера устарел в Python 3.12
+    warnings.simplefilter("ignore", DeprecationWarning)
+    formatters = {
+        "baseline": BaselineFormatter(),
+        "current/json": stdlib_formatter(),
+    }
+    if logger_module.orjson is not None:
+        formatters["current/orjson"] = StructuredFormatter()
+    else:
+        print("orjson не установлен, вариант current/orjson пропущен")
+
+    for kind, record in make_records().items():
+        for name, formatter in formatters.items():
+
+            def format_once() -> str:
+                # Каждая запись форматируется один раз: traceback рендерится заново
+                record.exc_text = None
+                return formatter.format(record)
+
+            report(f"{kind}: {name}", measure(format_once, NUMBER), "records/s")
+
+
+if __name__ == "__main__":
+    main()
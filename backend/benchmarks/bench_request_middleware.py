@@ -0,0 +1,149 @@
+"""
+Пропускная способность middleware контекста запроса: прежняя пара
+RequestIDMiddleware + APILoggingMiddleware на BaseHTTPMiddleware против
+RequestContextMiddleware (чистый ASGI). Запросы подаются напрямую в ASGI
+приложение без сети и HTTP клиента, логи пишутся в /dev/null.
+"""
+
+from benchmarks._setup import measure, report
+
+# isort: split
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Callable
+
+from core.config import settings
+from core.constants import RequestTracing
+from core.logger import (
+    LogFormat,
+    clear_request_id,
+    get_log_pipeline,
+    get_logger,
+    set_request_id,
+)
+from core.logging_middleware import RequestContextMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from utils.log_helper import log_api_request, log_sampler
+
+BATCH = 200
+NUMBER = 10
+
+
+class RequestIDMiddleware(BaseHTTPMiddleware):
+    """Прежний core.exception_handler.RequestIDMiddleware"""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get(RequestTracing.HEADER_REQUEST_ID) or str(
+            uuid.uuid4()
+        )
+        request.state.request_id = request_id
+        set_request_id(request_id)
+        try:
+            response = await call_next(request)
+            response.headers[RequestTracing.HEADER_REQUEST_ID] = request_id
+            return response
+        finally:
+            clear_request_id()
+
+
+class APILoggingMiddleware(BaseHTTPMiddleware):
+    """Прежний core.logging_middleware.APILoggingMiddleware"""
+
+    def __init__(self, app, logger_name: str = "vectorai.api"):
+        super().__init__(app)
+        self.logger = get_logger(logger_name)
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        method = request.method
+        path = str(request.url.path)
+        self.logger.info(
+            f"API Request started: {method} {path}",
+            event_type="api_request_start",
+            method=method,
+            path=path,
+            client_ip=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+        )
+        response = await call_next(request)
+        log_api_request(
+            request=request,
+            logger=self.logger,
+            method=method,
+            path=path,
+            status_code=response.status_code,
+            duration_ms=(time.time() - start_time) * 1000,
+        )
+        return response
+
+
+async def ping(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("pong")
+
+
+def make_app(middleware: list[Middleware]) -> Starlette:
+    return Starlette(routes=[Route("/ping", ping)], middleware=middleware)
+
+
+def make_runner(app: Starlette, loop: asyncio.AbstractEventLoop) -> Callable[[], None]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def batch():
+        for _ in range(BATCH):
+            await app(dict(scope), receive, send)
+
+    return lambda: loop.run_until_complete(batch())
+
+
+def main() -> None:
+    pipeline = get_log_pipeline(LogFormat(settings.LOG_FORMAT), settings.LOG_FILE)
+    pipeline.handlers[0].setStream(open(os.devnull, "w"))
+    # Каждый успешный запрос пишется в лог в обоих вариантах
+    log_sampler.success_sample_rate = 1.0
+
+    stacks = {
+        "BaseHTTPMiddleware (request id + logging)": make_app(
+            [Middleware(RequestIDMiddleware), Middleware(APILoggingMiddleware)]
+        ),
+        "RequestContextMiddleware (ASGI)": make_app(
+            [Middleware(RequestContextMiddleware)]
+        ),
+    }
+    loop = asyncio.new_event_loop()
+    for name, app in stacks.items():
+        runner = make_runner(app, loop)
+        runner()
+        report(name, measure(runner, NUMBER) * BATCH, "req/s")
+    loop.close()
+    pipeline.stop()
+
+
+if __name__ == "__main__":
+    main()
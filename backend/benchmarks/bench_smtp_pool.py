@@ -0,0 +1,106 @@
+"""
+Пропускная способность отправки писем на локальный SMTP сервер (aiosmtpd):
+новое соединение на каждое письмо (как отправлял прежний fastapi-mail)
+против пула постоянных соединений SMTPConnectionPool.
+На реальном сервере разница больше: к TCP и EHLO добавляются STARTTLS и AUTH.
+
+    python -m benchmarks.bench_smtp_pool --messages 2000 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+from email.message import EmailMessage
+
+from benchmarks._setup import report
+
+# isort: split
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+from core.smtp_pool import SMTPConnectionPool
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_message(number: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = f"user{number}@example.com"
+    message["Subject"] = "Подтверждение электронной почты"
+    message.set_content("<p>Подтвердите почту</p>", subtype="html")
+    return message
+
+
+async def send_all(send, messages: int, concurrency: int) -> float:
+    """Отправляет messages писем в concurrency потоков, возвращает писем в секунду"""
+    queue = iter(range(messages))
+
+    async def worker():
+        for number in queue:
+            await send(make_message(number))
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return messages / (time.perf_counter() - started_at)
+
+
+async def main(messages: int, concurrency: int) -> None:
+    handler = CountingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+
+        async def send_with_new_connection(message: EmailMessage) -> None:
+            await aiosmtplib.send(
+                message, hostname="127.0.0.1", port=port, start_tls=False, timeout=10
+            )
+
+        report(
+            "new connection per message",
+            await send_all(send_with_new_connection, messages, concurrency),
+            "msg/s",
+        )
+
+        pool = SMTPConnectionPool(
+            hostname="127.0.0.1",
+            port=port,
+            start_tls=False,
+            timeout=10,
+            max_connections=concurrency,
+            max_messages_per_connection=messages,
+        )
+        report(
+            "SMTPConnectionPool",
+            await send_all(pool.send, messages, concurrency),
+            "msg/s",
+        )
+        metrics = pool.get_metrics()
+        await pool.close()
+        print(f"pool connects: {metrics['connects']}, sent: {metrics['sent']}")
+    finally:
+        controller.stop()
+    assert handler.received == 2 * messages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.concurrency))
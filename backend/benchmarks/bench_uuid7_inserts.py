@@ -0,0 +1,75 @@
+"""
+Первичные ключи uuid4 против uuid7: скорость генерации, скорость вставки
+в PostgreSQL и размер B-tree индекса первичного ключа после вставки.
+Вставка требует PostgreSQL из настроек AILEARNING_POSTGRES_*, таблицы временные.
+
+    python -m benchmarks.bench_uuid7_inserts --rows 1000000
+    python -m benchmarks.bench_uuid7_inserts --no-db
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Callable
+
+from benchmarks._setup import measure, report
+
+# isort: split
+
+from core.config import settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from utils.uuid7 import uuid7
+
+BATCH_SIZE = 5000
+
+
+async def insert_rows(
+    connection: AsyncConnection,
+    table: str,
+    make_id: Callable[[], uuid.UUID],
+    rows: int,
+) -> None:
+    await connection.execute(
+        text(f"CREATE TEMP TABLE {table} (id uuid PRIMARY KEY, payload text)")
+    )
+    started_at = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = [
+            {"id": make_id(), "payload": "x" * 64}
+            for _ in range(min(BATCH_SIZE, rows - offset))
+        ]
+        await connection.execute(
+            text(f"INSERT INTO {table} (id, payload) VALUES (:id, :payload)"), batch
+        )
+    elapsed = time.perf_counter() - started_at
+    index_size = (
+        await connection.execute(text(f"SELECT pg_relation_size('{table}_pkey')"))
+    ).scalar_one()
+    report(f"{table} insert", rows / elapsed, "rows/s")
+    print(f"{table + ' pkey size':<45} {index_size / 1024 / 1024:>14,.1f} MiB")
+
+
+async def run_inserts(rows: int) -> None:
+    engine = create_async_engine(settings.POSTGRES_URL)
+    async with engine.connect() as connection:
+        await insert_rows(connection, "ids_uuid4", uuid.uuid4, rows)
+        await insert_rows(connection, "ids_uuid7", uuid7, rows)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--no-db", action="store_true", help="только генерация id")
+    args = parser.parse_args()
+
+    report("uuid.uuid4()", measure(uuid.uuid4, 200_000))
+    report("uuid7()", measure(uuid7, 200_000))
+    if not args.no_db:
+        asyncio.run(run_inserts(args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Общие настройки тестов.
+Приложение импортируется из каталога app (pythonpath в pyproject.toml),
+обязательные настройки задаются до первого импорта core.config.
+"""
+
+import os
+
+os.environ.setdefault("AILEARNING_JWT_SECRET_KEY", "test-secret-key-" + "x" * 32)
+os.environ.setdefault("AILEARNING_MAIL_FROM", "noreply@example.com")
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
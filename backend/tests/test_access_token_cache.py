@@ -0,0 +1,58 @@
+import time
+
+import jwt
+import pytest
+from services.auth.cache import access_token_cache
+from services.auth.keys import jwt_keys
+from utils import auth_utils
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    access_token_cache.clear()
+    yield
+    access_token_cache.clear()
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    original = jwt_keys.decode
+
+    def counting_decode(token: str) -> dict:
+        calls.append(token)
+        return original(token)
+
+    monkeypatch.setattr(jwt_keys, "decode", counting_decode)
+    return calls
+
+
+def test_repeated_token_skips_signature_verification(decode_calls):
+    token = jwt_keys.encode({"sub": "user@example.com", "exp": int(time.time()) + 60})
+
+    first = auth_utils.verify_access_token(token)
+    second = auth_utils.verify_access_token(token)
+
+    assert first == second
+    assert decode_calls == [token]
+
+
+def test_invalid_token_is_not_cached(decode_calls):
+    token = jwt_keys.encode({"sub": "user@example.com", "exp": int(time.time()) - 1})
+
+    for _ in range(2):
+        with pytest.raises(jwt.ExpiredSignatureError):
+            auth_utils.verify_access_token(token)
+    assert len(decode_calls) == 2
+
+
+def test_cached_entry_expires_with_token(decode_calls, monkeypatch):
+    token = jwt_keys.encode({"sub": "user@example.com", "exp": int(time.time()) + 60})
+    auth_utils.verify_access_token(token)
+
+    # Через минуту запись кеша истекает вместе с exp токена
+    # и подпись проверяется заново
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    auth_utils.verify_access_token(token)
+    assert len(decode_calls) == 2
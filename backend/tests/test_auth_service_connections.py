@@ -0,0 +1,196 @@
+"""
+AuthService не держит соединение из пула во время хеширования пароля.
+Сессия-заглушка ведет счетчик соединений так же, как пул SQLAlchemy:
+первый запрос занимает соединение, commit/rollback возвращает его,
+release - реальный LazyAsyncSession.release.
+"""
+
+import pytest
+from core.database import LazyAsyncSession
+from core.exceptions import DatabaseError, DuplicateError
+from models import UserModel
+from services.auth import service as service_module
+from services.auth.repositories.auth import USERS_EMAIL_UNIQUE_INDEX
+from services.auth.service import AuthService
+from sqlalchemy.exc import IntegrityError
+
+pytestmark = pytest.mark.anyio
+
+
+class PoolTrackingSession:
+    def __init__(self):
+        self.checked_out = False
+        self.checkouts = 0
+        self.new: list = []
+        self.dirty: list = []
+        self.deleted: list = []
+        self.has_writes = False
+        # Ошибка, которую вернет commit с новыми объектами (INSERT)
+        self.commit_error: Exception | None = None
+        self.rollbacks = 0
+
+    release = LazyAsyncSession.release
+
+    def checkout(self) -> None:
+        if not self.checked_out:
+            self.checked_out = True
+            self.checkouts += 1
+
+    def in_transaction(self) -> bool:
+        return self.checked_out
+
+    def add(self, instance) -> None:
+        self.new.append(instance)
+
+    async def commit(self) -> None:
+        inserts = bool(self.new)
+        if inserts:
+            self.checkout()
+        self.new.clear()
+        self.checked_out = False
+        if inserts and self.commit_error is not None:
+            raise self.commit_error
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+        self.new.clear()
+        self.checked_out = False
+
+
+class FakeAuthRepository:
+    def __init__(self, session: PoolTrackingSession, user: UserModel | None = None):
+        self.session = session
+        self.user = user
+
+    async def get_by_email(self, email):
+        self.session.checkout()
+        return self.user
+
+    async def email_exists(self, email):
+        self.session.checkout()
+        return self.user is not None
+
+    async def save(self, instance):
+        self.session.add(instance)
+        return instance
+
+    async def increment_token_version(self, user_id, **values):
+        self.session.checkout()
+        return 1
+
+
+class FakeRefreshTokenRepository:
+    def __init__(self, session: PoolTrackingSession):
+        self.session = session
+
+    async def revoke_all_for_user(self, user_id):
+        self.session.checkout()
+        return 0
+
+
+class FakeOutboxRepository:
+    def __init__(self, session: PoolTrackingSession):
+        self.session = session
+
+    async def enqueue(self, kind, recipient, payload):
+        self.session.add(payload)
+
+
+@pytest.fixture
+def session():
+    return PoolTrackingSession()
+
+
+@pytest.fixture
+def held_during_hashing(monkeypatch, session):
+    """Состояние соединения в момент передачи работы в пул хеширования"""
+    observed = []
+
+    async def run(func, *args):
+        observed.append(session.checked_out)
+        return func(*args)
+
+    monkeypatch.setattr(service_module.password_executor, "run", run)
+    monkeypatch.setattr(
+        AuthService, "get_password_hash", staticmethod(lambda p: "hash")
+    )
+    monkeypatch.setattr(AuthService, "verify_password", staticmethod(lambda p, h: True))
+    monkeypatch.setattr(
+        service_module.password_hashers, "needs_rehash", lambda h: False
+    )
+    return observed
+
+
+def make_service(session, user=None) -> AuthService:
+    return AuthService(
+        session=session,
+        auth_repo=FakeAuthRepository(session, user),
+        refresh_token_repo=FakeRefreshTokenRepository(session),
+        email_outbox_repo=FakeOutboxRepository(session),
+        google_oauth=None,
+    )
+
+
+def make_user() -> UserModel:
+    return UserModel(
+        email="user@example.com",
+        username="user",
+        password="hash",
+        is_verified=True,
+        token_version=0,
+    )
+
+
+async def test_register_user_hashes_without_connection(session, held_during_hashing):
+    await make_service(session).register_user("user@example.com", "secret-password")
+
+    assert held_during_hashing == [False]
+    assert session.checkouts == 2  # проверка email и запись пользователя
+    assert not session.checked_out
+
+
+async def test_authenticate_user_verifies_without_connection(
+    session, held_during_hashing
+):
+    await make_service(session, make_user()).authenticate_user(
+        "user@example.com", "secret-password"
+    )
+
+    assert held_during_hashing == [False]
+    assert not session.checked_out
+
+
+async def test_reset_password_hashes_without_connection(session, held_during_hashing):
+    service = make_service(session, make_user())
+    token = service.create_password_reset_token("user@example.com")
+
+    await service.reset_password(token, "new-password")
+
+    assert held_during_hashing == [False]
+    assert not session.checked_out
+
+
+def unique_violation(constraint: str) -> IntegrityError:
+    cause = type(
+        "UniqueViolationError", (Exception,), {"constraint_name": constraint}
+    )()
+    orig = type("IntegrityError", (Exception,), {"sqlstate": "23505"})("duplicate key")
+    orig.__cause__ = cause
+    return IntegrityError("INSERT INTO users", {}, orig)
+
+
+async def test_concurrent_registration_raises_duplicate_error(
+    session, held_during_hashing
+):
+    session.commit_error = unique_violation(USERS_EMAIL_UNIQUE_INDEX)
+
+    with pytest.raises(DuplicateError):
+        await make_service(session).register_user("user@example.com", "secret-password")
+    assert session.rollbacks == 1
+
+
+async def test_other_integrity_error_is_database_error(session, held_during_hashing):
+    session.commit_error = unique_violation("some_other_constraint")
+
+    with pytest.raises(DatabaseError):
+        await make_service(session).register_user("user@example.com", "secret-password")
@@ -0,0 +1,258 @@
+"""
+Жизненный цикл refresh токенов на уровне AuthService.
+Репозиторий-заглушка хранит токены в памяти и повторяет условия SQL запросов:
+поиск по selector, сверка хеша verifier, отзыв и срок действия.
+"""
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from core.config import settings
+from core.constants import AuthErrorMessages
+from core.exceptions import AuthenticationError
+from models import UserModel
+from services.auth import service as service_module
+from services.auth.keys import jwt_keys
+from services.auth.repositories.token_refresh import (
+    hash_refresh_verifier,
+    split_refresh_token,
+)
+from services.auth.service import AuthService
+
+pytestmark = pytest.mark.anyio
+
+
+@dataclass
+class StoredToken:
+    user_id: uuid.UUID
+    selector: str
+    verifier_hash: bytes
+    expires_at: datetime
+    revoked: bool = False
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def release(self):
+        pass
+
+    def add(self, instance):
+        pass
+
+
+class InMemoryRefreshTokens:
+    def __init__(self, users: dict[uuid.UUID, UserModel]):
+        self.users = users
+        self.tokens: dict[str, StoredToken] = {}
+
+    def _find(self, token: str, active: bool) -> StoredToken | None:
+        selector, verifier = split_refresh_token(token)
+        stored = self.tokens.get(selector)
+        if stored is None or stored.verifier_hash != hash_refresh_verifier(verifier):
+            return None
+        now = datetime.now(timezone.utc)
+        if active and (stored.revoked or stored.expires_at <= now):
+            return None
+        return stored
+
+    async def issue(self, user_id, selector, verifier_hash, expires_at, max_sessions):
+        self.tokens[selector] = StoredToken(
+            user_id, selector, verifier_hash, expires_at
+        )
+        # Самые старые активные сессии сверх лимита отзываются
+        active = [
+            stored
+            for stored in self.tokens.values()
+            if stored.user_id == user_id and not stored.revoked
+        ]
+        for stored in active[: max(0, len(active) - max_sessions)]:
+            stored.revoked = True
+
+    async def rotate(self, token, new_selector, new_verifier_hash, expires_at):
+        stored = self._find(token, active=True)
+        if stored is None:
+            return None
+        stored.revoked = True
+        self.tokens[new_selector] = StoredToken(
+            stored.user_id, new_selector, new_verifier_hash, expires_at
+        )
+        return self.users[stored.user_id]
+
+    async def get_by_token(self, token, expires_after=None):
+        stored = self._find(token, active=False)
+        if stored is None or (expires_after and stored.expires_at <= expires_after):
+            return None
+        return stored
+
+    async def revoke_by_token(self, token):
+        stored = self._find(token, active=True)
+        if stored is None:
+            return False
+        stored.revoked = True
+        return True
+
+    async def revoke_all_for_user(self, user_id):
+        revoked = 0
+        for stored in self.tokens.values():
+            if stored.user_id == user_id and not stored.revoked:
+                stored.revoked = True
+                revoked += 1
+        return revoked
+
+
+class FakeAuthRepository:
+    def __init__(self, users: dict[uuid.UUID, UserModel]):
+        self.users = users
+
+    async def get_by_email(self, email):
+        return next((u for u in self.users.values() if u.email == email), None)
+
+    async def increment_token_version(self, user_id, **values):
+        user = self.users[user_id]
+        user.token_version += 1
+        for name, value in values.items():
+            setattr(user, name, value)
+        return user.token_version
+
+
+@pytest.fixture
+def user() -> UserModel:
+    return UserModel(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        username="user",
+        password="hash",
+        role="user",
+        is_verified=True,
+        token_version=0,
+    )
+
+
+@pytest.fixture
+def service(monkeypatch, user) -> AuthService:
+    async def run(func, *args):
+        return func(*args)
+
+    monkeypatch.setattr(service_module.password_executor, "run", run)
+    monkeypatch.setattr(
+        AuthService, "get_password_hash", staticmethod(lambda p: "new-hash")
+    )
+    users = {user.id: user}
+    return AuthService(
+        session=FakeSession(),
+        auth_repo=FakeAuthRepository(users),
+        refresh_token_repo=InMemoryRefreshTokens(users),
+        email_outbox_repo=None,
+        google_oauth=None,
+    )
+
+
+async def assert_rejected(service: AuthService, token: str, message: str) -> None:
+    with pytest.raises(AuthenticationError) as exc_info:
+        await service.refresh_access_token(token)
+    assert str(exc_info.value) == message
+
+
+def expire(service: AuthService, token: str, ago: timedelta) -> None:
+    selector, _ = split_refresh_token(token)
+    stored = service.refresh_token_repo.tokens[selector]
+    stored.expires_at = datetime.now(timezone.utc) - ago
+
+
+async def test_refresh_rotates_token(service, user):
+    token = await service.create_refresh_token(user.id)
+
+    tokens = await service.refresh_access_token(token)
+
+    assert jwt_keys.decode(tokens["access_token"])["sub"] == user.email
+    assert tokens["refresh_token"] != token
+    # Новый токен принимается, ротация снова выдает следующий
+    assert await service.refresh_access_token(tokens["refresh_token"])
+    assert service.session.commits == 3
+    assert service.session.rollbacks == 0
+
+
+async def test_reused_rotated_token_is_revoked(service, user):
+    token = await service.create_refresh_token(user.id)
+    await service.refresh_access_token(token)
+
+    await assert_rejected(service, token, AuthErrorMessages.REFRESH_TOKEN_REVOKED)
+    assert service.session.rollbacks == 1
+
+
+@pytest.mark.parametrize(
+    ("ago", "message"),
+    [
+        (timedelta(minutes=5), AuthErrorMessages.REFRESH_TOKEN_EXPIRED),
+        # Старше срока хранения - партиция могла быть удалена
+        (
+            timedelta(hours=settings.REFRESH_TOKEN_RETENTION_HOURS + 1),
+            AuthErrorMessages.REFRESH_TOKEN_NOT_FOUND,
+        ),
+    ],
+    ids=["recently-expired", "past-retention"],
+)
+async def test_expired_token(service, user, ago, message):
+    token = await service.create_refresh_token(user.id)
+    expire(service, token, ago)
+
+    await assert_rejected(service, token, message)
+
+
+async def test_unknown_token(service, user):
+    token = await service.create_refresh_token(user.id)
+    selector, _ = split_refresh_token(token)
+
+    await assert_rejected(
+        service, f"{selector}.forged", AuthErrorMessages.REFRESH_TOKEN_NOT_FOUND
+    )
+    await assert_rejected(
+        service, "unknown.token", AuthErrorMessages.REFRESH_TOKEN_NOT_FOUND
+    )
+
+
+async def test_issue_revokes_sessions_over_limit(monkeypatch, service, user):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_MAX_SESSIONS", 2)
+    tokens = [await service.create_refresh_token(user.id) for _ in range(3)]
+
+    await assert_rejected(service, tokens[0], AuthErrorMessages.REFRESH_TOKEN_REVOKED)
+    for token in tokens[1:]:
+        assert await service.refresh_access_token(token)
+
+
+async def test_logout_revokes_refresh_token(service, user):
+    token = await service.create_refresh_token(user.id)
+
+    await service.logout(token)
+
+    await assert_rejected(service, token, AuthErrorMessages.REFRESH_TOKEN_REVOKED)
+
+
+async def test_logout_without_cookie_is_noop(service):
+    await service.logout(None)
+    await service.logout("unknown.token")
+
+    assert service.session.commits == 0
+
+
+async def test_reset_password_revokes_all_refresh_tokens(service, user):
+    tokens = [await service.create_refresh_token(user.id) for _ in range(2)]
+    reset_token = service.create_password_reset_token(user.email)
+
+    await service.reset_password(reset_token, "new-password")
+
+    assert user.password == "new-hash"
+    assert user.token_version == 1
+    for token in tokens:
+        await assert_rejected(service, token, AuthErrorMessages.REFRESH_TOKEN_REVOKED)
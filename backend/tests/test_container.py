@@ -0,0 +1,128 @@
+import pytest
+from core.container import DIContainer, Lifetime
+
+
+class Config:
+    pass
+
+
+class Session:
+    pass
+
+
+class Repository:
+    def __init__(self, session: Session, config: Config):
+        self.session = session
+        self.config = config
+
+
+class Cache:
+    created = 0
+
+    def __init__(self, config: Config):
+        Cache.created += 1
+        self.config = config
+
+
+class Helper:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+class Service:
+    def __init__(
+        self,
+        session: Session,
+        first_repo: Repository,
+        second_repo: Repository,
+        first_helper: Helper,
+        second_helper: Helper,
+        cache: Cache,
+    ):
+        self.session = session
+        self.first_repo = first_repo
+        self.second_repo = second_repo
+        self.first_helper = first_helper
+        self.second_helper = second_helper
+        self.cache = cache
+
+
+def make_report(config: Config, session: Session, *, helper: Helper) -> dict:
+    return {"config": config, "session": session, "helper": helper}
+
+
+class Cyclic:
+    def __init__(self, other: "Cyclic"):
+        self.other = other
+
+
+@pytest.fixture
+def container() -> DIContainer:
+    Cache.created = 0
+    container = DIContainer()
+    container.register_singleton(Config, Config())
+    container.register_factory(Repository, Repository, Lifetime.SCOPED)
+    container.register_factory(Helper, Helper, Lifetime.TRANSIENT)
+    container.register_factory(Cache, Cache, Lifetime.SINGLETON)
+    container.register_factory(Service, Service, Lifetime.SCOPED)
+    container.compile()
+    return container
+
+
+def test_lifetimes(container):
+    session = Session()
+    service = container.get_service(Service, session=session)
+
+    # Scoped - один экземпляр на разрешение, transient - на каждого потребителя
+    assert service.first_repo is service.second_repo
+    assert service.first_helper is not service.second_helper
+    assert service.first_repo.session is session
+    assert service.first_helper.session is session
+    assert service.first_repo.config is container.get_service(Config)
+
+    other = container.get_service(Service, session=Session())
+    assert other is not service
+    assert other.first_repo is not service.first_repo
+    # Singleton создается один раз при compile
+    assert other.cache is service.cache
+    assert Cache.created == 1
+
+
+def test_missing_kwarg_raises_type_error(container):
+    with pytest.raises(TypeError, match="session"):
+        container.get_service(Service)
+
+
+def test_unregistered_service(container):
+    with pytest.raises(ValueError):
+        container.get_service(Session)
+
+
+def test_registration_after_compile_rebuilds_plans(container):
+    container.get_service(Service, session=Session())
+    container.register_factory(Repository, Repository, Lifetime.TRANSIENT)
+
+    service = container.get_service(Service, session=Session())
+
+    assert service.first_repo is not service.second_repo
+
+
+def test_keyword_only_and_singleton_in_the_middle(container):
+    # Синглтон перед обычными параметрами и keyword-only параметр
+    # не дают передать аргументы позиционно
+    container.register_factory(dict, make_report)
+    session = Session()
+
+    report = container.get_service(dict, session=session)
+
+    assert report["config"] is container.get_service(Config)
+    assert report["session"] is session
+    assert report["helper"].session is session
+
+
+def test_cycle_is_reported():
+    container = DIContainer()
+    container.register_factory(Cyclic, Cyclic)
+
+    with pytest.raises(ValueError, match="Циклическая"):
+        container.compile()
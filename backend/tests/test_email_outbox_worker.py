@@ -0,0 +1,154 @@
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from models import EmailKind, EmailOutboxModel, EmailStatus
+from services.email import outbox_worker
+from services.email.repositories.outbox import EmailOutboxRepository
+from sqlalchemy.dialects import postgresql
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeOutboxRepository:
+    batch: list[EmailOutboxModel] = []
+    sent: list[uuid.UUID] = []
+    failed: list[tuple[uuid.UUID, bool]] = []
+    purge_results: list[int] = []
+    sessions: list[FakeSession] = []
+
+    def __init__(self, session):
+        self.session = session
+
+    async def claim_batch(self, batch_size, lease):
+        return self.batch
+
+    async def mark_sent(self, message_id):
+        self.sent.append(message_id)
+
+    async def mark_failed(self, message_id, error, retry_at):
+        self.failed.append((message_id, retry_at is None))
+
+    async def purge_finished(self, older_than, limit):
+        return self.purge_results.pop(0)
+
+
+@asynccontextmanager
+async def session_factory():
+    session = FakeSession()
+    FakeOutboxRepository.sessions.append(session)
+    yield session
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    FakeOutboxRepository.batch = []
+    FakeOutboxRepository.sent = []
+    FakeOutboxRepository.failed = []
+    FakeOutboxRepository.purge_results = []
+    FakeOutboxRepository.sessions = []
+    monkeypatch.setattr(outbox_worker, "EmailOutboxRepository", FakeOutboxRepository)
+    return FakeOutboxRepository
+
+
+def make_message(token: str, attempts: int = 1) -> EmailOutboxModel:
+    return EmailOutboxModel(
+        id=uuid.uuid4(),
+        kind=EmailKind.VERIFICATION,
+        recipient="user@example.com",
+        payload={"token": token},
+        attempts=attempts,
+    )
+
+
+def make_worker(**kwargs) -> outbox_worker.EmailOutboxWorker:
+    return outbox_worker.EmailOutboxWorker(
+        session_factory=session_factory, max_attempts=3, **kwargs
+    )
+
+
+async def test_run_once_records_batch_results_in_one_session(repository, monkeypatch):
+    ok = make_message("ok")
+    retry = make_message("fail", attempts=1)
+    gave_up = make_message("fail", attempts=3)
+    repository.batch = [ok, retry, gave_up]
+
+    async def send(recipient, token):
+        if token == "fail":
+            raise ConnectionError("smtp down")
+
+    monkeypatch.setitem(outbox_worker.EMAIL_SENDERS, EmailKind.VERIFICATION, send)
+
+    assert await make_worker().run_once() == 3
+
+    # Одна сессия на захват и одна на запись результатов всей пачки
+    assert len(repository.sessions) == 2
+    assert [session.commits for session in repository.sessions] == [1, 1]
+    assert repository.sent == [ok.id]
+    assert repository.failed == [(retry.id, False), (gave_up.id, True)]
+
+
+async def test_run_once_empty_batch_opens_single_session(repository):
+    assert await make_worker().run_once() == 0
+    assert len(repository.sessions) == 1
+
+
+async def test_purge_once_deletes_in_batches(repository):
+    repository.purge_results = [10, 10, 3]
+
+    assert await make_worker(purge_batch_size=10).purge_once() == 23
+    assert [session.commits for session in repository.sessions] == [1, 1, 1]
+
+
+async def test_purge_runs_once_per_interval(repository):
+    repository.purge_results = [0]
+    worker = make_worker(purge_interval_seconds=3600)
+
+    await worker._purge_if_due()
+    await worker._purge_if_due()
+
+    assert len(repository.sessions) == 1
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+def compiled_params(statement) -> dict:
+    return statement.compile(dialect=postgresql.dialect()).params
+
+
+async def test_mark_sent_clears_payload():
+    session = CapturingSession()
+    await EmailOutboxRepository(session).mark_sent(uuid.uuid4())
+
+    params = compiled_params(session.statements[0])
+    assert params["status"] == EmailStatus.SENT
+    assert "payload" in params and params["payload"] is None
+
+
+async def test_mark_failed_keeps_payload_until_attempts_exhausted():
+    session = CapturingSession()
+    repo = EmailOutboxRepository(session)
+    retry_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+    await repo.mark_failed(uuid.uuid4(), "error", retry_at)
+    await repo.mark_failed(uuid.uuid4(), "error", None)
+
+    retried, failed = map(compiled_params, session.statements)
+    assert "payload" not in retried
+    assert failed["status"] == EmailStatus.FAILED
+    assert "payload" in failed and failed["payload"] is None
@@ -0,0 +1,165 @@
+import hashlib
+import hmac
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+from core.exceptions import ExternalServiceError
+from core.http_client import HTTPClientRegistry
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jwt.utils import base64url_encode
+from services.auth.google import GoogleOAuthClient, JWKSCache
+
+pytestmark = pytest.mark.anyio
+
+CLIENT_ID = "client-id.apps.googleusercontent.com"
+JWKS_URL = "https://google.test/certs"
+TOKEN_URL = "https://google.test/token"
+
+RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+EC_KEY = ec.generate_private_key(ec.SECP256R1())
+
+
+def public_jwk(private_key, kid: str, alg: str | None) -> dict:
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    else:
+        jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk["kid"] = kid
+    if alg is not None:
+        jwk["alg"] = alg
+    return jwk
+
+
+JWKS = {
+    "keys": [
+        public_jwk(RSA_KEY, "rsa", "RS256"),
+        public_jwk(RSA_KEY, "rsa-512", "RS512"),
+        public_jwk(EC_KEY, "ec", None),
+    ]
+}
+
+
+def make_claims(**overrides) -> dict:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "1234567890",
+        "email": "user@example.com",
+        "email_verified": True,
+        "iat": now,
+        "exp": now + 300,
+    }
+    claims.update(overrides)
+    return claims
+
+
+def sign(claims: dict, kid: str = "rsa", algorithm: str = "RS256", key=RSA_KEY) -> str:
+    return jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid})
+
+
+def sign_hs256_with_public_key(claims: dict) -> str:
+    """Подделка с подписью HMAC на публичном ключе RSA (algorithm confusion)"""
+    public_pem = RSA_KEY.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    header = {"alg": "HS256", "kid": "rsa", "typ": "JWT"}
+    signing_input = b".".join(
+        base64url_encode(json.dumps(part).encode()) for part in (header, claims)
+    )
+    signature = hmac.new(public_pem, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + base64url_encode(signature)).decode()
+
+
+class DirectDependency:
+    async def call(self, func, *args, retry: bool = True):
+        return await func(*args)
+
+
+@pytest.fixture
+async def google():
+    state = {"id_token": None}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == JWKS_URL:
+            return httpx.Response(
+                200, json=JWKS, headers={"cache-control": "public, max-age=3600"}
+            )
+        if request.url == TOKEN_URL:
+            return httpx.Response(200, json={"id_token": state["id_token"]})
+        return httpx.Response(404)
+
+    registry = HTTPClientRegistry(
+        timeout=httpx.Timeout(5), limits=httpx.Limits(), http2=False
+    )
+    registry.get("google", transport=httpx.MockTransport(handler))
+    dependency = DirectDependency()
+    client = GoogleOAuthClient(
+        http_clients=registry,
+        dependency=dependency,
+        jwks=JWKSCache(http_clients=registry, dependency=dependency, jwks_url=JWKS_URL),
+        client_id=CLIENT_ID,
+        client_secret="secret",
+        redirect_uri="https://app.test/callback",
+        token_url=TOKEN_URL,
+    )
+    client.state = state
+    yield client
+    await registry.aclose()
+
+
+async def test_authenticate_accepts_valid_id_token(google):
+    google.state["id_token"] = sign(make_claims())
+
+    claims = await google.authenticate("code")
+
+    assert claims["email"] == "user@example.com"
+    assert claims["aud"] == CLIENT_ID
+
+
+@pytest.mark.parametrize(
+    ("token", "error"),
+    [
+        (sign(make_claims(iss="https://evil.test")), jwt.InvalidIssuerError),
+        (sign(make_claims(aud="other-client")), jwt.InvalidAudienceError),
+        (
+            sign(make_claims(exp=int(time.time()) - 3600)),
+            jwt.ExpiredSignatureError,
+        ),
+        (
+            sign({k: v for k, v in make_claims().items() if k != "exp"}),
+            jwt.MissingRequiredClaimError,
+        ),
+        (sign_hs256_with_public_key(make_claims()), jwt.InvalidAlgorithmError),
+        (sign(make_claims(), algorithm="none", key=None), jwt.InvalidAlgorithmError),
+        (
+            sign(make_claims(), kid="ec", algorithm="ES256", key=EC_KEY),
+            jwt.InvalidAlgorithmError,
+        ),
+        # Ключи JWKS с другим kty или alg не используются для RS256
+        (sign(make_claims(), kid="ec"), jwt.InvalidKeyError),
+        (sign(make_claims(), kid="rsa-512"), jwt.InvalidKeyError),
+        (sign(make_claims(), kid="unknown"), jwt.InvalidTokenError),
+    ],
+    ids=[
+        "issuer",
+        "audience",
+        "expired",
+        "missing-exp",
+        "hs256-confusion",
+        "alg-none",
+        "es256",
+        "ec-key",
+        "rs512-key",
+        "unknown-kid",
+    ],
+)
+async def test_verify_id_token_rejects(google, token, error):
+    with pytest.raises(ExternalServiceError) as exc_info:
+        await google.verify_id_token(token)
+
+    assert isinstance(exc_info.value.__cause__, error)
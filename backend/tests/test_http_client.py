@@ -0,0 +1,43 @@
+import httpx
+import pytest
+from core.http_client import HTTPClientRegistry
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def registry():
+    # http2=True по умолчанию в настройках: клиент создается с пакетом h2
+    registry = HTTPClientRegistry(
+        timeout=httpx.Timeout(5), limits=httpx.Limits(max_connections=5)
+    )
+    yield registry
+    await registry.aclose()
+
+
+async def test_one_client_per_name(registry):
+    google = registry.get("google")
+
+    assert registry.get("google") is google
+    assert registry.get("other") is not google
+    assert google.timeout == httpx.Timeout(5)
+
+
+async def test_closed_client_is_recreated(registry):
+    google = registry.get("google")
+    await google.aclose()
+
+    recreated = registry.get("google")
+
+    assert recreated is not google
+    assert not recreated.is_closed
+
+
+async def test_aclose_closes_all_clients(registry):
+    clients = [registry.get("google"), registry.get("other")]
+
+    await registry.aclose()
+
+    assert all(client.is_closed for client in clients)
+    # После закрытия реестр создает клиенты заново
+    assert not registry.get("google").is_closed
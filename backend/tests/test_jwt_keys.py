@@ -0,0 +1,149 @@
+import time
+
+import httpx
+import jwt
+import pytest
+from api.v1 import auth as auth_api
+from core.config import settings
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI
+from services.auth.keys import JWTKeyRing, create_jwt_key_ring, serialize_jwks
+
+RETIRED_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+ACTIVE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+UNKNOWN_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def make_claims() -> dict:
+    return {"sub": "user@example.com", "exp": int(time.time()) + 60}
+
+
+@pytest.fixture
+def key_ring() -> JWTKeyRing:
+    # Выведенный ключ опубликован только публичной частью
+    key_ring = JWTKeyRing("RS256")
+    key_ring.add_key("2026-01", verifying_key=RETIRED_KEY.public_key())
+    key_ring.add_key("2026-07", signing_key=ACTIVE_KEY, active=True)
+    return key_ring
+
+
+def test_signs_with_active_kid(key_ring):
+    token = key_ring.encode(make_claims())
+
+    assert jwt.get_unverified_header(token)["kid"] == "2026-07"
+    assert key_ring.decode(token)["sub"] == "user@example.com"
+    # Подпись проверяется публичным ключом из JWKS
+    jwk = next(k for k in key_ring.jwks()["keys"] if k["kid"] == "2026-07")
+    public_key = jwt.PyJWK(jwk).key
+    assert jwt.decode(token, public_key, algorithms=["RS256"])["sub"]
+
+
+def test_verifies_token_of_retired_published_key(key_ring):
+    token = jwt.encode(
+        make_claims(), RETIRED_KEY, algorithm="RS256", headers={"kid": "2026-01"}
+    )
+
+    assert key_ring.decode(token)["sub"] == "user@example.com"
+    assert [key["kid"] for key in key_ring.jwks()["keys"]] == ["2026-01", "2026-07"]
+
+
+@pytest.mark.parametrize(
+    ("key", "kid", "error"),
+    [
+        (UNKNOWN_KEY, "2025-01", jwt.InvalidTokenError),
+        # Известный kid, но подпись чужим ключом
+        (UNKNOWN_KEY, "2026-07", jwt.InvalidSignatureError),
+        # Без kid токен проверяется активным ключом
+        (RETIRED_KEY, None, jwt.InvalidSignatureError),
+    ],
+    ids=["unknown-kid", "foreign-key", "no-kid"],
+)
+def test_rejects_token(key_ring, key, kid, error):
+    headers = {"kid": kid} if kid else None
+    token = jwt.encode(make_claims(), key, algorithm="RS256", headers=headers)
+
+    with pytest.raises(error):
+        key_ring.decode(token)
+
+
+def test_active_key_requires_private_part():
+    key_ring = JWTKeyRing("RS256")
+
+    with pytest.raises(ValueError):
+        key_ring.add_key("2026-07", verifying_key=ACTIVE_KEY.public_key(), active=True)
+
+
+def test_symmetric_secret_is_not_published():
+    key_ring = JWTKeyRing("HS256")
+    key_ring.add_key(None, signing_key="x" * 32, active=True)
+
+    token = key_ring.encode(make_claims())
+
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert key_ring.decode(token)["sub"] == "user@example.com"
+    assert key_ring.jwks() == {"keys": []}
+
+
+def test_key_ring_from_keys_dir(monkeypatch, tmp_path):
+    (tmp_path / "2026-01.pem").write_bytes(
+        RETIRED_KEY.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    (tmp_path / "2026-07.pem").write_bytes(
+        ACTIVE_KEY.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "2026-07")
+
+    key_ring = create_jwt_key_ring()
+
+    assert key_ring.active_kid == "2026-07"
+    assert len(key_ring.jwks()["keys"]) == 2
+
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "2026-01")
+    with pytest.raises(ValueError):
+        create_jwt_key_ring()
+
+
+@pytest.fixture
+async def client(monkeypatch, key_ring):
+    body, etag = serialize_jwks(key_ring)
+    monkeypatch.setattr(auth_api, "JWKS_BODY", body)
+    monkeypatch.setattr(auth_api, "JWKS_ETAG", etag)
+    app = FastAPI()
+    app.include_router(auth_api.auth_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_jwks_endpoint_etag_and_cache_control(client):
+    response = await client.get("/auth/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert [key["kid"] for key in response.json()["keys"]] == ["2026-01", "2026-07"]
+    cache_control = f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"
+    assert response.headers["cache-control"] == cache_control
+    etag = response.headers["etag"]
+
+    cached = await client.get(
+        "/auth/.well-known/jwks.json", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert cached.headers["cache-control"] == cache_control
+
+    stale = await client.get(
+        "/auth/.well-known/jwks.json", headers={"If-None-Match": '"outdated"'}
+    )
+    assert stale.status_code == 200
@@ -0,0 +1,106 @@
+"""
+LazyAsyncSession.release отпускает соединение только после чтения:
+транзакцию с записью (flush или UPDATE через execute) release не фиксирует.
+Сессия работает поверх синхронного sqlite: его драйвер не переключает
+greenlet, поэтому ORM запросы AsyncSession выполняются без async драйвера.
+"""
+
+import pytest
+from core.database import LazyAsyncSession
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+pytestmark = pytest.mark.anyio
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+@pytest.fixture
+async def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Item.__table__.insert(), [{"id": 1, "name": "first"}])
+
+    session = LazyAsyncSession(expire_on_commit=False, autoflush=False)
+    session.sync_session.bind = engine
+    yield session
+    await session.close()
+    engine.dispose()
+
+
+async def count_items(session: LazyAsyncSession) -> int:
+    return len((await session.execute(select(Item))).all())
+
+
+async def test_release_after_read_returns_connection(session):
+    item = await session.get(Item, 1)
+
+    await session.release()
+
+    assert not session.in_transaction()
+    # Загруженный объект доступен и после возврата соединения
+    assert item.name == "first"
+
+
+async def test_release_keeps_flushed_insert(session):
+    session.add(Item(id=2, name="second"))
+    await session.flush()
+    assert not session.new
+
+    await session.release()
+
+    assert session.in_transaction()
+    await session.rollback()
+    assert await count_items(session) == 1
+
+
+async def test_release_keeps_update_executed_directly(session):
+    await session.execute(update(Item).where(Item.id == 1).values(name="renamed"))
+
+    await session.release()
+
+    assert session.in_transaction()
+    await session.rollback()
+    assert (await session.get(Item, 1)).name == "first"
+
+
+async def test_release_keeps_pending_changes(session):
+    item = await session.get(Item, 1)
+    item.name = "renamed"
+
+    await session.release()
+
+    assert session.in_transaction()
+
+
+async def test_writes_flag_resets_after_commit(session):
+    session.add(Item(id=2, name="second"))
+    await session.commit()
+    assert not session.has_writes
+
+    await count_items(session)
+    await session.release()
+
+    assert not session.in_transaction()
+
+
+async def test_savepoint_flush_is_tracked_by_outer_transaction(session):
+    await session.get(Item, 1)
+    async with session.begin_nested():
+        session.add(Item(id=2, name="second"))
+
+    # Savepoint освобожден, но запись принадлежит внешней транзакции
+    await session.release()
+
+    assert session.in_transaction()
+    assert session.has_writes
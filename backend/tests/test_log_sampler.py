@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+from core import logging_middleware
+from core.logging_middleware import RequestContextMiddleware
+from fastapi import FastAPI, HTTPException
+from utils import log_helper
+from utils.log_helper import UNMATCHED_ROUTE, LogSampler
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.warnings: list[tuple[str, dict]] = []
+
+    def warning(self, message: str, **context):
+        self.warnings.append((message, context))
+
+    def info(self, message: str, **context):
+        pass
+
+    def error(self, message: str, **context):
+        pass
+
+
+@pytest.fixture
+def sampler(monkeypatch) -> LogSampler:
+    sampler = LogSampler(failure_burst=1, summary_interval_seconds=60)
+    monkeypatch.setattr(log_helper, "log_sampler", sampler)
+    return sampler
+
+
+@pytest.fixture
+def logger(monkeypatch) -> RecordingLogger:
+    logger = RecordingLogger()
+    monkeypatch.setattr(logging_middleware, "get_logger", lambda name: logger)
+    return logger
+
+
+@pytest.fixture
+async def client(logger):
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/users/{user_id}")
+    async def get_user(user_id: int):
+        raise HTTPException(status_code=404)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_failures_aggregated_by_route_template(client, sampler, logger):
+    for user_id in range(1, 6):
+        await client.get(f"/users/{user_id}")
+
+    # Первый отказ пишется, остальные учтены в окне шаблона маршрута
+    assert len(logger.warnings) == 1
+    assert list(sampler._windows) == [
+        ("127.0.0.1", "api_request", "GET /users/{user_id} 404")
+    ]
+
+    sampler.flush()
+    message, summary = logger.warnings[-1]
+    assert summary["reason"] == "GET /users/{user_id} 404"
+    assert summary["suppressed"] == 4
+
+
+async def test_unmatched_paths_share_one_window(client, sampler, logger):
+    for number in range(3):
+        await client.get(f"/scan/{number}.php")
+
+    assert len(logger.warnings) == 1
+    assert list(sampler._windows) == [
+        ("127.0.0.1", "api_request", f"GET {UNMATCHED_ROUTE} 404")
+    ]
+
+
+async def test_background_task_writes_summary_when_window_ends():
+    logger = RecordingLogger()
+    sampler = LogSampler(failure_burst=1, summary_interval_seconds=0.2)
+    sampler.start()
+    try:
+        for _ in range(3):
+            sampler.allow_failure(logger, "10.0.0.1", "login", "bad password")
+        await asyncio.sleep(0.4)
+    finally:
+        await sampler.stop()
+
+    # Сводка пришла без новых отказов и запросов
+    assert len(logger.warnings) == 1
+    message, summary = logger.warnings[0]
+    assert summary["suppressed"] == 2
+    assert sampler.get_metrics()["tracked_failure_keys"] == 0
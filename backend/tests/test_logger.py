@@ -0,0 +1,159 @@
+import io
+import json
+import logging
+import queue
+
+from core import logger as logger_module
+from core.logger import (
+    DroppingQueueHandler,
+    LogFormat,
+    LogLevel,
+    LogPipeline,
+    StructuredFormatter,
+    VectorAILogger,
+)
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def make_pipeline() -> tuple[LogPipeline, io.StringIO]:
+    pipeline = LogPipeline(LogFormat.JSON, None, max_queue_size=100)
+    stream = io.StringIO()
+    pipeline.handlers[0].setStream(stream)
+    return pipeline, stream
+
+
+def test_prepare_snapshots_extra_and_exception():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=10))
+    logger = make_logger("tests.logger.prepare", handler)
+    extra = {"attempt": 1}
+
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.error("failed %s", "once", extra={"extra": extra}, exc_info=True)
+    extra["attempt"] = 2
+
+    record = handler.queue.get_nowait()
+    assert record.extra == {"attempt": 1}
+    assert record.exc_info is None
+    assert "RuntimeError: boom" in record.exc_text
+
+    data = json.loads(StructuredFormatter().format(record))
+    assert data["message"] == "failed once"
+    assert data["attempt"] == 1
+    assert "RuntimeError: boom" in data["exception"]
+
+
+def test_stop_is_idempotent_and_falls_back_to_sync_writes():
+    pipeline, stream = make_pipeline()
+    logger = make_logger("tests.logger.pipeline", pipeline.handler)
+
+    logger.info("queued")
+    pipeline.stop()
+    pipeline.stop()
+    assert not pipeline.running
+    assert "queued" in stream.getvalue()
+
+    # После остановки запись не теряется, а пишется сразу
+    logger.info("after stop")
+    assert "after stop" in stream.getvalue()
+    assert pipeline.queue.qsize() == 0
+
+
+def test_restart_resumes_background_writes():
+    pipeline, stream = make_pipeline()
+    logger = make_logger("tests.logger.restart", pipeline.handler)
+    pipeline.stop()
+
+    pipeline.start()
+    pipeline.start()
+    assert pipeline.running
+    logger.info("after restart")
+    pipeline.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == ["after restart"]
+
+
+def make_record(created: float) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "api.requests", logging.INFO, __file__, 42, "user %s", ("ok",), None
+    )
+    record.created = created
+    record.funcName = "handler"
+    record.extra = {"status_code": 200, "path": "/api/v1/auth/login"}
+    record.request_id = "request-1"
+    return record
+
+
+def test_structured_formatter_fields(monkeypatch):
+    monkeypatch.setattr(logger_module, "orjson", None)
+    formatter = StructuredFormatter()
+    created = 1_760_000_000.123456
+
+    data = json.loads(formatter.format(make_record(created)))
+    assert data == {
+        "timestamp": "2025-10-09T08:53:20.123456Z",
+        "level": "INFO",
+        "module": "api.requests",
+        "message": "user ok",
+        "function": "handler",
+        "line": 42,
+        "request_id": "request-1",
+        "status_code": 200,
+        "path": "/api/v1/auth/login",
+    }
+
+    # Кеш секунды обновляется при смене секунды
+    later = json.loads(formatter.format(make_record(created + 1)))
+    assert later["timestamp"] == "2025-10-09T08:53:21.123456Z"
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_vector_logger(name: str, level: LogLevel) -> tuple[VectorAILogger, list]:
+    vector_logger = VectorAILogger(name, level=level)
+    handler = RecordingHandler()
+    vector_logger.logger.handlers = [handler]
+    return vector_logger, handler.records
+
+
+def test_error_with_exception_skips_stack_capture():
+    vector_logger, records = make_vector_logger("tests.logger.stack", LogLevel.DEBUG)
+
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        vector_logger.error("with exception")
+    vector_logger.error("without exception")
+
+    with_exception, without_exception = records
+    assert with_exception.exc_info[0] is RuntimeError
+    assert with_exception.stack_info is None
+    assert without_exception.exc_info is None
+    assert without_exception.stack_info
+
+
+def test_disabled_level_is_skipped(monkeypatch):
+    vector_logger, records = make_vector_logger("tests.logger.level", LogLevel.INFO)
+    calls = []
+    monkeypatch.setattr(vector_logger.logger, "log", lambda *a, **k: calls.append(a))
+
+    vector_logger.debug("hidden", payload={"large": "context"})
+    vector_logger.info("visible")
+
+    assert len(calls) == 1
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pytest
+from core.exceptions import ServiceUnavailableError
+from core.password_executor import PasswordHashingExecutor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cancelled_caller_keeps_slot_until_worker_finishes():
+    executor = PasswordHashingExecutor(max_workers=1, max_queue_size=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_hash() -> str:
+        started.set()
+        release.wait(5)
+        return "hash"
+
+    task = asyncio.create_task(executor.run(slow_hash))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # Поток все еще хеширует: место не освобождено, новая задача отклоняется
+    assert executor.get_metrics()["in_flight"] == 1
+    with pytest.raises(ServiceUnavailableError):
+        await executor.run(lambda: "hash")
+
+    release.set()
+    executor.shutdown()
+    assert executor.get_metrics()["in_flight"] == 0
+    assert executor.get_metrics()["completed"] == 1
+
+
+async def test_cancelled_queued_job_releases_slot():
+    executor = PasswordHashingExecutor(max_workers=1, max_queue_size=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait, 5))
+    queued = asyncio.create_task(executor.run(lambda: "hash"))
+    await asyncio.sleep(0.05)
+    assert executor.get_metrics()["in_flight"] == 2
+
+    # Задача из очереди еще не начата и отменяется вместе с корутиной
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert executor.get_metrics()["in_flight"] == 1
+
+    release.set()
+    assert await running is True
+    executor.shutdown()
+    assert executor.get_metrics()["in_flight"] == 0
@@ -0,0 +1,198 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import bcrypt
+import pytest
+from models import UserModel
+from services.auth import hashers
+from services.auth import service as service_module
+from services.auth.hashers import Argon2Hasher, BcryptHasher, PasswordHasherRegistry
+from services.auth.service import AuthService
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "correct-password"
+
+
+def make_registry(default_scheme: str = "bcrypt") -> PasswordHasherRegistry:
+    # Минимальная стоимость, чтобы тесты не тратили время на хеширование
+    registry = PasswordHasherRegistry(default_scheme=default_scheme)
+    registry.register(BcryptHasher(rounds=5, min_rounds=4))
+    registry.register(Argon2Hasher(time_cost=2, memory_cost=1024, parallelism=1))
+    return registry
+
+
+def bcrypt_hash(rounds: int) -> str:
+    return bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+@pytest.mark.parametrize("scheme", ["bcrypt", "argon2"])
+def test_registry_verifies_hashes_of_every_scheme(scheme):
+    registry = make_registry(default_scheme=scheme)
+    hashed = registry.hash(PASSWORD)
+
+    assert registry.identify(hashed).scheme == scheme
+    assert registry.verify(PASSWORD, hashed)
+    assert not registry.verify("wrong-password", hashed)
+    # Хеш другой схемы по-прежнему проверяется своим алгоритмом
+    other = make_registry("argon2" if scheme == "bcrypt" else "bcrypt")
+    assert other.verify(PASSWORD, hashed)
+
+
+def test_unknown_hash_format_is_rejected():
+    registry = make_registry()
+
+    assert registry.identify("plain-text") is None
+    assert not registry.verify(PASSWORD, "plain-text")
+    assert registry.needs_rehash("plain-text")
+
+
+def test_unregistered_default_scheme():
+    registry = PasswordHasherRegistry(default_scheme="scrypt")
+
+    with pytest.raises(ValueError, match="scrypt"):
+        registry.hash(PASSWORD)
+
+
+def test_needs_rehash():
+    registry = make_registry()
+    argon2_hash = Argon2Hasher(time_cost=1, memory_cost=1024, parallelism=1).hash(
+        PASSWORD
+    )
+
+    assert not registry.needs_rehash(bcrypt_hash(rounds=5))
+    # Меньше раундов, чем в настройках, или другая схема - перехешировать
+    assert registry.needs_rehash(bcrypt_hash(rounds=4))
+    assert registry.needs_rehash(argon2_hash)
+
+    argon2_registry = make_registry("argon2")
+    assert argon2_registry.needs_rehash(argon2_hash)
+    assert not argon2_registry.needs_rehash(argon2_registry.hash(PASSWORD))
+    assert argon2_registry.needs_rehash(bcrypt_hash(rounds=5))
+
+
+@pytest.mark.parametrize(
+    ("scheme", "base_ms", "target_ms", "expected"),
+    [
+        # bcrypt: каждый раунд удваивает время от min_rounds
+        ("bcrypt", 10, 80, {"rounds": 7}),
+        ("bcrypt", 10, 5, {"rounds": 4}),
+        ("bcrypt", 0.001, 10**9, {"rounds": 31}),
+        # argon2: время линейно по time_cost
+        ("argon2", 10, 50, {"time_cost": 5}),
+        ("argon2", 10, 5, {"time_cost": 1}),
+        ("argon2", 0.001, 10**9, {"time_cost": 32}),
+    ],
+    ids=[
+        "bcrypt",
+        "bcrypt-min",
+        "bcrypt-max",
+        "argon2",
+        "argon2-min",
+        "argon2-max",
+    ],
+)
+def test_calibrate(monkeypatch, scheme, base_ms, target_ms, expected):
+    monkeypatch.setattr(
+        hashers.PasswordHasher, "_measure_ms", staticmethod(lambda *args: base_ms)
+    )
+    registry = make_registry(scheme)
+
+    assert registry.calibrate(target_ms) == expected
+
+
+class CompareAndSetUsers:
+    """Таблица users с условием UPDATE ... WHERE password = old_hash"""
+
+    def __init__(self, user: UserModel):
+        self.passwords = {user.id: user.password}
+
+    def repository(self, session):
+        return self
+
+    async def update_password_hash(self, user_id, old_hash, new_hash):
+        if self.passwords.get(user_id) != old_hash:
+            return False
+        self.passwords[user_id] = new_hash
+        return True
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+    async def release(self):
+        pass
+
+
+class FakeAuthRepository:
+    def __init__(self, user: UserModel):
+        self.user = user
+
+    async def get_by_email(self, email):
+        return self.user
+
+
+@pytest.fixture
+def user() -> UserModel:
+    return UserModel(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        username="user",
+        password=bcrypt_hash(rounds=4),
+        role="user",
+        is_verified=True,
+        token_version=0,
+    )
+
+
+@pytest.fixture
+def users(monkeypatch, user) -> CompareAndSetUsers:
+    async def run(func, *args):
+        return func(*args)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield FakeSession()
+
+    users = CompareAndSetUsers(user)
+    monkeypatch.setattr(service_module, "password_hashers", make_registry())
+    monkeypatch.setattr(service_module.password_executor, "run", run)
+    monkeypatch.setattr(service_module.db_helper, "session_factory", session_factory)
+    monkeypatch.setattr(service_module, "AuthRepository", users.repository)
+    return users
+
+
+def make_service(user: UserModel) -> AuthService:
+    return AuthService(
+        session=FakeSession(),
+        auth_repo=FakeAuthRepository(user),
+        refresh_token_repo=None,
+        email_outbox_repo=None,
+        google_oauth=None,
+    )
+
+
+async def drain_background_tasks() -> None:
+    await asyncio.gather(*AuthService._background_tasks)
+
+
+async def test_login_rehashes_outdated_hash(users, user):
+    await make_service(user).authenticate_user(user.email, PASSWORD)
+    await drain_background_tasks()
+
+    new_hash = users.passwords[user.id]
+    assert new_hash != user.password
+    assert new_hash.split("$")[2] == "05"
+    assert service_module.password_hashers.verify(PASSWORD, new_hash)
+
+
+async def test_rehash_does_not_overwrite_changed_password(users, user):
+    # Пароль сменили между чтением пользователя и фоновым перехешированием
+    users.passwords[user.id] = "changed-hash"
+
+    await make_service(user).authenticate_user(user.email, PASSWORD)
+    await drain_background_tasks()
+
+    assert users.passwords[user.id] == "changed-hash"
@@ -0,0 +1,155 @@
+"""
+Кеш пользователей get_current_user (principal cache): пользователь читается
+из БД один раз и сбрасывается при подтверждении почты и смене пароля.
+"""
+
+import time
+import uuid
+
+import pytest
+from core.config import settings
+from models import UserModel, UserRole
+from services.auth import service as service_module
+from services.auth.cache import (
+    access_token_cache,
+    principal_cache,
+    token_version_cache,
+)
+from services.auth.service import AuthService
+from utils.auth_utils import get_current_user
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    def add(self, instance):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def release(self):
+        pass
+
+
+class FakeAuthRepository:
+    """Таблица users из одного пользователя со счетчиком запросов"""
+
+    def __init__(self, user: UserModel):
+        self.user = user
+        self.queries = 0
+
+    async def get_by_email(self, email):
+        self.queries += 1
+        return self.user if self.user.email == email else None
+
+    async def increment_token_version(self, user_id, **values):
+        self.user.token_version += 1
+        for name, value in values.items():
+            setattr(self.user, name, value)
+        return self.user.token_version
+
+
+class FakeRefreshTokenRepository:
+    async def revoke_all_for_user(self, user_id):
+        return 0
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    # Пользователь читается из БД, а не собирается из claims токена
+    monkeypatch.setattr(settings, "JWT_STATELESS_CLAIMS", False)
+    for cache in (access_token_cache, principal_cache, token_version_cache):
+        cache.clear()
+    yield
+    for cache in (access_token_cache, principal_cache, token_version_cache):
+        cache.clear()
+
+
+@pytest.fixture
+def user() -> UserModel:
+    return UserModel(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        username="user",
+        password="hash",
+        role=UserRole.USER,
+        is_verified=False,
+        token_version=0,
+    )
+
+
+@pytest.fixture
+def service(monkeypatch, user) -> AuthService:
+    async def run(func, *args):
+        return func(*args)
+
+    monkeypatch.setattr(service_module.password_executor, "run", run)
+    monkeypatch.setattr(
+        AuthService, "get_password_hash", staticmethod(lambda p: "new-hash")
+    )
+    return AuthService(
+        session=FakeSession(),
+        auth_repo=FakeAuthRepository(user),
+        refresh_token_repo=FakeRefreshTokenRepository(),
+        email_outbox_repo=None,
+        google_oauth=None,
+    )
+
+
+def issue_access_token(user: UserModel) -> str:
+    return AuthService.create_access_token({"sub": user.email})
+
+
+async def test_principal_is_read_from_database_once(service, user):
+    token = issue_access_token(user)
+
+    for _ in range(3):
+        principal = await get_current_user(token, service)
+
+    assert principal.id == user.id
+    assert principal.email == user.email
+    assert service.auth_repo.queries == 1
+    assert principal_cache.get(user.email) == principal
+
+
+async def test_verify_user_email_invalidates_principal(service, user):
+    await get_current_user(issue_access_token(user), service)
+
+    verification_token = AuthService.create_email_verification_token(user.email)
+    assert await service.verify_user_email(verification_token)
+
+    assert principal_cache.get(user.email) is None
+
+
+async def test_reset_password_invalidates_principal(service, user):
+    token = issue_access_token(user)
+    await get_current_user(token, service)
+
+    reset_token = AuthService.create_password_reset_token(user.email)
+    await service.reset_password(reset_token, "new-password")
+
+    assert principal_cache.get(user.email) is None
+    # Следующий запрос снова читает пользователя из БД
+    queries = service.auth_repo.queries
+    await get_current_user(token, service)
+    assert service.auth_repo.queries == queries + 1
+
+
+async def test_principal_entry_expires(monkeypatch, service, user):
+    token = issue_access_token(user)
+    await get_current_user(token, service)
+    # Изменение пользователя в обход сервиса видно не позже TTL кеша
+    user.username = "renamed"
+    now = time.monotonic()
+    monkeypatch.setattr(
+        time, "monotonic", lambda: now + settings.PRINCIPAL_CACHE_TTL_SECONDS
+    )
+
+    principal = await get_current_user(token, service)
+
+    assert principal.username == "renamed"
+    assert service.auth_repo.queries == 2
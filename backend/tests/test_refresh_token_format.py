@@ -0,0 +1,153 @@
+"""
+Разбор refresh токена selector.verifier и проверка verifier в репозитории:
+некорректные токены отклоняются без запроса к БД, verifier сверяется
+по хешу за постоянное время.
+"""
+
+import hmac
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from models import RefreshTokenModel
+from services.auth.repositories.token_refresh import (
+    LEGACY_SELECTOR_LENGTH,
+    RefreshTokenRepository,
+    generate_refresh_token,
+    hash_refresh_verifier,
+    split_refresh_token,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class CapturingSession:
+    """Сессия, возвращающая заданную строку на любой SELECT"""
+
+    def __init__(self, row: RefreshTokenModel | None = None):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar_one_or_none(self):
+        return self.row
+
+
+def make_stored_token(selector: str, verifier_hash: bytes) -> RefreshTokenModel:
+    return RefreshTokenModel(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        selector=selector,
+        verifier_hash=verifier_hash,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+        revoked=False,
+    )
+
+
+@pytest.mark.parametrize(
+    ("token", "expected"),
+    [
+        ("selector.verifier", ("selector", "verifier")),
+        # Делится по первой точке, остаток целиком - verifier
+        ("selector.veri.fier", ("selector", "veri.fier")),
+        (".verifier", ("", "verifier")),
+        ("selector.", ("selector", "")),
+        ("", ("", "")),
+        # Токены старого формата без точки
+        ("a" * LEGACY_SELECTOR_LENGTH + "b" * 48, ("a" * 16, "b" * 48)),
+        ("a" * LEGACY_SELECTOR_LENGTH, ("a" * 16, "")),
+        ("short", ("short", "")),
+    ],
+    ids=[
+        "selector-verifier",
+        "extra-dot",
+        "no-selector",
+        "no-verifier",
+        "empty",
+        "legacy",
+        "legacy-selector-only",
+        "legacy-too-short",
+    ],
+)
+def test_split_refresh_token(token, expected):
+    assert split_refresh_token(token) == expected
+
+
+def test_generated_token_round_trips():
+    token, selector, verifier_hash = generate_refresh_token()
+
+    parsed_selector, verifier = split_refresh_token(token)
+
+    assert parsed_selector == selector
+    assert hash_refresh_verifier(verifier) == verifier_hash
+
+
+@pytest.mark.parametrize(
+    "token",
+    [".verifier", "selector.", "", "a" * LEGACY_SELECTOR_LENGTH, "short"],
+    ids=["no-selector", "no-verifier", "empty", "legacy-selector-only", "short"],
+)
+async def test_malformed_token_skips_database(token):
+    session = CapturingSession()
+    repository = RefreshTokenRepository(session)
+
+    assert await repository.get_by_token(token) is None
+    assert (
+        await repository.rotate(token, "new", b"hash", datetime.now(timezone.utc))
+        is None
+    )
+    assert await repository.revoke_by_token(token) is False
+    assert session.statements == []
+
+
+@pytest.fixture
+def compare_calls(monkeypatch) -> list:
+    calls = []
+    original = hmac.compare_digest
+
+    def counting_compare_digest(a, b):
+        calls.append((a, b))
+        return original(a, b)
+
+    monkeypatch.setattr(hmac, "compare_digest", counting_compare_digest)
+    return calls
+
+
+async def test_matching_verifier_is_accepted(compare_calls):
+    token, selector, verifier_hash = generate_refresh_token()
+    stored = make_stored_token(selector, verifier_hash)
+
+    found = await RefreshTokenRepository(CapturingSession(stored)).get_by_token(token)
+
+    assert found is stored
+    assert compare_calls == [(verifier_hash, verifier_hash)]
+
+
+@pytest.mark.parametrize(
+    "forge",
+    [
+        lambda verifier: verifier[:-1] + ("A" if verifier[-1] != "A" else "B"),
+        lambda verifier: verifier[:-4],
+        lambda verifier: verifier + "A",
+    ],
+    ids=["changed", "truncated", "extended"],
+)
+async def test_verifier_mismatch_is_rejected(compare_calls, forge):
+    token, selector, verifier_hash = generate_refresh_token()
+    _, verifier = split_refresh_token(token)
+    stored = make_stored_token(selector, verifier_hash)
+    session = CapturingSession(stored)
+
+    found = await RefreshTokenRepository(session).get_by_token(
+        f"{selector}.{forge(verifier)}"
+    )
+
+    # Строка найдена по selector, но verifier не совпал по хешу
+    assert found is None
+    assert len(session.statements) == 1
+    ((stored_hash, presented_hash),) = compare_calls
+    assert stored_hash == verifier_hash
+    assert presented_hash != verifier_hash
@@ -0,0 +1,122 @@
+import uuid
+
+import httpx
+import pytest
+from core import logging_middleware
+from core.constants import RequestTracing
+from core.logger import get_request_id
+from core.logging_middleware import RequestContextMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+pytestmark = pytest.mark.anyio
+
+
+async def created(request: Request) -> JSONResponse:
+    return JSONResponse(
+        {"state": request.state.request_id, "context": get_request_id()},
+        status_code=201,
+    )
+
+
+async def stream(request: Request) -> StreamingResponse:
+    async def chunks():
+        for chunk in (b"first,", b"second"):
+            yield chunk
+
+    return StreamingResponse(chunks(), status_code=202)
+
+
+async def failing(request: Request) -> JSONResponse:
+    raise RuntimeError("boom")
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.errors: list[dict] = []
+
+    def error(self, message: str, **context):
+        self.errors.append(context)
+
+
+@pytest.fixture
+def logger(monkeypatch) -> RecordingLogger:
+    logger = RecordingLogger()
+    monkeypatch.setattr(logging_middleware, "get_logger", lambda name: logger)
+    return logger
+
+
+@pytest.fixture
+def logged(monkeypatch) -> list[dict]:
+    calls: list[dict] = []
+    monkeypatch.setattr(
+        logging_middleware,
+        "log_api_request",
+        lambda **kwargs: calls.append(kwargs),
+    )
+    return calls
+
+
+@pytest.fixture
+async def client(logger):
+    app = Starlette(
+        routes=[
+            Route("/created", created),
+            Route("/stream", stream),
+            Route("/failing", failing),
+        ],
+        middleware=[Middleware(RequestContextMiddleware)],
+    )
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_request_id_from_header(client, logged):
+    response = await client.get(
+        "/created", headers={RequestTracing.HEADER_REQUEST_ID: "request-1"}
+    )
+
+    assert response.headers[RequestTracing.HEADER_REQUEST_ID] == "request-1"
+    assert response.json() == {"state": "request-1", "context": "request-1"}
+    # Контекст логгера сбрасывается после запроса
+    assert get_request_id() is None
+
+
+async def test_request_id_generated(client, logged):
+    response = await client.get("/created")
+
+    request_id = response.headers[RequestTracing.HEADER_REQUEST_ID]
+    assert uuid.UUID(request_id)
+    assert response.json()["state"] == request_id
+
+
+async def test_single_completion_log_with_status(client, logged):
+    await client.get("/created")
+
+    assert len(logged) == 1
+    assert logged[0]["status_code"] == 201
+    assert logged[0]["method"] == "GET"
+    assert logged[0]["duration_ms"] >= 0
+
+
+async def test_streaming_response_passes_through(client, logged):
+    response = await client.get("/stream")
+
+    assert response.status_code == 202
+    assert response.content == b"first,second"
+    assert logged[0]["status_code"] == 202
+
+
+async def test_failed_request_logs_error(client, logged, logger):
+    response = await client.get("/failing")
+
+    assert response.status_code == 500
+    assert logged == []
+    assert len(logger.errors) == 1
+    assert logger.errors[0]["status_code"] == 500
+    assert logger.errors[0]["error_type"] == "RuntimeError"
+    assert get_request_id() is None
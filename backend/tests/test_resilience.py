@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+from core import resilience
+from core.exceptions import (
+    ExternalServiceError,
+    ServiceUnavailableError,
+    map_exception_to_http_status,
+)
+from core.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    ExternalDependency,
+    RetryBudget,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    """Управляемое время для circuit breaker и бюджета повторов"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FailingCall:
+    def __init__(self, error: Exception | None = None):
+        self.error = error or ConnectionError("connection reset")
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    # Подменяется только модуль time внутри resilience, event loop не затронут
+    clock = Clock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+def make_dependency(**overrides) -> ExternalDependency:
+    options = {
+        "name": "Google",
+        "timeout": 1,
+        "breaker": CircuitBreaker("Google", failure_threshold=3, recovery_timeout=30),
+        "retry_budget": RetryBudget(),
+        "max_retries": 0,
+        "backoff_base": 0.001,
+    }
+    options.update(overrides)
+    return ExternalDependency(**options)
+
+
+async def trip(dependency: ExternalDependency) -> None:
+    for _ in range(dependency.breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            await dependency.call(FailingCall())
+
+
+async def test_circuit_opens_after_threshold(clock):
+    dependency = make_dependency()
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await dependency.call(FailingCall())
+    assert dependency.breaker.state == CircuitState.CLOSED
+
+    with pytest.raises(ConnectionError):
+        await dependency.call(FailingCall())
+    assert dependency.breaker.state == CircuitState.OPEN
+
+
+async def test_open_circuit_rejects_with_retry_after(clock):
+    dependency = make_dependency()
+    await trip(dependency)
+    clock.advance(10)
+    call = FailingCall(error=None)
+
+    with pytest.raises(ServiceUnavailableError) as exc_info:
+        await dependency.call(call)
+
+    # Внешний сервис не вызывается, клиент получает 503 и время до пробы
+    assert call.calls == 0
+    assert exc_info.value.retry_after == 20
+    assert map_exception_to_http_status(exc_info.value) == 503
+    assert dependency.get_metrics()["circuit"]["rejected"] == 1
+
+
+@pytest.mark.parametrize(
+    ("probe_error", "state"),
+    [(None, CircuitState.CLOSED), (ConnectionError("down"), CircuitState.OPEN)],
+    ids=["probe-succeeds", "probe-fails"],
+)
+async def test_half_open_lets_one_probe_through(clock, probe_error, state):
+    dependency = make_dependency()
+    await trip(dependency)
+    clock.advance(30)
+    assert dependency.breaker.state == CircuitState.HALF_OPEN
+
+    started = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def probe():
+        started.set()
+        await finish.wait()
+        if probe_error is not None:
+            raise probe_error
+        return "ok"
+
+    probe_task = asyncio.create_task(dependency.call(probe))
+    await started.wait()
+    # Пока проба не завершилась, остальные вызовы отклоняются
+    with pytest.raises(ServiceUnavailableError):
+        await dependency.call(FailingCall(error=None))
+
+    finish.set()
+    if probe_error is None:
+        assert await probe_task == "ok"
+    else:
+        with pytest.raises(ConnectionError):
+            await probe_task
+    assert dependency.breaker.state == state
+
+
+async def test_non_failures_do_not_trip_circuit(clock):
+    dependency = make_dependency(
+        is_failure=lambda e: not isinstance(e, ValueError), max_retries=2
+    )
+    call = FailingCall(ValueError("invalid_grant"))
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            await dependency.call(call)
+
+    # Ошибка клиента не повторяется и не открывает цепь
+    assert call.calls == 5
+    assert dependency.breaker.state == CircuitState.CLOSED
+    assert dependency.get_metrics()["failures"] == 0
+
+
+async def test_exhausted_budget_stops_retries(clock):
+    dependency = make_dependency(
+        breaker=CircuitBreaker("Google", failure_threshold=100),
+        retry_budget=RetryBudget(ratio=0, min_per_second=0, max_balance=1),
+        max_retries=5,
+    )
+    call = FailingCall()
+
+    with pytest.raises(ConnectionError):
+        await dependency.call(call)
+
+    # Бюджета хватило на один повтор из пяти разрешенных
+    assert call.calls == 2
+    metrics = dependency.get_metrics()
+    assert metrics["retries"] == 1
+    assert metrics["retry_budget"]["exhausted"] == 1
+
+
+async def test_timeout_maps_to_external_service_error(clock):
+    dependency = make_dependency(timeout=0.01)
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    with pytest.raises(ExternalServiceError) as exc_info:
+        await dependency.call(hanging)
+
+    assert isinstance(exc_info.value.__cause__, TimeoutError)
+    assert map_exception_to_http_status(exc_info.value) == 502
+    assert dependency.get_metrics()["timeouts"] == 1
+    assert dependency.breaker.get_metrics()["consecutive_failures"] == 1
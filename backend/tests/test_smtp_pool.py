@@ -0,0 +1,154 @@
+import socket
+from email.message import EmailMessage
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+from core.smtp_pool import SMTPConnectionPool
+from utils.email_sender import is_smtp_failure
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages: list[str] = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("unknown@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode())
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SMTPServer:
+    def __init__(self):
+        self.handler = RecordingHandler()
+        self.port = free_port()
+        self.controller = self._start()
+
+    def _start(self) -> Controller:
+        controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        controller.start()
+        return controller
+
+    def restart(self):
+        """Перезапуск на том же порту обрывает открытые соединения"""
+        self.controller.stop()
+        self.controller = self._start()
+
+    def stop(self):
+        self.controller.stop()
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPServer()
+    yield server
+    server.stop()
+
+
+def make_pool(port: int) -> SMTPConnectionPool:
+    return SMTPConnectionPool(
+        hostname="127.0.0.1", port=port, start_tls=False, timeout=5
+    )
+
+
+def make_message(subject: str, recipient: str = "user@example.com") -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content("body")
+    return message
+
+
+async def test_connection_is_reused(smtp_server):
+    pool = make_pool(smtp_server.port)
+
+    for number in range(3):
+        await pool.send(make_message(f"message {number}"))
+    await pool.close()
+
+    metrics = pool.get_metrics()
+    assert len(smtp_server.handler.messages) == 3
+    assert metrics["connects"] == 1
+    assert metrics["sent"] == 3
+    assert metrics["reconnects"] == 0
+
+
+async def test_stale_connection_is_reopened(smtp_server):
+    pool = make_pool(smtp_server.port)
+    await pool.send(make_message("before restart"))
+
+    smtp_server.restart()
+
+    await pool.send(make_message("after restart"))
+    await pool.close()
+
+    metrics = pool.get_metrics()
+    assert "after restart" in smtp_server.handler.messages[-1]
+    assert metrics["connects"] == 2
+    assert metrics["reconnects"] == 1
+    assert metrics["sent"] == 2
+    assert metrics["failed"] == 0
+
+
+async def test_connect_failure_is_counted():
+    pool = make_pool(free_port())
+
+    with pytest.raises((aiosmtplib.SMTPException, OSError)):
+        await pool.send(make_message("unreachable"))
+
+    metrics = pool.get_metrics()
+    assert metrics["connect_failures"] == 1
+    assert metrics["failed"] == 1
+    assert metrics["connects"] == 0
+
+
+async def test_refused_recipient_keeps_connection(smtp_server):
+    pool = make_pool(smtp_server.port)
+    await pool.send(make_message("first"))
+
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused) as exc_info:
+        await pool.send(make_message("refused", recipient="unknown@example.com"))
+    await pool.send(make_message("after refusal"))
+    await pool.close()
+
+    # Отказ в получателе - не обрыв: без переподключения и повторной отправки
+    metrics = pool.get_metrics()
+    assert metrics["connects"] == 1
+    assert metrics["reconnects"] == 0
+    assert metrics["failed"] == 1
+    assert metrics["sent"] == 2
+    assert not is_smtp_failure(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (aiosmtplib.SMTPResponseException(421, "try later"), True),
+        (aiosmtplib.SMTPResponseException(550, "rejected"), False),
+        (
+            aiosmtplib.SMTPRecipientsRefused(
+                [aiosmtplib.SMTPRecipientRefused(550, "no user", "a@example.com")]
+            ),
+            False,
+        ),
+        (aiosmtplib.SMTPServerDisconnected("gone"), True),
+        (OSError("connection refused"), True),
+    ],
+    ids=["4xx", "5xx", "recipients-refused", "disconnected", "os-error"],
+)
+def test_is_smtp_failure(error, expected):
+    assert is_smtp_failure(error) is expected
@@ -0,0 +1,202 @@
+"""
+Авторизация по claims access токена (JWT_STATELESS_CLAIMS) и отзыв через
+версию токенов: кеш версии процесса, чтение версии из БД при промахе кеша
+и атомарное увеличение версии.
+"""
+
+import uuid
+
+import pytest
+from core.config import settings
+from fastapi import HTTPException
+from models import UserModel, UserRole
+from services.auth import service as service_module
+from services.auth.cache import (
+    access_token_cache,
+    principal_cache,
+    token_version_cache,
+)
+from services.auth.repositories.auth import AuthRepository
+from services.auth.service import AuthService
+from sqlalchemy.dialects import postgresql
+from utils.auth_utils import get_current_user
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    def __init__(self):
+        self.releases = 0
+
+    async def release(self):
+        self.releases += 1
+
+    async def commit(self):
+        pass
+
+
+class FakeAuthRepository:
+    """Таблица users из одного пользователя со счетчиком запросов"""
+
+    def __init__(self, user: UserModel):
+        self.user = user
+        self.queries = 0
+
+    async def get_token_version(self, user_id):
+        self.queries += 1
+        if self.user is None or self.user.id != user_id:
+            return None
+        return self.user.token_version
+
+    async def get_by_email(self, email):
+        self.queries += 1
+        return self.user
+
+    async def increment_token_version(self, user_id, **values):
+        self.user.token_version += 1
+        for name, value in values.items():
+            setattr(self.user, name, value)
+        return self.user.token_version
+
+
+class FakeRefreshTokenRepository:
+    async def revoke_all_for_user(self, user_id):
+        return 0
+
+
+@pytest.fixture(autouse=True)
+def stateless_claims(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_STATELESS_CLAIMS", True)
+    for cache in (access_token_cache, principal_cache, token_version_cache):
+        cache.clear()
+    yield
+    for cache in (access_token_cache, principal_cache, token_version_cache):
+        cache.clear()
+
+
+@pytest.fixture
+def user() -> UserModel:
+    return UserModel(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        username="user",
+        password="hash",
+        role=UserRole.USER,
+        is_verified=True,
+        token_version=0,
+    )
+
+
+@pytest.fixture
+def service(monkeypatch, user) -> AuthService:
+    async def run(func, *args):
+        return func(*args)
+
+    monkeypatch.setattr(service_module.password_executor, "run", run)
+    monkeypatch.setattr(
+        AuthService, "get_password_hash", staticmethod(lambda p: "new-hash")
+    )
+    return AuthService(
+        session=FakeSession(),
+        auth_repo=FakeAuthRepository(user),
+        refresh_token_repo=FakeRefreshTokenRepository(),
+        email_outbox_repo=None,
+        google_oauth=None,
+    )
+
+
+def issue_access_token(user: UserModel) -> str:
+    return AuthService.create_access_token(AuthService.build_access_token_claims(user))
+
+
+async def assert_unauthorized(token: str, service: AuthService) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token, service)
+    assert exc_info.value.status_code == 401
+
+
+async def test_principal_from_claims_without_database(service, user):
+    token = issue_access_token(user)
+
+    principal = await get_current_user(token, service)
+
+    assert principal.id == user.id
+    assert principal.email == user.email
+    assert principal.username == user.username
+    assert principal.role == UserRole.USER
+    # Версия известна процессу с момента выдачи токена
+    assert service.auth_repo.queries == 0
+
+
+async def test_unknown_version_is_read_from_database_once(service, user):
+    token = issue_access_token(user)
+    # Токен выдан другим процессом или запись кеша истекла
+    token_version_cache.clear()
+
+    for _ in range(3):
+        await get_current_user(token, service)
+
+    assert service.auth_repo.queries == 1
+    assert service.session.releases == 1
+    assert token_version_cache.get(str(user.id)) == 0
+
+
+async def test_revoked_in_other_process_rejected_on_cache_miss(service, user):
+    token = issue_access_token(user)
+    token_version_cache.clear()
+    user.token_version = 1
+
+    await assert_unauthorized(token, service)
+
+
+async def test_stale_token_version_rejected(service, user):
+    token = issue_access_token(user)
+    reset_token = service.create_password_reset_token(user.email)
+
+    await service.reset_password(reset_token, "new-password")
+    queries = service.auth_repo.queries
+
+    assert user.token_version == 1
+    await assert_unauthorized(token, service)
+    # Отклонено по кешу версии, без запроса к БД
+    assert service.auth_repo.queries == queries
+    principal = await get_current_user(issue_access_token(user), service)
+    assert principal.id == user.id
+
+
+async def test_deleted_user_rejected(service, user):
+    token = issue_access_token(user)
+    token_version_cache.clear()
+    service.auth_repo.user = None
+
+    await assert_unauthorized(token, service)
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar_one_or_none(self):
+        return 4
+
+
+async def test_increment_token_version_is_single_update():
+    session = CapturingSession()
+
+    version = await AuthRepository(session).increment_token_version(
+        uuid.uuid4(), password="new-hash"
+    )
+
+    assert version == 4
+    (statement,) = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    # Инкремент вычисляется в БД и возвращается тем же запросом,
+    # поэтому параллельные отзывы не теряют увеличение версии
+    assert sql.startswith("UPDATE users SET")
+    assert "token_version=(users.token_version + " in sql
+    assert "password=" in sql
+    assert sql.endswith("RETURNING users.token_version")
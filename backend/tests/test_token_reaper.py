@@ -0,0 +1,101 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from core.exceptions import DatabaseError
+from services.auth import token_reaper
+from services.auth.repositories.token_refresh import (
+    REFRESH_TOKEN_PARTITION_INTERVAL,
+    refresh_token_partition_name,
+    refresh_token_partition_start,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+class FakeRepository:
+    partitions: dict[str, datetime] = {}
+    fail_create = False
+    dropped: list[str] = []
+
+    def __init__(self, session):
+        pass
+
+    async def list_partitions(self):
+        return sorted(self.partitions.items(), key=lambda item: item[1])
+
+    async def create_partition(self, start, lock_timeout_ms):
+        if self.fail_create:
+            raise DatabaseError("lock timeout")
+        name = refresh_token_partition_name(start)
+        self.partitions[name] = start
+        return name
+
+    async def drop_partition(self, name, lock_timeout_ms):
+        self.dropped.append(name)
+        del self.partitions[name]
+
+    async def purge_default_partition(self, expired_before):
+        return 0
+
+
+@asynccontextmanager
+async def session_factory():
+    yield FakeSession()
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    FakeRepository.partitions = {}
+    FakeRepository.fail_create = False
+    FakeRepository.dropped = []
+    monkeypatch.setattr(token_reaper, "RefreshTokenRepository", FakeRepository)
+    return FakeRepository
+
+
+def make_reaper(drop_expired: bool = True) -> token_reaper.RefreshTokenReaper:
+    return token_reaper.RefreshTokenReaper(
+        session_factory=session_factory,
+        retention=timedelta(hours=24),
+        token_lifetime=timedelta(days=7),
+        partitions_ahead=2,
+        drop_expired=drop_expired,
+    )
+
+
+async def test_ensure_partitions_covers_token_lifetime(repository):
+    created = await make_reaper().ensure_partitions()
+
+    now = datetime.now(timezone.utc)
+    starts = sorted(repository.partitions.values())
+    assert len(created) == len(starts) >= 3
+    assert starts[0] == refresh_token_partition_start(now)
+    assert starts[-1] + REFRESH_TOKEN_PARTITION_INTERVAL >= now + timedelta(days=21)
+
+    # Повторный вызов ничего не создает
+    assert await make_reaper().ensure_partitions() == []
+
+
+async def test_ensure_partitions_failure_is_raised(repository):
+    repository.fail_create = True
+    with pytest.raises(DatabaseError):
+        await make_reaper().ensure_partitions()
+
+
+async def test_drop_is_gated_by_flag_but_creation_is_not(repository):
+    old_start = refresh_token_partition_start(
+        datetime.now(timezone.utc) - timedelta(days=30)
+    )
+    repository.partitions[refresh_token_partition_name(old_start)] = old_start
+
+    await make_reaper(drop_expired=False).run_once()
+    assert repository.dropped == []
+    assert len(repository.partitions) >= 4
+
+    await make_reaper(drop_expired=True).run_once()
+    assert repository.dropped == [refresh_token_partition_name(old_start)]
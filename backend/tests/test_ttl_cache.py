@@ -0,0 +1,109 @@
+import pytest
+from core import cache
+from core.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_entry_expires_after_ttl(clock):
+    ttl_cache = TTLCache(max_size=10, ttl=30)
+    ttl_cache.set("a", 1)
+
+    clock.advance(29)
+    assert ttl_cache.get("a") == 1
+
+    clock.advance(1)
+    assert ttl_cache.get("a") is None
+    # Истекшая запись удаляется при чтении
+    assert len(ttl_cache) == 0
+    assert ttl_cache.get_metrics()["misses"] == 1
+
+
+def test_per_entry_ttl(clock):
+    ttl_cache = TTLCache(max_size=10, ttl=30)
+    ttl_cache.set("short", 1, ttl=5)
+    ttl_cache.set("long", 2)
+    # Неположительный TTL (например, токен уже истек) не кешируется
+    ttl_cache.set("expired", 3, ttl=0)
+
+    clock.advance(5)
+
+    assert ttl_cache.get("short") is None
+    assert ttl_cache.get("long") == 2
+    assert ttl_cache.get("expired") is None
+
+
+def test_evicts_least_recently_used(clock):
+    ttl_cache = TTLCache(max_size=2, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    # Чтение делает запись самой свежей, вытесняется b
+    assert ttl_cache.get("a") == 1
+
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+    assert ttl_cache.get_metrics()["evictions"] == 1
+
+
+def test_overwrite_refreshes_position_and_ttl(clock):
+    ttl_cache = TTLCache(max_size=2, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    clock.advance(20)
+
+    ttl_cache.set("a", 10)
+    ttl_cache.set("c", 3)
+    clock.advance(20)
+
+    assert ttl_cache.get("a") == 10
+    assert ttl_cache.get("b") is None
+    assert len(ttl_cache) == 2
+
+
+def test_invalidate_and_clear(clock):
+    ttl_cache = TTLCache(max_size=10, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    ttl_cache.invalidate("a")
+    ttl_cache.invalidate("missing")
+
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("b") == 2
+    ttl_cache.clear()
+    assert len(ttl_cache) == 0
+
+
+def test_metrics(clock):
+    ttl_cache = TTLCache(max_size=10, ttl=30)
+    ttl_cache.set("a", 1)
+    for key in ("a", "a", "a", "b"):
+        ttl_cache.get(key)
+
+    assert ttl_cache.get_metrics() == {
+        "size": 1,
+        "max_size": 10,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 0,
+        "hit_ratio": 0.75,
+    }